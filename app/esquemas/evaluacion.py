@@ -47,6 +47,7 @@ class AnalisisIABase(BaseModel):
     pausas_detectadas: Optional[Dict[str, Any]] = None
     entonacion_score: Optional[float] = None
     ritmo_score: Optional[float] = None
+    tiempos_etapas: Optional[Dict[str, Any]] = None
 
 
 class AnalisisIACreate(AnalisisIABase):
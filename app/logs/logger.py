@@ -1,18 +1,157 @@
-﻿import logging
+﻿"""
+Logging de la aplicación: no bloqueante y estructurado.
+
+- El hilo del request solo encola el registro (QueueHandler); un hilo de
+  fondo (QueueListener) lo formatea y lo escribe en stdout (Azure lo recoge
+  desde ahí). Escribir en la consola ya no bloquea los requests.
+- `msg % args` se resuelve al encolar, en el hilo del llamador: los args
+  (objetos mutables, instancias ORM) se leen mientras siguen en su estado
+  y su sesión. Usar igual el estilo perezoso `logger.info("texto %s",
+  valor)` en lugar de f-strings en los caminos calientes: los logs
+  filtrados por nivel no formatean nada.
+- Si la cola se llena (LOG_COLA_MAX) los registros se descartan y se
+  cuentan en lugar de frenar la aplicación.
+- LOG_FORMATO=json (por defecto) escribe una línea JSON por registro, con
+  los campos de `extra=` al nivel superior. LOG_FORMATO=texto mantiene el
+  formato anterior.
+- `debe_registrar_ruta(ruta)` muestrea el log de requests por ruta
+  (LOG_MUESTREO y LOG_MUESTREO_RUTAS, ver abajo).
+
+Variables de entorno:
+    LOG_NIVEL=INFO
+    LOG_FORMATO=json | texto
+    LOG_COLA_MAX=10000
+    LOG_MUESTREO=1.0
+    LOG_MUESTREO_RUTAS=/api/auth/me=0.1,/api/ia/lectura-texto/{contenido_id}=0.05
+"""
+
+import atexit
+import copy
+import json
+import logging
 import os
-from datetime import datetime
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict
+
+
+# Atributos estándar de LogRecord; el resto viene de `extra=`
+_ATRIBUTOS_RECORD = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class FormateadorJSON(logging.Formatter):
+    """Una línea JSON por registro."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_RECORD and not clave.startswith("_"):
+                datos[clave] = valor
+        if record.exc_text:
+            datos["excepcion"] = record.exc_text
+        if record.stack_info:
+            datos["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class ManejadorCola(QueueHandler):
+    """
+    QueueHandler que deja el formateo final (JSON o texto) al hilo de fondo
+    y que descarta (contando) cuando la cola está llena.
+    """
+
+    def __init__(self, cola: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(cola)
+        self.descartados = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # El mensaje y el traceback se resuelven ahora: los args pueden
+        # cambiar o depender de una sesión ORM, y el frame deja de existir
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.descartados += 1
+
+
+def _leer_muestreo_rutas(valor: str) -> Dict[str, float]:
+    muestreo = {}
+    for par in filter(None, (p.strip() for p in valor.split(","))):
+        ruta, _, tasa = par.rpartition("=")
+        try:
+            muestreo[ruta.strip()] = float(tasa)
+        except ValueError:
+            continue
+    return muestreo
+
+
+LOG_NIVEL = os.getenv("LOG_NIVEL", "INFO").upper()
+LOG_FORMATO = os.getenv("LOG_FORMATO", "json").lower()
+LOG_COLA_MAX = int(os.getenv("LOG_COLA_MAX", "10000"))
+LOG_MUESTREO = float(os.getenv("LOG_MUESTREO", "1.0"))
+LOG_MUESTREO_RUTAS = _leer_muestreo_rutas(os.getenv("LOG_MUESTREO_RUTAS", ""))
+
+
+def debe_registrar_ruta(ruta: str) -> bool:
+    """
+    True si se debe registrar este request según el muestreo de su ruta
+    (plantilla de la ruta, p. ej. "/api/cursos/{curso_id}").
+    """
+    tasa = LOG_MUESTREO_RUTAS.get(ruta, LOG_MUESTREO)
+    return tasa >= 1.0 or (tasa > 0.0 and random.random() < tasa)
+
+
+def logs_descartados() -> int:
+    """Registros perdidos porque la cola de logs estaba llena."""
+    return _manejador_cola.descartados
+
+
+def logs_en_cola() -> int:
+    """Registros esperando al hilo de escritura."""
+    return _manejador_cola.queue.qsize()
+
 
-# Configuración simple para Azure
 logger = logging.getLogger('BookiSmartIA')
-logger.setLevel(logging.INFO)
+logger.setLevel(LOG_NIVEL)
 
-# Solo usar StreamHandler para Azure (logs van a stdout/stderr)
 if not logger.handlers:
-    console_handler = logging.StreamHandler()
-    formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(message)s'
+    console_handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMATO == "json":
+        console_handler.setFormatter(FormateadorJSON())
+    else:
+        console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+    _cola_logs: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=LOG_COLA_MAX)
+    _manejador_cola = ManejadorCola(_cola_logs)
+    _listener = QueueListener(_cola_logs, console_handler, respect_handler_level=True)
+    _listener.start()
+    # Vaciar la cola al terminar el proceso
+    atexit.register(_listener.stop)
+
+    logger.addHandler(_manejador_cola)
+else:
+    _manejador_cola = next(
+        (h for h in logger.handlers if isinstance(h, ManejadorCola)),
+        ManejadorCola(queue.Queue()),
     )
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
 logger.propagate = False
@@ -1,41 +1,51 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.exc import SQLAlchemyError
-import traceback
+import secrets
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
 
 from app.logs.logger import logger
+from app.middlewares.registro_requests import MiddlewareRegistroRequests
 from app.config import SessionLocal
 from app.routers import api_router
+from app import settings
+from app.servicios.cola_correos import emisor_correos
+from app.metricas import TIPO_CONTENIDO, exponer_metricas, volcador_metricas
+from app.servicios.monitor_sistema import monitor_sistema
+from app.servicios.registro_auditoria import escritor_auditoria, verificar_modo_auditoria
 
 app = FastAPI(
     title="BookiSmartIA - Backend",
     version="1.0.0"
 )
 
-app.add_middleware(ProxyHeadersMiddleware, trusted_hosts="*")
+
+def proxies_confiables() -> str:
+    """
+    PROXIES_CONFIABLES validado. En development, sin valor, solo localhost;
+    fuera de development es obligatorio y no admite "*".
+    """
+    proxies = (settings.PROXIES_CONFIABLES or "").strip()
+    if settings.ENVIRONMENT == "development":
+        return proxies or "127.0.0.1"
+    if not proxies or "*" in proxies:
+        raise RuntimeError(
+            "PROXIES_CONFIABLES debe listar las IPs/redes del proxy (ver app/settings.py): "
+            "sin él todos los clientes comparten la IP del proxy en el límite de logins y la auditoría"
+        )
+    return proxies
+
+
+# X-Forwarded-For solo se acepta de los proxies configurados (la IP del
+# cliente se usa en el límite de logins y en la auditoría)
+app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=proxies_confiables())
 
 logger.info("Backend BookiSmartIA iniciado correctamente")
 
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    logger.info(f" {request.method} {request.url.path}")
-    logger.info(f"   Origin: {request.headers.get('origin', 'No origin')}")
-    
-    try:
-        response = await call_next(request)
-        logger.info(f" Status: {response.status_code}")
-        return response
-    except Exception as e:
-        logger.error(f" Error procesando request: {e}")
-        logger.error(traceback.format_exc())
-        return JSONResponse(
-            status_code=500,
-            content={"detail": str(e)}
-        )
+app.add_middleware(MiddlewareRegistroRequests)
 
 
 origins = [
@@ -94,10 +104,51 @@ async def test_cors():
 app.include_router(api_router, prefix="/api")
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """
+    Métricas en formato Prometheus (ver app/metricas.py). Fuera de
+    desarrollo exigen METRICAS_TOKEN; sin token configurado no se exponen.
+    """
+    if not settings.METRICAS_TOKEN:
+        if settings.ENVIRONMENT != "development":
+            return Response(status_code=404)
+    elif not secrets.compare_digest(
+        # En bytes: con str, compare_digest lanza TypeError si hay caracteres no ASCII
+        request.headers.get("authorization", "").encode(),
+        f"Bearer {settings.METRICAS_TOKEN}".encode(),
+    ):
+        return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    return Response(content=exponer_metricas(), media_type=TIPO_CONTENIDO)
+
+
+@app.get("/health", include_in_schema=False)
+def health():
+    """Estado resumido desde la última muestra del monitor (no consulta nada)."""
+    return monitor_sistema.obtener_estado_simplificado()
+
+
+@app.on_event("startup")
+def iniciar_tareas_fondo():
+    verificar_modo_auditoria()
+    if settings.EMAIL_COLA_ACTIVA:
+        emisor_correos.iniciar()
+    volcador_metricas.iniciar()
+    monitor_sistema.iniciar()
+    escritor_auditoria.iniciar()
+
+
+@app.on_event("shutdown")
+def detener_tareas_fondo():
+    emisor_correos.detener()
+    volcador_metricas.detener()
+    monitor_sistema.detener()
+    escritor_auditoria.detener()
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    logger.error(f" Error global: {exc}")
-    logger.error(traceback.format_exc())
+    logger.error("Error global: %s", exc, exc_info=exc, extra={"ruta": request.url.path})
     
     return JSONResponse(
         status_code=500,
@@ -0,0 +1,504 @@
+"""
+Métricas de la aplicación en el formato de texto de Prometheus (GET /metrics).
+
+Registro en memoria, sin dependencias externas:
+
+- `Contador` e `Histograma` con etiquetas, seguros entre hilos
+- Indicadores (gauges) calculados al momento de exponer con una función,
+  p. ej. el largo de la cola de logs o los correos pendientes
+- `instrumentar_engine` cuenta y mide las consultas SQL; si hay un request
+  en curso (ver `iniciar_medicion`) también se acumulan por request
+
+Varios procesos (gunicorn): con METRICAS_DIR configurado cada worker vuelca
+su registro en `METRICAS_DIR/metricas_<pid>_<inicio>.json` cada
+METRICAS_VOLCADO_SEGUNDOS (y al exponer o terminar). /metrics lo sirve
+cualquier worker sumando contadores e histogramas de todos los archivos;
+los indicadores por proceso llevan la etiqueta `pid` y solo se toman de
+archivos recientes. Los archivos de workers muertos se conservan para que
+los contadores no retrocedan; vaciar el directorio antes de arrancar
+gunicorn.
+"""
+
+import atexit
+import copy
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app import settings
+from app.logs.logger import logs_descartados, logs_en_cola
+from app.metricas_pool import metricas_pools
+
+
+TIPO_CONTENIDO = "text/plain; version=0.0.4; charset=utf-8"
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BUCKETS_INFERENCIA = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+Etiquetas = Tuple[str, ...]
+
+
+class Contador:
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Etiquetas = ()) -> None:
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self._lock = threading.Lock()
+        self._valores: Dict[Etiquetas, float] = {}
+
+    def inc(self, *valores_etiquetas: str, cantidad: float = 1.0) -> None:
+        with self._lock:
+            self._valores[valores_etiquetas] = self._valores.get(valores_etiquetas, 0.0) + cantidad
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            valores = [[list(e), v] for e, v in self._valores.items()]
+        return {"tipo": "counter", "ayuda": self.ayuda, "etiquetas": list(self.etiquetas), "valores": valores}
+
+
+class Histograma:
+    def __init__(
+        self, nombre: str, ayuda: str, etiquetas: Etiquetas = (), buckets: Iterable[float] = BUCKETS_LATENCIA
+    ) -> None:
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # Por etiquetas: [conteos por bucket (+ el de +Inf), suma]
+        self._valores: Dict[Etiquetas, List[Any]] = {}
+
+    def observar(self, valor: float, *valores_etiquetas: str) -> None:
+        indice = len(self.buckets)
+        for i, limite in enumerate(self.buckets):
+            if valor <= limite:
+                indice = i
+                break
+        with self._lock:
+            serie = self._valores.get(valores_etiquetas)
+            if serie is None:
+                serie = self._valores[valores_etiquetas] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            valores = [[list(e), list(conteos), suma] for e, (conteos, suma) in self._valores.items()]
+        return {
+            "tipo": "histogram", "ayuda": self.ayuda, "etiquetas": list(self.etiquetas),
+            "buckets": list(self.buckets), "valores": valores,
+        }
+
+
+class RegistroMetricas:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metricas: Dict[str, Any] = {}
+        # nombre -> (tipo, ayuda, etiquetas, funcion, por_proceso)
+        self._indicadores: Dict[str, Tuple[str, str, Etiquetas, Callable[[], Any], bool]] = {}
+
+    def contador(self, nombre: str, ayuda: str, etiquetas: Etiquetas = ()) -> Contador:
+        with self._lock:
+            return self._metricas.setdefault(nombre, Contador(nombre, ayuda, etiquetas))
+
+    def histograma(
+        self, nombre: str, ayuda: str, etiquetas: Etiquetas = (), buckets: Iterable[float] = BUCKETS_LATENCIA
+    ) -> Histograma:
+        with self._lock:
+            return self._metricas.setdefault(nombre, Histograma(nombre, ayuda, etiquetas, buckets))
+
+    def indicador(
+        self,
+        nombre: str,
+        ayuda: str,
+        funcion: Callable[[], Any],
+        etiquetas: Etiquetas = (),
+        tipo: str = "gauge",
+        por_proceso: bool = True,
+    ) -> None:
+        """
+        Registra un valor calculado al exponer.
+
+        `funcion` devuelve un número o, si hay `etiquetas`, un dict
+        {tupla de valores de etiquetas: número}. Con `por_proceso=False` el
+        valor es global (p. ej. una consulta a la base) y solo lo calcula el
+        worker que atiende /metrics.
+        """
+        with self._lock:
+            self._indicadores[nombre] = (tipo, ayuda, etiquetas, funcion, por_proceso)
+
+    def snapshot(self, por_proceso: bool = True) -> Dict[str, Any]:
+        """Estado serializable; incluye los indicadores del tipo pedido."""
+        with self._lock:
+            metricas = list(self._metricas.values())
+            indicadores = [(n, i) for n, i in self._indicadores.items() if i[4] == por_proceso]
+
+        datos = {m.nombre: m.snapshot() for m in metricas} if por_proceso else {}
+        for nombre, (tipo, ayuda, etiquetas, funcion, _) in indicadores:
+            try:
+                resultado = funcion()
+            except Exception:
+                continue
+            if resultado is None:
+                continue
+            if not isinstance(resultado, dict):
+                resultado = {(): resultado}
+            datos[nombre] = {
+                "tipo": tipo, "ayuda": ayuda, "etiquetas": list(etiquetas), "indicador": True,
+                "valores": [[list(e), float(v)] for e, v in resultado.items() if v is not None],
+            }
+        return datos
+
+
+registro_metricas = RegistroMetricas()
+
+
+# ============================================
+# Métricas de la aplicación
+# ============================================
+
+requests_total = registro_metricas.contador(
+    "bookismart_http_requests_total", "Requests HTTP atendidos", ("metodo", "ruta", "status")
+)
+request_duracion = registro_metricas.histograma(
+    "bookismart_http_request_duracion_segundos", "Duración de los requests HTTP", ("metodo", "ruta")
+)
+db_consultas_por_request = registro_metricas.histograma(
+    "bookismart_db_consultas_por_request", "Consultas SQL por request", ("ruta",), BUCKETS_CONSULTAS
+)
+db_segundos_por_request = registro_metricas.histograma(
+    "bookismart_db_segundos_por_request", "Tiempo total en consultas SQL por request", ("ruta",)
+)
+db_consulta_duracion = registro_metricas.histograma(
+    "bookismart_db_consulta_duracion_segundos", "Duración de cada consulta SQL"
+)
+inferencia_duracion = registro_metricas.histograma(
+    "bookismart_inferencia_duracion_segundos", "Duración de la inferencia de modelos de IA",
+    ("modelo",), BUCKETS_INFERENCIA,
+)
+etapa_duracion = registro_metricas.histograma(
+    "bookismart_pipeline_etapa_duracion_segundos", "Duración de cada etapa de los pipelines de IA",
+    ("pipeline", "etapa"),
+)
+factor_tiempo_real = registro_metricas.histograma(
+    "bookismart_pipeline_factor_tiempo_real", "Segundos de inferencia por segundo de audio",
+    ("pipeline",), (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0),
+)
+cache_consultas = registro_metricas.contador(
+    "bookismart_cache_consultas_total", "Consultas a cachés en memoria", ("cache", "resultado")
+)
+
+registro_metricas.indicador(
+    "bookismart_logs_en_cola", "Registros de log esperando ser escritos", logs_en_cola
+)
+registro_metricas.indicador(
+    "bookismart_logs_descartados_total", "Registros de log descartados por cola llena",
+    logs_descartados, tipo="counter",
+)
+
+
+def _conexiones_pool() -> Dict[Etiquetas, Any]:
+    valores = {}
+    for pool, estado in metricas_pools().items():
+        valores[(pool, "en_uso")] = estado.get("en_uso")
+        valores[(pool, "libres")] = estado.get("libres")
+    return valores
+
+
+registro_metricas.indicador(
+    "bookismart_db_pool_conexiones", "Conexiones de cada pool por estado",
+    _conexiones_pool, etiquetas=("pool", "estado"),
+)
+
+
+# ============================================
+# Medición por request
+# ============================================
+
+class MedicionRequest:
+    """Acumulado de consultas SQL del request en curso."""
+
+    __slots__ = ("consultas", "segundos_db", "perfil")
+
+    def __init__(self) -> None:
+        self.consultas = 0
+        self.segundos_db = 0.0
+        # PerfilSQL si el request se perfila (ver app/perfilador_sql.py)
+        self.perfil: Any = None
+
+
+# Los endpoints sync corren en el threadpool con una copia del contexto,
+# que apunta al mismo objeto MedicionRequest
+_medicion_actual: ContextVar[Optional[MedicionRequest]] = ContextVar("medicion_request", default=None)
+
+
+def iniciar_medicion() -> Tuple[MedicionRequest, Any]:
+    medicion = MedicionRequest()
+    return medicion, _medicion_actual.set(medicion)
+
+
+def terminar_medicion(token: Any) -> None:
+    _medicion_actual.reset(token)
+
+
+def medicion_actual() -> Optional[MedicionRequest]:
+    return _medicion_actual.get()
+
+
+def observar_request(metodo: str, ruta: str, status: int, segundos: float, medicion: MedicionRequest) -> None:
+    requests_total.inc(metodo, ruta, str(status))
+    request_duracion.observar(segundos, metodo, ruta)
+    db_consultas_por_request.observar(medicion.consultas, ruta)
+    db_segundos_por_request.observar(medicion.segundos_db, ruta)
+
+
+def registrar_cache(cache: str, acierto: bool) -> None:
+    cache_consultas.inc(cache, "acierto" if acierto else "fallo")
+
+
+@contextmanager
+def medir_inferencia(modelo: str) -> Iterator[None]:
+    """`with medir_inferencia("whisper"): ...` registra la duración."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        inferencia_duracion.observar(time.perf_counter() - inicio, modelo)
+
+
+class CronometroEtapas:
+    """
+    Tiempos por etapa de una ejecución de un pipeline (p. ej. el análisis
+    de una lectura). Cada etapa se observa en
+    bookismart_pipeline_etapa_duracion_segundos al terminar.
+    """
+
+    # Etapas de inferencia sobre el audio (para el factor de tiempo real)
+    ETAPAS_AUDIO = ("decodificacion", "vad", "transcripcion")
+
+    def __init__(self, pipeline: str) -> None:
+        self.pipeline = pipeline
+        self.etapas: Dict[str, float] = {}
+        self._inicio = time.perf_counter()
+
+    @contextmanager
+    def etapa(self, nombre: str) -> Iterator[None]:
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            self.etapas[nombre] = self.etapas.get(nombre, 0.0) + segundos
+            etapa_duracion.observar(segundos, self.pipeline, nombre)
+
+    def transcurrido(self) -> float:
+        """Segundos desde que se creó (incluye esperas entre etapas)."""
+        return time.perf_counter() - self._inicio
+
+    def desglose(self, duracion_audio: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Desglose serializable; con la duración del audio incluye el factor de
+        tiempo real (segundos de inferencia por segundo de audio) y lo observa.
+        """
+        resultado: Dict[str, Any] = {
+            "etapas_ms": {nombre: round(s * 1000, 1) for nombre, s in self.etapas.items()},
+            "total_etapas_ms": round(sum(self.etapas.values()) * 1000, 1),
+            "transcurrido_ms": round(self.transcurrido() * 1000, 1),
+        }
+        if duracion_audio:
+            inferencia = sum(self.etapas.get(e, 0.0) for e in self.ETAPAS_AUDIO)
+            factor = inferencia / duracion_audio
+            factor_tiempo_real.observar(factor, self.pipeline)
+            resultado["duracion_audio_s"] = round(duracion_audio, 2)
+            resultado["factor_tiempo_real"] = round(factor, 3)
+        return resultado
+
+
+def instrumentar_engine(engine) -> None:
+    """Cuenta y mide cada consulta del engine (sync, o `async_engine.sync_engine`)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metricas_inicio", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _despues(conn, cursor, statement, parameters, context, executemany):
+        _registrar_consulta(conn, statement)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(contexto_error):
+        if contexto_error.connection is not None:
+            _registrar_consulta(contexto_error.connection, contexto_error.statement)
+
+
+def _registrar_consulta(conn, sentencia: Optional[str]) -> None:
+    inicios = conn.info.get("metricas_inicio")
+    if not inicios:
+        return
+    segundos = time.perf_counter() - inicios.pop()
+    db_consulta_duracion.observar(segundos)
+    medicion = _medicion_actual.get()
+    if medicion is not None:
+        medicion.consultas += 1
+        medicion.segundos_db += segundos
+        if medicion.perfil is not None and sentencia:
+            medicion.perfil.registrar(sentencia, segundos)
+
+
+# ============================================
+# Varios procesos: volcado y combinación
+# ============================================
+
+_INICIO_PROCESO = int(time.time())
+
+
+def _archivo_proceso() -> str:
+    return os.path.join(settings.METRICAS_DIR, f"metricas_{os.getpid()}_{_INICIO_PROCESO}.json")
+
+
+def volcar_metricas() -> None:
+    """Escribe el registro de este proceso en METRICAS_DIR (escritura atómica)."""
+    if not settings.METRICAS_DIR:
+        return
+    archivo = _archivo_proceso()
+    temporal = f"{archivo}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump({"pid": os.getpid(), "metricas": registro_metricas.snapshot()}, f)
+    os.replace(temporal, archivo)
+
+
+def _leer_volcados() -> List[Tuple[Dict[str, Any], bool]]:
+    """(volcado, es_reciente) de todos los workers."""
+    limite_reciente = time.time() - 3 * settings.METRICAS_VOLCADO_SEGUNDOS
+    volcados = []
+    for archivo in glob.glob(os.path.join(settings.METRICAS_DIR, "metricas_*.json")):
+        try:
+            with open(archivo, encoding="utf-8") as f:
+                volcados.append((json.load(f), os.path.getmtime(archivo) >= limite_reciente))
+        except (OSError, ValueError):
+            continue
+    return volcados
+
+
+def _combinar(volcados: List[Tuple[Dict[str, Any], bool]]) -> Dict[str, Any]:
+    combinado: Dict[str, Any] = {}
+    for volcado, reciente in volcados:
+        for nombre, metrica in volcado["metricas"].items():
+            if metrica.get("indicador"):
+                if not reciente:
+                    continue
+                destino = combinado.setdefault(nombre, {**metrica, "etiquetas": metrica["etiquetas"] + ["pid"], "valores": []})
+                destino["valores"].extend([e + [str(volcado["pid"])], v] for e, v in metrica["valores"])
+                continue
+
+            destino = combinado.setdefault(nombre, {**metrica, "valores": []})
+            series = {tuple(v[0]): v for v in destino["valores"]}
+            for valor in metrica["valores"]:
+                clave = tuple(valor[0])
+                if clave not in series:
+                    series[clave] = copy.deepcopy(valor)
+                    destino["valores"].append(series[clave])
+                elif metrica["tipo"] == "histogram":
+                    series[clave][1] = [a + b for a, b in zip(series[clave][1], valor[1])]
+                    series[clave][2] += valor[2]
+                else:
+                    series[clave][1] += valor[1]
+    return combinado
+
+
+class VolcadorMetricas:
+    """Hilo de fondo que vuelca las métricas del proceso periódicamente."""
+
+    def __init__(self) -> None:
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        if not settings.METRICAS_DIR or (self._hilo is not None and self._hilo.is_alive()):
+            return
+        os.makedirs(settings.METRICAS_DIR, exist_ok=True)
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="metricas-volcado", daemon=True)
+        self._hilo.start()
+        atexit.register(self.detener)
+
+    def detener(self) -> None:
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(5)
+            self._hilo = None
+            _volcar_sin_error()
+
+    def _bucle(self) -> None:
+        while not self._detener.wait(settings.METRICAS_VOLCADO_SEGUNDOS):
+            _volcar_sin_error()
+
+
+def _volcar_sin_error() -> None:
+    try:
+        volcar_metricas()
+    except OSError:
+        pass
+
+
+volcador_metricas = VolcadorMetricas()
+
+
+# ============================================
+# Formato de texto de Prometheus
+# ============================================
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _etiquetas_texto(nombres: List[str], valores: List[str], extra: str = "") -> str:
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _numero(valor: float) -> str:
+    return str(int(valor)) if float(valor).is_integer() else repr(float(valor))
+
+
+def _formatear(metricas: Dict[str, Any]) -> str:
+    lineas = []
+    for nombre in sorted(metricas):
+        m = metricas[nombre]
+        lineas.append(f"# HELP {nombre} {m['ayuda']}")
+        lineas.append(f"# TYPE {nombre} {m['tipo']}")
+        for valor in m["valores"]:
+            if m["tipo"] != "histogram":
+                lineas.append(f"{nombre}{_etiquetas_texto(m['etiquetas'], valor[0])} {_numero(valor[1])}")
+                continue
+            etiquetas, conteos, suma = valor
+            acumulado = 0
+            for limite, conteo in zip(m["buckets"] + ["+Inf"], conteos):
+                acumulado += conteo
+                le = 'le="' + (limite if limite == "+Inf" else _numero(limite)) + '"'
+                lineas.append(f"{nombre}_bucket{_etiquetas_texto(m['etiquetas'], etiquetas, le)} {acumulado}")
+            sufijo = _etiquetas_texto(m["etiquetas"], etiquetas)
+            lineas.append(f"{nombre}_sum{sufijo} {_numero(suma)}")
+            lineas.append(f"{nombre}_count{sufijo} {acumulado}")
+    return "\n".join(lineas) + "\n"
+
+
+def exponer_metricas() -> str:
+    """Texto para GET /metrics (todos los workers si hay METRICAS_DIR)."""
+    if settings.METRICAS_DIR:
+        _volcar_sin_error()
+        metricas = _combinar(_leer_volcados())
+    else:
+        metricas = registro_metricas.snapshot()
+    metricas.update(registro_metricas.snapshot(por_proceso=False))
+    return _formatear(metricas)
@@ -0,0 +1,101 @@
+"""
+Métricas del pool de conexiones de SQLAlchemy.
+
+Los pools se crean con `pool_medido(QueuePool, "principal")`, una subclase
+que mide cuánto espera cada checkout por una conexión libre y cuántos
+checkouts terminan en timeout (pool agotado). `metricas_pools()` combina
+esas esperas con el estado actual de cada pool (en uso, libres, overflow).
+"""
+
+import threading
+import time
+from typing import Any, Dict, Type
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool
+
+
+class MetricasPool:
+    """Esperas de checkout por pool, seguras entre hilos."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._esperas: Dict[str, Dict[str, float]] = {}
+        self._pools: Dict[str, Pool] = {}
+
+    def registrar_pool(self, nombre: str, pool: Pool) -> None:
+        with self._lock:
+            self._pools[nombre] = pool
+
+    def registrar_checkout(self, nombre: str, segundos: float, timeout: bool) -> None:
+        with self._lock:
+            m = self._esperas.setdefault(nombre, {
+                "checkouts": 0, "timeouts": 0,
+                "espera_segundos_total": 0.0, "espera_segundos_max": 0.0,
+            })
+            m["checkouts"] += 1
+            if timeout:
+                m["timeouts"] += 1
+            m["espera_segundos_total"] += segundos
+            m["espera_segundos_max"] = max(m["espera_segundos_max"], segundos)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            pools = dict(self._pools)
+            esperas = {nombre: dict(m) for nombre, m in self._esperas.items()}
+
+        resultado = {}
+        for nombre, pool in pools.items():
+            estado: Dict[str, Any] = {
+                "tamano": _llamar(pool, "size"),
+                "en_uso": _llamar(pool, "checkedout"),
+                "libres": _llamar(pool, "checkedin"),
+                "overflow": _llamar(pool, "overflow"),
+            }
+            estado.update(esperas.get(nombre, {}))
+            if estado.get("checkouts"):
+                estado["espera_ms_promedio"] = round(
+                    estado["espera_segundos_total"] * 1000 / estado["checkouts"], 2
+                )
+            resultado[nombre] = estado
+        return resultado
+
+
+def _llamar(pool: Pool, metodo: str):
+    funcion = getattr(pool, metodo, None)
+    return funcion() if callable(funcion) else None
+
+
+metricas_pool = MetricasPool()
+
+
+def pool_medido(base: Type[Pool], nombre: str) -> Type[Pool]:
+    """
+    Subclase de `base` que mide la espera de cada checkout.
+
+    Se usa como `poolclass` en create_engine/create_async_engine; el pool se
+    registra con `nombre` en cuanto se crea (también al recrearlo tras dispose).
+    """
+
+    class PoolMedido(base):  # type: ignore[misc, valid-type]
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__(*args, **kwargs)
+            metricas_pool.registrar_pool(nombre, self)
+
+        def _do_get(self):
+            inicio = time.perf_counter()
+            timeout = False
+            try:
+                return super()._do_get()
+            except PoolTimeoutError:
+                timeout = True
+                raise
+            finally:
+                metricas_pool.registrar_checkout(nombre, time.perf_counter() - inicio, timeout)
+
+    PoolMedido.__name__ = f"{base.__name__}Medido"
+    return PoolMedido
+
+
+def metricas_pools() -> Dict[str, Any]:
+    return metricas_pool.snapshot()
@@ -1,5 +1,6 @@
 # app/middlewares/__init__.py
 
 from .audit_context import get_db_with_audit_context
+from .registro_requests import MiddlewareRegistroRequests
 
-__all__ = ["get_db_with_audit_context"]
+__all__ = ["get_db_with_audit_context", "MiddlewareRegistroRequests"]
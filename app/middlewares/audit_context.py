@@ -1,18 +1,21 @@
 """
 Middleware de Contexto de Auditoría
 
-Este módulo proporciona una dependency mejorada para configurar el contexto
-del usuario autenticado en la sesión de PostgreSQL, permitiendo que los
-triggers de auditoría capturen automáticamente el usuario_id.
+Este módulo proporciona dependencies para asociar el usuario autenticado
+y su IP a los cambios que se auditan.
 
 PROBLEMA ANTERIOR:
 - Los triggers guardaban usuario_id = NULL porque no tenían contexto
-- No se podía saber quién hizo cada cambio en la auditoría
+- Configurar el contexto costaba dos SET LOCAL por request y dos RESET
+  al terminar (cuatro viajes a la BD extra)
 
 SOLUCIÓN:
-- Usar variables de sesión de PostgreSQL (SET LOCAL)
-- Los triggers leen esas variables para obtener el usuario_id
-- Automático y transparente para el código
+- AUDITORIA_MODO=triggers (por defecto): una sola sentencia con
+  set_config(..., true) para las dos variables; al ser local a la
+  transacción no hace falta RESET
+- AUDITORIA_MODO=aplicacion: la auditoría la escribe
+  app/servicios/registro_auditoria.py y el contexto se guarda en la sesión
+  de SQLAlchemy, sin consultas
 
 USO:
     # En lugar de usar get_db directamente:
@@ -24,7 +27,6 @@ USO:
         usuario_actual: Usuario = Depends(obtener_usuario_actual)
     ):
         # El contexto ya está configurado automáticamente
-        # Los triggers guardarán usuario_id correctamente
         ...
 """
 
@@ -35,15 +37,23 @@ from sqlalchemy import text
 
 from app.config import get_db
 from app.servicios.seguridad import obtener_usuario_actual
+from app.servicios.registro_auditoria import (
+    auditoria_en_aplicacion,
+    fijar_contexto_sesion,
+    ip_cliente,
+    limpiar_contexto_sesion,
+)
 from app.modelos import Usuario
 from app.logs.logger import logger
 
 
 def set_audit_context(db: Session, usuario_id: Optional[int], ip_address: Optional[str] = None):
     """
-    Configura el contexto de auditoría en la sesión de PostgreSQL.
+    Configura el contexto de auditoría de la sesión.
 
-    Establece variables de sesión que los triggers pueden leer:
+    En modo aplicación solo se guarda en la sesión de SQLAlchemy. En modo
+    triggers se fijan, en una sola sentencia, las variables que leen los
+    triggers (locales a la transacción):
     - app.current_user_id: ID del usuario autenticado
     - app.current_user_ip: IP del usuario (opcional)
 
@@ -52,24 +62,27 @@ def set_audit_context(db: Session, usuario_id: Optional[int], ip_address: Option
         usuario_id: ID del usuario autenticado (puede ser None para endpoints públicos)
         ip_address: Dirección IP del usuario (opcional)
     """
+    fijar_contexto_sesion(db, usuario_id, ip_address)
+    if auditoria_en_aplicacion():
+        return
+
     try:
-        if usuario_id is not None:
-            # Configurar usuario_id en la sesión de PostgreSQL
-            db.execute(text("SET LOCAL app.current_user_id = :user_id"), {"user_id": usuario_id})
-            logger.debug(f"🔐 Contexto de auditoría configurado: usuario_id={usuario_id}")
-        else:
-            # Para endpoints públicos, limpiar el contexto
-            db.execute(text("SET LOCAL app.current_user_id = NULL"))
-            logger.debug("🔓 Contexto de auditoría: usuario público (sin autenticación)")
-
-        if ip_address:
-            db.execute(text("SET LOCAL app.current_user_ip = :ip"), {"ip": ip_address})
-            logger.debug(f"🌐 IP configurada en contexto: {ip_address}")
+        db.execute(
+            text(
+                "SELECT set_config('app.current_user_id', :user_id, true), "
+                "set_config('app.current_user_ip', :ip, true)"
+            ),
+            {
+                "user_id": str(usuario_id) if usuario_id is not None else "",
+                "ip": ip_address or "",
+            },
+        )
+        logger.debug("🔐 Contexto de auditoría configurado: usuario_id=%s, ip=%s", usuario_id, ip_address)
 
     except Exception as e:
         # No fallar si hay error al configurar contexto
         # Los triggers deberían manejar el caso de variables no definidas
-        logger.warning(f"⚠️ No se pudo configurar contexto de auditoría: {str(e)}")
+        logger.warning("⚠️ No se pudo configurar contexto de auditoría: %s", e)
 
 
 def get_db_with_audit_context(
@@ -112,35 +125,19 @@ def get_db_with_audit_context(
             return nuevo
     """
 
-    # Obtener IP del cliente
-    ip_address = None
-    if hasattr(request, 'client') and request.client:
-        ip_address = request.client.host
-    elif 'x-forwarded-for' in request.headers:
-        # Si está detrás de un proxy/load balancer
-        ip_address = request.headers['x-forwarded-for'].split(',')[0].strip()
-    elif 'x-real-ip' in request.headers:
-        ip_address = request.headers['x-real-ip']
-
     # Configurar contexto de auditoría
     set_audit_context(
         db=db,
         usuario_id=usuario_actual.id if usuario_actual else None,
-        ip_address=ip_address
+        ip_address=ip_cliente(request)
     )
 
     try:
         yield db
     finally:
-        # Limpiar el contexto al finalizar
-        # (SET LOCAL se limpia automáticamente al final de la transacción,
-        # pero es buena práctica hacerlo explícito)
-        try:
-            db.execute(text("RESET app.current_user_id"))
-            db.execute(text("RESET app.current_user_ip"))
-        except Exception:
-            # Ignorar errores al limpiar (la sesión puede estar cerrada)
-            pass
+        # Las variables de PostgreSQL son locales a la transacción: solo
+        # queda limpiar el contexto guardado en la sesión
+        limpiar_contexto_sesion(db)
 
 
 def get_db_with_audit_context_optional(
@@ -172,30 +169,17 @@ def get_db_with_audit_context_optional(
             ...
     """
 
-    # Obtener IP del cliente
-    ip_address = None
-    if hasattr(request, 'client') and request.client:
-        ip_address = request.client.host
-    elif 'x-forwarded-for' in request.headers:
-        ip_address = request.headers['x-forwarded-for'].split(',')[0].strip()
-    elif 'x-real-ip' in request.headers:
-        ip_address = request.headers['x-real-ip']
-
     # Configurar contexto sin usuario (NULL)
     set_audit_context(
         db=db,
         usuario_id=None,
-        ip_address=ip_address
+        ip_address=ip_cliente(request)
     )
 
     try:
         yield db
     finally:
-        try:
-            db.execute(text("RESET app.current_user_id"))
-            db.execute(text("RESET app.current_user_ip"))
-        except Exception:
-            pass
+        limpiar_contexto_sesion(db)
 
 
 # ============================================
@@ -242,9 +226,5 @@ def limpiar_contexto_auditoria(db: Session):
     Args:
         db: Sesión de SQLAlchemy
     """
-    try:
-        db.execute(text("RESET app.current_user_id"))
-        db.execute(text("RESET app.current_user_ip"))
-        logger.debug("🧹 Contexto de auditoría limpiado")
-    except Exception as e:
-        logger.warning(f"⚠️ Error al limpiar contexto: {str(e)}")
+    limpiar_contexto_sesion(db)
+    logger.debug("🧹 Contexto de auditoría limpiado")
@@ -0,0 +1,110 @@
+"""
+Middleware ASGI de registro, tiempos y captura de errores por request.
+
+Es ASGI puro (no BaseHTTPMiddleware): no crea un Request ni envuelve el
+cuerpo de la respuesta en streams intermedios, así que subidas de audio y
+descargas de archivos pasan sin copias ni buffering extra.
+
+Por cada request HTTP:
+- Mide la duración y la expone en la cabecera `Server-Timing: app;dur=<ms>`
+- Registra las métricas del request (ver app/metricas.py): latencia por
+  plantilla de ruta y consultas SQL hechas durante el request
+- Si el perfilador SQL está activo (app/perfilador_sql.py) agrega la
+  entrada `db` a Server-Timing y reporta sospechas de N+1
+- Escribe una línea de log estructurada (muestreada por plantilla de ruta,
+  ver app/logs/logger.py); los 5xx se registran siempre
+- Si la aplicación lanza una excepción antes de empezar la respuesta,
+  la registra y responde 500 JSON {"detail": "..."}
+"""
+
+import json
+import time
+from typing import Any, Dict, Optional
+
+from app.logs.logger import logger, debe_registrar_ruta
+from app.metricas import MedicionRequest, iniciar_medicion, observar_request, terminar_medicion
+from app.perfilador_sql import PerfilSQL, perfil_activo, reportar_perfil, server_timing_db
+
+
+class MiddlewareRegistroRequests:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        estado: Dict[str, Any] = {"status": None}
+        medicion, token = iniciar_medicion()
+        if perfil_activo(dict(scope.get("headers") or [])):
+            medicion.perfil = PerfilSQL()
+
+        async def send_medido(message) -> None:
+            if message["type"] == "http.response.start":
+                estado["status"] = message["status"]
+                duracion_ms = (time.perf_counter() - inicio) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", f"app;dur={duracion_ms:.1f}".encode("latin-1")))
+                if medicion.perfil is not None:
+                    headers.append((b"server-timing", server_timing_db(medicion)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_medido)
+        except Exception as e:
+            logger.exception(
+                "Error procesando request %s %s", scope["method"], scope["path"],
+                extra={"metodo": scope["method"], "ruta": scope["path"]},
+            )
+            if estado["status"] is not None:
+                # La respuesta ya empezó: no se puede enviar otra
+                raise
+            await _responder_500(send_medido, str(e))
+        finally:
+            terminar_medicion(token)
+            self._registrar(scope, estado["status"], inicio, medicion)
+
+    @staticmethod
+    def _registrar(scope, status: Optional[int], inicio: float, medicion: MedicionRequest) -> None:
+        status = status or 500
+        segundos = time.perf_counter() - inicio
+        # FastAPI deja la ruta resuelta en el scope: se agrupa por plantilla.
+        # Sin ruta (404) las métricas usan una sola serie para no crecer sin límite
+        plantilla = getattr(scope.get("route"), "path", None)
+        observar_request(scope["method"], plantilla or "sin_ruta", status, segundos, medicion)
+        reportar_perfil(scope["method"], plantilla or "sin_ruta", status, medicion)
+
+        ruta = plantilla or scope["path"]
+        if status < 500 and not debe_registrar_ruta(ruta):
+            return
+
+        headers = dict(scope.get("headers") or [])
+        origin = headers.get(b"origin")
+        logger.info(
+            "%s %s %s", scope["method"], scope["path"], status,
+            extra={
+                "metodo": scope["method"],
+                "ruta": ruta,
+                "status": status,
+                "duracion_ms": round(segundos * 1000, 2),
+                "consultas_db": medicion.consultas,
+                "db_ms": round(medicion.segundos_db * 1000, 2),
+                "origin": origin.decode("latin-1") if origin else None,
+            },
+        )
+
+
+async def _responder_500(send, detalle: str) -> None:
+    cuerpo = json.dumps({"detail": detalle}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 500,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(cuerpo)).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": cuerpo})
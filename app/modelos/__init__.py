@@ -37,6 +37,7 @@ from .historial_practica_pronunciacion import HistorialPracticaPronunciacion
 from .historial_mejoras_ia import HistorialMejorasIA
 from .actividad_lectura import ActividadLectura
 from .password_reset_token import PasswordResetToken
+from .correo_saliente import CorreoSaliente
 
 __all__ = [
     "Base",
@@ -76,4 +77,5 @@ __all__ = [
     "HistorialMejorasIA",
     "ActividadLectura",
     "PasswordResetToken",
+    "CorreoSaliente",
 ]
@@ -18,5 +18,8 @@ class AnalisisIA(Base):
     pausas_detectadas = Column(JSON)
     entonacion_score = Column(Float)
     ritmo_score = Column(Float)
+    # Desglose por etapa del pipeline (ms por etapa, duración del audio y
+    # factor de tiempo real); tiempo_procesamiento es el total en segundos
+    tiempos_etapas = Column(JSON)
     
     evaluacion = relationship("EvaluacionLectura")
\ No newline at end of file
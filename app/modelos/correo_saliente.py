@@ -0,0 +1,38 @@
+from sqlalchemy import Column, BigInteger, String, Text, Integer, DateTime, Index
+from sqlalchemy.sql import func
+from app.modelos import Base
+
+
+class CorreoSaliente(Base):
+    """
+    Cola durable de emails salientes.
+
+    Los endpoints solo insertan la fila; el emisor en segundo plano
+    (servicios/cola_correos.py) la envía y reintenta con backoff.
+
+    Estados:
+    - pendiente: por enviar (o reintentar) a partir de proximo_intento
+    - enviado: entregado al proveedor
+    - fallido: agotó EMAIL_MAX_INTENTOS
+    """
+    __tablename__ = 'correo_saliente'
+
+    id = Column(BigInteger, primary_key=True, index=True)
+    destinatario = Column(String(255), nullable=False)
+    asunto = Column(String(255), nullable=False)
+    html = Column(Text, nullable=False)
+    texto = Column(Text, nullable=True)
+    estado = Column(String(20), nullable=False, default='pendiente', server_default='pendiente')
+    intentos = Column(Integer, nullable=False, default=0, server_default='0')
+    proximo_intento = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    ultimo_error = Column(Text, nullable=True)
+    creado_en = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    enviado_en = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index(
+            'idx_correo_saliente_pendientes',
+            'proximo_intento', 'id',
+            postgresql_where=(estado == 'pendiente'),
+        ),
+    )
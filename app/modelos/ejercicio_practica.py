@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, String, Boolean, DateTime, Text, Integer, ForeignKey, CheckConstraint
+from sqlalchemy import Column, BigInteger, String, Boolean, DateTime, Text, Integer, ForeignKey, CheckConstraint, Index
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -16,7 +16,7 @@ class EjercicioPractica(Base):
     dificultad = Column(Integer)
     completado = Column(Boolean, default=False)
     intentos = Column(Integer, default=0)
-    fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
+    fecha_creacion = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     fecha_completacion = Column(DateTime(timezone=True))
     deleted_at = Column(DateTime(timezone=True), nullable=True)
     
@@ -26,4 +26,5 @@ class EjercicioPractica(Base):
     __table_args__ = (
         CheckConstraint("tipo_ejercicio IN ('palabras_aisladas', 'oraciones', 'ritmo', 'entonacion', 'puntuacion')", name='check_tipo_ejercicio'),
         CheckConstraint("dificultad BETWEEN 1 AND 3", name='check_dificultad_ejercicio'),
+        Index('idx_ejercicio_estudiante_fecha', 'estudiante_id', fecha_creacion.desc(), id.desc()),
     )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, String, Boolean, DateTime, Text, Integer, Float, ForeignKey, CheckConstraint
+from sqlalchemy import Column, BigInteger, String, Boolean, DateTime, Text, Integer, Float, ForeignKey, CheckConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.modelos import Base
@@ -26,4 +26,10 @@ class EvaluacionLectura(Base):
     __table_args__ = (
         CheckConstraint("puntuacion_pronunciacion >= 0 AND puntuacion_pronunciacion <= 100", name='check_puntuacion_pronunciacion'),
         CheckConstraint("estado IN ('completado', 'en_progreso', 'cancelado')", name='check_estado_evaluacion'),
+        Index('idx_evaluacion_estudiante_fecha', 'estudiante_id', fecha_evaluacion.desc()),
+        Index(
+            'idx_evaluacion_estudiante_contenido_precision',
+            'estudiante_id', 'contenido_id', 'precision_palabras',
+            postgresql_where=precision_palabras.isnot(None),
+        ),
     )
\ No newline at end of file
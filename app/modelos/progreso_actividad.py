@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, Boolean, DateTime, Integer, Float, JSON, ForeignKey, UniqueConstraint, CheckConstraint
+from sqlalchemy import Column, BigInteger, Boolean, DateTime, Integer, Float, JSON, ForeignKey, UniqueConstraint, CheckConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.modelos import Base
@@ -23,4 +23,5 @@ class ProgresoActividad(Base):
     __table_args__ = (
         UniqueConstraint('estudiante_id', 'actividad_id', name='uq_estudiante_actividad'),
         CheckConstraint("puntuacion >= 0", name='check_puntuacion_progreso'),
+        Index('idx_progreso_estudiante_fecha', 'estudiante_id', fecha_completacion.desc()),
     )
\ No newline at end of file
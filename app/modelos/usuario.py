@@ -21,6 +21,8 @@ class Usuario(Base):
     deleted_at = Column(DateTime(timezone=True), nullable=True)
     otp_secret = Column(String(255))
     otp_habilitado = Column(Boolean, default=False)
+    # Se incrementa para revocar todos los tokens de acceso emitidos
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
     roles = relationship("UsuarioRol", back_populates="usuario", passive_deletes=True)
     sesiones = relationship("SesionUsuario", back_populates="usuario", passive_deletes=True)
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, String, Boolean, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import Column, BigInteger, String, Boolean, DateTime, ForeignKey, CheckConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.modelos import Base
@@ -17,4 +17,5 @@ class UsuarioRol(Base):
     
     __table_args__ = (
         CheckConstraint("rol IN ('estudiante', 'docente', 'padre', 'admin')", name='check_rol_valido'),
+        Index('idx_usuario_rol_usuario_rol_activo', 'usuario_id', 'rol', 'activo'),
     )
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""
+Perfilador de consultas SQL por request, con detección de N+1.
+
+Opcional: con SQL_PERFIL_ACTIVO=true se perfila cada request; en
+desarrollo también se puede pedir por request con la cabecera
+`X-Perfil-SQL: 1`. Se apoya en los eventos de cursor de
+`instrumentar_engine` (app/metricas.py):
+
+- Cada sentencia se normaliza a su "forma" (parámetros, literales y listas
+  IN reemplazados por ?) y se cuenta y mide por forma
+- Una forma repetida SQL_PERFIL_UMBRAL_N1 veces o más en el mismo request
+  es sospecha de N+1 (consulta dentro de un bucle); se guarda el archivo y
+  línea de la aplicación que la ejecutó por primera vez
+- La respuesta lleva `Server-Timing: db;dur=<ms>;desc="<n> consultas"`
+- Los requests con sospechas o con más de SQL_PERFIL_MAX_CONSULTAS
+  consultas se registran en el log (warning) y en un reporte en memoria
+  (GET /api/admin/metricas/sql), y suman en la métrica
+  bookismart_sql_sospechas_n1_total por ruta
+"""
+
+import os
+import re
+import sys
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app import settings
+from app.logs.logger import logger
+from app.metricas import MedicionRequest, registro_metricas
+
+
+_DIR_APP = os.path.dirname(os.path.abspath(__file__))
+_ARCHIVOS_INTERNOS = {
+    os.path.join(_DIR_APP, "metricas.py"),
+    os.path.join(_DIR_APP, "perfilador_sql.py"),
+}
+
+_NORMALIZACIONES = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"%\(\w+\)s|\$\d+|%s"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), "(?, ...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+sospechas_n1_total = registro_metricas.contador(
+    "bookismart_sql_sospechas_n1_total", "Formas de consulta repetidas en un request (posible N+1)", ("ruta",)
+)
+
+
+def normalizar_sentencia(sentencia: str) -> str:
+    """Forma de la sentencia, sin valores concretos."""
+    for patron, reemplazo in _NORMALIZACIONES:
+        sentencia = patron.sub(reemplazo, sentencia)
+    return sentencia.strip()
+
+
+def _origen() -> Optional[str]:
+    """Primer frame de la aplicación (fuera de este módulo) en la pila."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        archivo = frame.f_code.co_filename
+        if archivo.startswith(_DIR_APP) and archivo not in _ARCHIVOS_INTERNOS:
+            relativo = os.path.relpath(archivo, os.path.dirname(_DIR_APP))
+            return f"{relativo}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return None
+
+
+class PerfilSQL:
+    """Consultas de un request agrupadas por forma."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # forma -> [veces, segundos, origen]
+        self.formas: Dict[str, List[Any]] = {}
+
+    def registrar(self, sentencia: str, segundos: float) -> None:
+        forma = normalizar_sentencia(sentencia)
+        with self._lock:
+            datos = self.formas.get(forma)
+            if datos is not None:
+                datos[0] += 1
+                datos[1] += segundos
+                return
+        origen = _origen()
+        with self._lock:
+            datos = self.formas.setdefault(forma, [0, 0.0, origen])
+            datos[0] += 1
+            datos[1] += segundos
+
+    def sospechas_n1(self, umbral: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            formas = list(self.formas.items())
+        sospechas = [
+            {"forma": forma[:500], "veces": veces, "ms": round(segundos * 1000, 2), "origen": origen}
+            for forma, (veces, segundos, origen) in formas
+            if veces >= umbral
+        ]
+        return sorted(sospechas, key=lambda s: s["veces"], reverse=True)
+
+
+_reportes: Deque[Dict[str, Any]] = deque(maxlen=settings.SQL_PERFIL_REPORTES)
+
+
+def perfil_activo(headers: Dict[bytes, bytes]) -> bool:
+    """True si este request se debe perfilar."""
+    if settings.SQL_PERFIL_ACTIVO:
+        return True
+    return settings.ENVIRONMENT == "development" and headers.get(b"x-perfil-sql") == b"1"
+
+
+def server_timing_db(medicion: MedicionRequest) -> bytes:
+    return f'db;dur={medicion.segundos_db * 1000:.1f};desc="{medicion.consultas} consultas"'.encode("latin-1")
+
+
+def reportar_perfil(metodo: str, ruta: str, status: int, medicion: MedicionRequest) -> None:
+    """Registra el request si tiene sospechas de N+1 o demasiadas consultas."""
+    perfil: Optional[PerfilSQL] = medicion.perfil
+    if perfil is None:
+        return
+
+    sospechas = perfil.sospechas_n1(settings.SQL_PERFIL_UMBRAL_N1)
+    if not sospechas and medicion.consultas <= settings.SQL_PERFIL_MAX_CONSULTAS:
+        return
+
+    if sospechas:
+        sospechas_n1_total.inc(ruta, cantidad=len(sospechas))
+
+    reporte = {
+        "metodo": metodo,
+        "ruta": ruta,
+        "status": status,
+        "consultas": medicion.consultas,
+        "db_ms": round(medicion.segundos_db * 1000, 2),
+        "formas_distintas": len(perfil.formas),
+        "sospechas_n1": sospechas,
+    }
+    _reportes.append(reporte)
+    logger.warning(
+        "Perfil SQL %s %s: %d consultas, %d sospechas de N+1",
+        metodo, ruta, medicion.consultas, len(sospechas),
+        extra=reporte,
+    )
+
+
+def reporte_sql() -> Dict[str, Any]:
+    """Últimos requests marcados por el perfilador en este proceso."""
+    return {
+        "activo": settings.SQL_PERFIL_ACTIVO,
+        "umbral_n1": settings.SQL_PERFIL_UMBRAL_N1,
+        "max_consultas": settings.SQL_PERFIL_MAX_CONSULTAS,
+        "reportes": list(reversed(_reportes)),
+    }
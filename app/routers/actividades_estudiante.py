@@ -1,4 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List
@@ -10,6 +12,7 @@ from app.modelos import (
     RespuestaPregunta, NivelEstudiante, Estudiante,
     HistorialPuntos
 )
+from app.servicios.actividad import consulta_historial_actividades
 from app.servicios.seguridad import obtener_usuario_actual
 
 router = APIRouter(prefix="/actividades", tags=["actividades-estudiante"])
@@ -40,6 +43,63 @@ class ResponderActividadResponse(BaseModel):
 
 
 
+def _es_respuesta_correcta(pregunta: Pregunta, respuesta: str) -> bool:
+    respuesta_estudiante = respuesta.strip().lower()
+    respuesta_correcta = (pregunta.respuesta_correcta or "").strip().lower()
+
+    if pregunta.tipo_respuesta in ("multiple_choice", "verdadero_falso"):
+        return respuesta_estudiante == respuesta_correcta
+
+    if pregunta.tipo_respuesta == "texto_libre":
+        return respuesta_estudiante in respuesta_correcta or respuesta_correcta in respuesta_estudiante
+
+    return False
+
+
+def _sumar_xp_nivel(db: Session, estudiante_id: int, xp_ganado: int) -> None:
+    """
+    Suma XP al nivel del estudiante con un único UPSERT atómico.
+
+    La fila queda bloqueada hasta el commit, así que la subida de nivel
+    (poco frecuente) se aplica con un segundo UPDATE sin carreras.
+    """
+    stmt = pg_insert(NivelEstudiante).values(
+        estudiante_id=estudiante_id,
+        nivel_actual=1,
+        puntos_nivel_actual=xp_ganado,
+        puntos_para_siguiente_nivel=500,
+        racha_actual=0,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NivelEstudiante.estudiante_id],
+        set_={"puntos_nivel_actual": NivelEstudiante.puntos_nivel_actual + xp_ganado},
+    ).returning(
+        NivelEstudiante.id,
+        NivelEstudiante.nivel_actual,
+        NivelEstudiante.puntos_nivel_actual,
+        NivelEstudiante.puntos_para_siguiente_nivel,
+    )
+    nivel_id, nivel_actual, puntos, puntos_siguiente = db.execute(stmt).one()
+
+    if puntos < puntos_siguiente:
+        return
+
+    # Verificar si sube de nivel
+    while puntos >= puntos_siguiente:
+        puntos -= puntos_siguiente
+        nivel_actual += 1
+        puntos_siguiente = nivel_actual * 500
+
+    db.query(NivelEstudiante).filter(NivelEstudiante.id == nivel_id).update(
+        {
+            NivelEstudiante.nivel_actual: nivel_actual,
+            NivelEstudiante.puntos_nivel_actual: puntos,
+            NivelEstudiante.puntos_para_siguiente_nivel: puntos_siguiente,
+        },
+        synchronize_session=False,
+    )
+
+
 @router.post("/responder", response_model=ResponderActividadResponse)
 def responder_actividad(
     request: ResponderActividadRequest,
@@ -83,93 +143,52 @@ def responder_actividad(
     db.add(progreso)
     db.flush()  
     
-  
+
+    # Todas las preguntas de la actividad en una sola consulta
+    preguntas = {
+        p.id: p
+        for p in db.query(Pregunta).filter(Pregunta.actividad_id == actividad.id)
+    }
+
     puntos_totales = 0
     puntos_maximos = 0
     correctas = 0
     incorrectas = 0
-    
+    respuestas_db = []
+
     for resp in request.respuestas:
-        # Obtener la pregunta
-        pregunta = db.query(Pregunta).filter(
-            Pregunta.id == resp.pregunta_id
-        ).first()
-        
+        pregunta = preguntas.get(resp.pregunta_id)
         if not pregunta:
             continue
-        
+
         puntos_maximos += pregunta.puntuacion
-        
-        
-        es_correcta = False
-        puntos_obtenidos = 0
-        
-       
-        respuesta_estudiante = resp.respuesta_estudiante.strip().lower()
-        respuesta_correcta = (pregunta.respuesta_correcta or "").strip().lower()
-        
-        if pregunta.tipo_respuesta == "multiple_choice":
-            es_correcta = respuesta_estudiante == respuesta_correcta
-        
-        elif pregunta.tipo_respuesta == "verdadero_falso":
-            es_correcta = respuesta_estudiante == respuesta_correcta
-        
-        elif pregunta.tipo_respuesta == "texto_libre":
-       
-
-            es_correcta = respuesta_estudiante in respuesta_correcta or respuesta_correcta in respuesta_estudiante
-        
+
+        es_correcta = _es_respuesta_correcta(pregunta, resp.respuesta_estudiante)
+        puntos_obtenidos = pregunta.puntuacion if es_correcta else 0
+
         if es_correcta:
-            puntos_obtenidos = pregunta.puntuacion
             puntos_totales += puntos_obtenidos
             correctas += 1
         else:
             incorrectas += 1
-        
-        # Guardar la respuesta
-        respuesta_db = RespuestaPregunta(
-            progreso_id=progreso.id,
-            pregunta_id=pregunta.id,
-            respuesta_estudiante=resp.respuesta_estudiante,
-            correcta=es_correcta,
-            puntuacion_obtenida=puntos_obtenidos
-        )
-        db.add(respuesta_db)
-    
-  
+
+        respuestas_db.append({
+            "progreso_id": progreso.id,
+            "pregunta_id": pregunta.id,
+            "respuesta_estudiante": resp.respuesta_estudiante,
+            "correcta": es_correcta,
+            "puntuacion_obtenida": puntos_obtenidos,
+        })
+
+    if respuestas_db:
+        db.execute(insert(RespuestaPregunta), respuestas_db)
+
     progreso.puntuacion = float(puntos_totales)
     progreso.errores_cometidos = incorrectas
-    
 
     xp_ganado = puntos_totales * 10
-    
+    _sumar_xp_nivel(db, request.estudiante_id, xp_ganado)
 
-    nivel = db.query(NivelEstudiante).filter(
-        NivelEstudiante.estudiante_id == request.estudiante_id
-    ).first()
-    
-    if not nivel:
-       
-        nivel = NivelEstudiante(
-            estudiante_id=request.estudiante_id,
-            nivel_actual=1,
-            puntos_nivel_actual=0,
-            puntos_para_siguiente_nivel=500,
-            racha_actual=0
-        )
-        db.add(nivel)
-        db.flush()
-    
- 
-    nivel.puntos_nivel_actual += xp_ganado
-    
-    # Verificar si sube de nivel
-    while nivel.puntos_nivel_actual >= nivel.puntos_para_siguiente_nivel:
-        nivel.puntos_nivel_actual -= nivel.puntos_para_siguiente_nivel
-        nivel.nivel_actual += 1
-        nivel.puntos_para_siguiente_nivel = nivel.nivel_actual * 500
-    
-    
     historial = HistorialPuntos(
         estudiante_id=request.estudiante_id,
         puntos=xp_ganado,
@@ -243,9 +262,7 @@ def obtener_historial_actividades(
 ):
     """Obtener todas las actividades completadas por un estudiante"""
     
-    progresos = db.query(ProgresoActividad).filter(
-        ProgresoActividad.estudiante_id == estudiante_id
-    ).order_by(ProgresoActividad.fecha_completacion.desc()).all()
+    progresos = consulta_historial_actividades(db, estudiante_id).all()
     
     return [
         {
@@ -1,17 +1,22 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from app.config import get_db
+from app.config import get_db, get_read_db, settings as db_settings, fijar_statement_timeout
+from app.metricas_pool import metricas_pools
+from app.perfilador_sql import reporte_sql
+from app.servicios.monitor_sistema import monitor_sistema
 from app.servicios.seguridad import requiere_admin
 from app.modelos import Usuario
 from app.esquemas.dashboard import DashboardStats
 from app.servicios.dashboard import obtener_estadisticas_dashboard
+from app.servicios.hash_contrasenas import metricas_hash
+from app.servicios.cola_correos import estado_cola_correos
 
 router = APIRouter(prefix="/admin", tags=["Admin Dashboard"])
 
 @router.get("/dashboard", response_model=DashboardStats)
 def obtener_dashboard(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     admin: Usuario = Depends(requiere_admin)  
 ):
     """
@@ -22,4 +27,72 @@ def obtener_dashboard(
     Returns:
         DashboardStats: Estadísticas generales del sistema
     """
+    fijar_statement_timeout(db, db_settings.DB_STATEMENT_TIMEOUT_REPORTES_MS)
     return obtener_estadisticas_dashboard(db)
+
+
+@router.get("/metricas/hash")
+def obtener_metricas_hash(
+    admin: Usuario = Depends(requiere_admin)
+):
+    """
+    Tiempos de hashing de contraseñas de este proceso (por operación),
+    rechazos por cola llena y rehashes por cambio de política.
+
+    Requiere rol: admin
+    """
+    return metricas_hash()
+
+
+@router.get("/metricas/pool")
+def obtener_metricas_pool(
+    admin: Usuario = Depends(requiere_admin)
+):
+    """
+    Estado de los pools de conexiones de este proceso: conexiones en uso,
+    libres y overflow, esperas de checkout y timeouts por pool agotado.
+
+    Requiere rol: admin
+    """
+    return metricas_pools()
+
+
+@router.get("/metricas/correos")
+def obtener_metricas_correos(
+    db: Session = Depends(get_db),
+    admin: Usuario = Depends(requiere_admin)
+):
+    """
+    Correos de la cola de salida por estado (pendiente, enviado, fallido).
+
+    Requiere rol: admin
+    """
+    return estado_cola_correos(db)
+
+
+@router.get("/metricas/sql")
+def obtener_metricas_sql(
+    admin: Usuario = Depends(requiere_admin)
+):
+    """
+    Últimos requests de este proceso marcados por el perfilador SQL
+    (sospechas de N+1 o demasiadas consultas), con la forma de cada consulta
+    repetida y la línea de la aplicación que la ejecuta.
+
+    Requiere rol: admin
+    """
+    return reporte_sql()
+
+
+@router.get("/sistema/estado")
+def obtener_estado_sistema(
+    admin: Usuario = Depends(requiere_admin)
+):
+    """
+    Estado completo del servidor, la base de datos, las librerías de audio
+    y los modelos de IA, desde la última muestra del monitor (se refresca
+    cada MONITOR_INTERVALO_SEGUNDOS en segundo plano).
+
+    Requiere rol: admin
+    """
+    return monitor_sistema.obtener_estado_sistema()
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from app.config import get_db
 from app.servicios.seguridad import requiere_admin
@@ -16,6 +17,7 @@ from app.servicios.docente_admin import (
     restaurar_docente_admin,
 )
 from app.servicios.auth import configurar_cuenta_docente
+from app.servicios.importacion_masiva import importar_docentes, leer_csv
 
 from pydantic import BaseModel
 
@@ -32,6 +34,34 @@ def crear_docente_route(
     return crear_docente_admin(db, data)
 
 
+@router.post("/importar")
+def importar_docentes_route(
+    filas: List[Dict[str, Any]],
+    db: Session = Depends(get_db),
+    admin=Depends(requiere_admin),
+):
+    """
+    Alta masiva de docentes desde JSON: lista de objetos con los campos de
+    POST /admin/docentes. Si alguna fila es inválida no se crea ninguno.
+    """
+    return importar_docentes(db, filas)
+
+
+@router.post("/importar-csv")
+async def importar_docentes_csv_route(
+    archivo: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    admin=Depends(requiere_admin),
+):
+    """
+    Alta masiva de docentes desde CSV con encabezados
+    (email, nombre, apellido, especialidad, grado_academico, institucion,
+    fecha_contratacion).
+    """
+    filas = leer_csv(await archivo.read())
+    return await run_in_threadpool(importar_docentes, db, filas)
+
+
 @router.get("", response_model=List[DocenteAdminResponse])
 def listar_docentes_route(
     activo: Optional[bool] = None,
@@ -1,25 +1,35 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.config import get_db
 from app.servicios.seguridad import requiere_admin
+from app.servicios.paginacion import paginar_keyset, publicar_cursor, siguiente_cursor
 from app.modelos import Estudiante, Usuario
 
 router = APIRouter(prefix="/admin", tags=["Admin Estudiantes"])
 
 @router.get("/estudiantes")
 def listar_estudiantes_admin(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     admin: Usuario = Depends(requiere_admin)  
 ):
     """
-    Lista todos los estudiantes del sistema (vista administrativa).
+    Lista los estudiantes del sistema (vista administrativa), paginados por cursor.
 
     Requiere rol: admin
 
+    La siguiente página se obtiene enviando la cabecera `X-Next-Cursor`
+    como parámetro `cursor`.
+
     Returns:
-        List[Estudiante]: Lista de todos los estudiantes
+        List[Estudiante]: Página de estudiantes ordenada por id
     """
-    estudiantes = db.query(Estudiante).all()
+    estudiantes = paginar_keyset(
+        db.query(Estudiante), (Estudiante.id,), cursor, limit
+    ).all()
+    publicar_cursor(response, siguiente_cursor(estudiantes, (Estudiante.id,), limit))
     return estudiantes
@@ -1,15 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.esquemas import auditoria as schemas
 from app.servicios import auditoria as services
+from app.servicios.paginacion import publicar_cursor, siguiente_cursor
+from app.modelos import Auditoria
 from app.config import get_db
 
 router = APIRouter(prefix="/auditoria", tags=["Auditoría"])
 
 @router.get("/", response_model=List[schemas.AuditoriaResponse])
-def listar_auditoria(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return services.obtener_auditoria(db, skip, limit)
+def listar_auditoria(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    registros = services.obtener_auditoria(db, skip, limit, cursor)
+    publicar_cursor(response, siguiente_cursor(registros, (Auditoria.id,), limit))
+    return registros
 
 @router.get("/{auditoria_id}", response_model=schemas.AuditoriaResponse)
 def obtener_auditoria(auditoria_id: int, db: Session = Depends(get_db)):
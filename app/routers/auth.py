@@ -30,10 +30,18 @@ from app.servicios.auth import (
 from app.servicios.seguridad import (
     obtener_usuario_actual,
     crear_token_acceso,
+    claims_principal,
     asignar_rol
 )
 
 from app.servicios.usuario_builder import build_usuario_response
+from app.servicios.limitador_login import (
+    verificar_limite_login,
+    registrar_login_fallido,
+    registrar_login_exitoso,
+)
+from app.servicios.registro_auditoria import ip_cliente
+from app.servicios.cache_principal import cargar_principal, invalidar_principal
 
 
 router = APIRouter(prefix="/auth", tags=["autenticacion"])
@@ -53,22 +61,38 @@ def registro(usuario: UsuarioCreate, db: Session = Depends(get_db)):
 
 @router.post("/login", response_model=Token)
 def login(
+    req: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
+    # Antes de tocar la BD o bcrypt
+    verificar_limite_login(req, form_data.username)
+
     # autenticar_usuario ahora puede lanzar HTTPException 403
-    usuario = autenticar_usuario(db, form_data.username, form_data.password)
+    try:
+        usuario = autenticar_usuario(db, form_data.username, form_data.password)
+    except HTTPException as e:
+        # 403: cuenta bloqueada/inactiva; un 503 del pool de hashing no es un fallo
+        if e.status_code == status.HTTP_403_FORBIDDEN:
+            registrar_login_fallido(req, form_data.username)
+        raise
 
     if not usuario:
+        registrar_login_fallido(req, form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales incorrectas",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    registrar_login_exitoso(req, form_data.username)
+
+    # Roles e ids de perfil viajan en el token (autorización sin consultar la BD)
+    principal = cargar_principal(db, usuario.email)
+
     access_token_expires = timedelta(minutes=30)
     access_token = crear_token_acceso(
-        data={"sub": usuario.email, "id": usuario.id},
+        data=claims_principal(principal),
         expires_delta=access_token_expires
     )
 
@@ -115,16 +139,7 @@ def reset_password(
     db: Session = Depends(get_db)
 ):
 
-    # Obtener IP del cliente
-    ip_address = None
-    if hasattr(req, 'client') and req.client:
-        ip_address = req.client.host
-    elif 'x-forwarded-for' in req.headers:
-        ip_address = req.headers['x-forwarded-for'].split(',')[0].strip()
-    elif 'x-real-ip' in req.headers:
-        ip_address = req.headers['x-real-ip']
-
-    return resetear_password(db, request.email, ip_address)
+    return resetear_password(db, request.email, ip_cliente(req))
 
 
 @router.post("/confirm-reset-password")
@@ -141,26 +156,22 @@ def me(
     db: Session = Depends(get_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual),
 ):
-    roles_rows = (
-        db.query(UsuarioRol.rol)
-        .filter(
-            UsuarioRol.usuario_id == usuario_actual.id,
-            UsuarioRol.activo == True,
-        )
-        .all()
-    )
+    roles = sorted(usuario_actual.roles)
 
-    roles = [r[0] for r in roles_rows]
+    # Los claims del token no traen fechas; se leen del registro
+    usuario = db.get(Usuario, usuario_actual.id)
+    if usuario is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
     return UsuarioResponse(
-        id=usuario_actual.id,
-        email=usuario_actual.email,
-        nombre=usuario_actual.nombre,
-        apellido=usuario_actual.apellido,
-        activo=usuario_actual.activo,
-        fecha_creacion=usuario_actual.fecha_creacion,
-        ultimo_login=usuario_actual.ultimo_login,
-        bloqueado=usuario_actual.bloqueado,
+        id=usuario.id,
+        email=usuario.email,
+        nombre=usuario.nombre,
+        apellido=usuario.apellido,
+        activo=usuario.activo,
+        fecha_creacion=usuario.fecha_creacion,
+        ultimo_login=usuario.ultimo_login,
+        bloqueado=usuario.bloqueado,
         roles=roles,
     )
 
@@ -186,6 +197,7 @@ def registro_padre(datos: UsuarioCreate, db: Session = Depends(get_db)):
             db.add(padre)
             db.commit()
             db.refresh(padre)
+            invalidar_principal(usuario.id)
 
         return build_usuario_response(db, usuario)
 
@@ -200,6 +212,7 @@ def registro_padre(datos: UsuarioCreate, db: Session = Depends(get_db)):
     db.add(nuevo_padre)
     db.commit()
     db.refresh(nuevo_padre)
+    invalidar_principal(nuevo_usuario.id)
 
     return build_usuario_response(db, nuevo_usuario)
 
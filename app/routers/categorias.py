@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
 from app.config import get_db
 from app.servicios.seguridad import requiere_docente
+from app.servicios.cache_respuestas import CATEGORIAS, invalidar_cache, responder_cacheado
 from app.modelos import ContenidoLectura, CategoriaLectura, Curso, Docente, UsuarioRol
 
 from pydantic import BaseModel, validator
@@ -72,16 +73,20 @@ class CategoriaResponse(CategoriaBase):
 
 @router.get("/", response_model=list[CategoriaResponse])
 def listar_categorias(
+    request: Request,
     db: Session = Depends(get_db),
     docente=Depends(requiere_docente)
 ):
-    categorias = (
-        db.query(CategoriaLectura)
-        .filter(CategoriaLectura.activo == True)
-        .order_by(CategoriaLectura.nombre.asc())
-        .all()
-    )
-    return categorias
+    def generar(cabeceras):
+        categorias = (
+            db.query(CategoriaLectura)
+            .filter(CategoriaLectura.activo == True)
+            .order_by(CategoriaLectura.nombre.asc())
+            .all()
+        )
+        return [CategoriaResponse.model_validate(c) for c in categorias]
+
+    return responder_cacheado(request, (CATEGORIAS,), generar)
 
 
 
@@ -112,6 +117,7 @@ def crear_categoria(
     db.add(categoria)
     db.commit()
     db.refresh(categoria)
+    invalidar_cache(CATEGORIAS)
 
     return categoria
 
@@ -159,6 +165,7 @@ def actualizar_categoria(
 
     db.commit()
     db.refresh(categoria)
+    invalidar_cache(CATEGORIAS)
 
     return categoria
 
@@ -178,6 +185,7 @@ def eliminar_categoria(
 
     categoria.activo = False
     db.commit()
+    invalidar_cache(CATEGORIAS)
 
     return {"mensaje": "Categoría eliminada correctamente"}
 
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.config import get_db
 from app.esquemas.contenido import (
@@ -16,7 +16,11 @@ from app.servicios.contenido import (
     crear_audio_referencia, obtener_audios_contenido
 )
 from app.servicios.seguridad import obtener_usuario_actual
-from app.modelos import Usuario
+from app.servicios.paginacion import CABECERA_CURSOR, siguiente_cursor
+from app.servicios.cache_respuestas import (
+    CATEGORIAS, CONTENIDO, CURSOS, responder_cacheado
+)
+from app.modelos import Usuario, ContenidoLectura
 
 router = APIRouter(prefix="/contenido", tags=["contenido"])
 
@@ -32,17 +36,27 @@ def crear_lectura(
 
 @router.get("/lecturas", response_model=List[ContenidoLecturaResponse])
 def listar_lecturas(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     curso_id: int = None,
     categoria_id: int = None,
     docente_id: int = None,
     activo: bool = True,
     db: Session = Depends(get_db)
 ):
-    """Listar contenidos de lectura"""
-    return obtener_contenidos(db, skip=skip, limit=limit, curso_id=curso_id, 
-                            categoria_id=categoria_id, docente_id=docente_id, activo=activo)
+    """Listar contenidos de lectura (cacheado, con ETag)"""
+    def generar(cabeceras):
+        contenidos = obtener_contenidos(db, skip=skip, limit=limit, curso_id=curso_id, 
+                                        categoria_id=categoria_id, docente_id=docente_id, activo=activo,
+                                        cursor=cursor)
+        cursor_siguiente = siguiente_cursor(contenidos, (ContenidoLectura.id,), limit)
+        if cursor_siguiente:
+            cabeceras[CABECERA_CURSOR] = cursor_siguiente
+        return [ContenidoLecturaResponse.model_validate(c) for c in contenidos]
+
+    return responder_cacheado(request, (CONTENIDO, CURSOS, CATEGORIAS), generar)
 
 @router.get("/lecturas/{contenido_id}", response_model=ContenidoLecturaResponse)
 def obtener_lectura(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -28,9 +28,12 @@ from app.servicios.curso import (
     obtener_estudiantes_curso,
     obtener_cursos_estudiante,
 )
+from app.servicios.paginacion import publicar_cursor, siguiente_cursor
+from app.servicios.cache_respuestas import CURSOS, responder_cacheado
 
 from app.servicios.seguridad import obtener_usuario_actual
-from app.modelos import Usuario, Docente
+from app.servicios.cache_principal import invalidar_principal
+from app.modelos import Usuario, Docente, Curso
 
 router = APIRouter(prefix="/cursos", tags=["Cursos"])
 
@@ -61,6 +64,7 @@ def crear_nuevo_curso(
         db.add(docente)
         db.commit()
         db.refresh(docente)
+        invalidar_principal(usuario_actual.id)
 
    
     curso.docente_id = docente.id
@@ -71,8 +75,10 @@ def crear_nuevo_curso(
 
 @router.get("/", response_model=List[CursoResponse])
 def listar_cursos(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     docente_id: Optional[int] = None,
     activo: Optional[bool] = None,
     db: Session = Depends(get_db),
@@ -93,18 +99,22 @@ def listar_cursos(
             return []
         docente_id = docente.id
 
-    return obtener_cursos(
+    cursos = obtener_cursos(
         db,
         skip=skip,
         limit=limit,
         docente_id=docente_id,
         activo=activo,
+        cursor=cursor,
     )
+    publicar_cursor(response, siguiente_cursor(cursos, (Curso.id,), limit))
+    return cursos
 
 
 
 @router.get("/activos", response_model=List[CursoResponse])
 def listar_cursos_activos(
+    request: Request,
     docente_id: Optional[int] = None,
     db: Session = Depends(get_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual),
@@ -113,17 +123,23 @@ def listar_cursos_activos(
     Lista SOLO cursos activos.
     Úsala en combobox, selects, asignaciones, etc.
     """
-  
-    if docente_id is None:
-        docente = (
-            db.query(Docente)
-            .filter(Docente.usuario_id == usuario_actual.id)
-            .first()
-        )
-        if docente:
-            docente_id = docente.id
-
-    return obtener_cursos_activos(db, docente_id)
+    # Sin docente_id el resultado depende del docente del usuario actual
+    alcance = "global" if docente_id is not None else f"usuario:{usuario_actual.id}"
+
+    def generar(cabeceras):
+        id_docente = docente_id
+        if id_docente is None:
+            docente = (
+                db.query(Docente)
+                .filter(Docente.usuario_id == usuario_actual.id)
+                .first()
+            )
+            if docente:
+                id_docente = docente.id
+
+        return [CursoResponse.model_validate(c) for c in obtener_cursos_activos(db, id_docente)]
+
+    return responder_cacheado(request, (CURSOS,), generar, alcance=alcance)
 
 
 
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
-from typing import List
+from typing import Any, Dict, List
 
 from app.config import get_db
 
@@ -12,6 +13,9 @@ from app.modelos import (
 
 
 from app.servicios.seguridad import obtener_usuario_actual
+from app.servicios.cache_principal import invalidar_principal
+from app.servicios.revocacion_tokens import revocar_tokens_usuario
+from app.servicios.importacion_masiva import importar_estudiantes, leer_csv
 
 
 from app.esquemas.docente import DocenteCreate, DocenteResponse, DocenteUpdate
@@ -30,6 +34,7 @@ def obtener_o_crear_docente(db: Session, usuario_id: int):
         db.add(docente)
         db.commit()
         db.refresh(docente)
+        invalidar_principal(usuario_id)
 
     return docente
 
@@ -182,6 +187,38 @@ def crear_estudiante_docente(
 
 
 
+@router.post("/estudiantes/importar")
+def importar_estudiantes_docente(
+    filas: List[Dict[str, Any]],
+    db: Session = Depends(get_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+):
+    """
+    Alta masiva de estudiantes desde JSON: lista de objetos con los campos
+    de POST /docentes/estudiantes. Si alguna fila es inválida no se crea ninguno.
+    """
+    docente = obtener_o_crear_docente(db, usuario_actual.id)
+    return importar_estudiantes(db, docente.id, filas)
+
+
+
+@router.post("/estudiantes/importar-csv")
+async def importar_estudiantes_docente_csv(
+    archivo: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+):
+    """
+    Alta masiva de estudiantes desde CSV con encabezados
+    (nombre, apellido, fecha_nacimiento, nivel_educativo,
+    necesidades_especiales, curso_id).
+    """
+    filas = leer_csv(await archivo.read())
+    docente = await run_in_threadpool(obtener_o_crear_docente, db, usuario_actual.id)
+    return await run_in_threadpool(importar_estudiantes, db, docente.id, filas)
+
+
+
 @router.get("/estudiantes")
 def listar_estudiantes_docente(
     db: Session = Depends(get_db),
@@ -359,6 +396,7 @@ def crear_nuevo_docente(
     db.add(nuevo)
     db.commit()
     db.refresh(nuevo)
+    invalidar_principal(docente.usuario_id)
     return nuevo
 
 
@@ -385,11 +423,14 @@ def actualizar_docente_endpoint(
     if not docente:
         raise HTTPException(404, "Docente no encontrado")
 
-    for campo, valor in datos.dict(exclude_unset=True).items():
+    cambios = datos.dict(exclude_unset=True)
+    for campo, valor in cambios.items():
         setattr(docente, campo, valor)
 
     db.commit()
     db.refresh(docente)
+    if "activo" in cambios:
+        revocar_tokens_usuario(db, docente.usuario_id)
     return docente
 
 
@@ -403,7 +444,9 @@ def eliminar_docente_endpoint(
     if not docente:
         raise HTTPException(404, "Docente no encontrado")
 
+    usuario_id = docente.usuario_id
     db.delete(docente)
     db.commit()
+    revocar_tokens_usuario(db, usuario_id)
 
     return {"mensaje": "Docente eliminado correctamente"}
@@ -4,31 +4,48 @@ from sqlalchemy import func, desc
 from typing import List, Optional
 from datetime import datetime, timedelta
 
-from app.config import get_db
+from app.config import SessionLocal, get_read_db
 from app.modelos import (
     Usuario, Docente, Estudiante, ProgresoActividad, 
     Actividad, EvaluacionLectura, ContenidoLectura,
     EstudianteCurso, Curso
 )
 from app.servicios.seguridad import obtener_usuario_actual
+from app.servicios.cache_principal import invalidar_principal
+from app.servicios.estadisticas import consulta_lecturas_aprobadas
 
 router = APIRouter(prefix="/docentes/progreso", tags=["Progreso Docentes"])
 
 
 def obtener_o_crear_docente(db: Session, usuario_id: int):
-    """Obtiene o crea el registro de docente para el usuario actual"""
+    """
+    Obtiene o crea el registro de docente para el usuario actual.
+
+    `db` es la sesión de lectura del endpoint; solo si el docente no existe
+    se abre una sesión del primario para crearlo.
+    """
     docente = db.query(Docente).filter(Docente.usuario_id == usuario_id).first()
-    if not docente:
-        docente = Docente(usuario_id=usuario_id, activo=True)
-        db.add(docente)
-        db.commit()
-        db.refresh(docente)
-    return docente
+    if docente:
+        return docente
+
+    db_escritura = SessionLocal()
+    try:
+        # La réplica puede ir atrasada: confirmar en el primario antes de crear
+        docente = db_escritura.query(Docente).filter(Docente.usuario_id == usuario_id).first()
+        if not docente:
+            docente = Docente(usuario_id=usuario_id, activo=True)
+            db_escritura.add(docente)
+            db_escritura.commit()
+            db_escritura.refresh(docente)
+            invalidar_principal(usuario_id)
+        return docente
+    finally:
+        db_escritura.close()
 
 
 @router.get("/resumen")
 def obtener_resumen_progreso_general(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """
@@ -106,14 +123,7 @@ def obtener_resumen_progreso_general(
         ) or 0
         
         # Lecturas completadas (con precisión >= 70%)
-        lecturas_count = (
-            db.query(func.count(EvaluacionLectura.contenido_id.distinct()))
-            .filter(
-                EvaluacionLectura.estudiante_id == est.id,
-                EvaluacionLectura.precision_palabras >= 70
-            )
-            .scalar()
-        ) or 0
+        lecturas_count = consulta_lecturas_aprobadas(db, est.id).scalar() or 0
         
         # Promedio de actividades
         promedio_act = (
@@ -193,7 +203,7 @@ def obtener_resumen_progreso_general(
 @router.get("/estudiante/{estudiante_id}")
 def obtener_progreso_detallado_estudiante(
     estudiante_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """
@@ -354,7 +364,7 @@ def obtener_progreso_detallado_estudiante(
 def obtener_grafica_progreso(
     estudiante_id: int,
     periodo: str = "mes",  # "semana", "mes", "trimestre"
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 from datetime import date
 
-from app.config  import get_db
+from app.config import get_read_db
 from app.esquemas.estadisticas import (
     EstadisticasEstudiante, ProgresoCurso, ReporteEvaluacion,
     TendenciaProgreso, DashboardDocente
@@ -21,7 +21,7 @@ router = APIRouter(prefix="/estadisticas", tags=["estadisticas"])
 @router.get("/estudiante/{estudiante_id}", response_model=EstadisticasEstudiante)
 def obtener_estadisticas_estudiante_por_id(
     estudiante_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """Obtener estadísticas completas de un estudiante"""
@@ -30,7 +30,7 @@ def obtener_estadisticas_estudiante_por_id(
 @router.get("/cursos/{docente_id}", response_model=List[ProgresoCurso])
 def obtener_progreso_cursos_docente(
     docente_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """Obtener progreso de todos los cursos de un docente"""
@@ -40,7 +40,7 @@ def obtener_progreso_cursos_docente(
 def obtener_reportes_evaluacion_estudiante(
     estudiante_id: int,
     limite: int = 10,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """Obtener reportes de evaluaciones de un estudiante"""
@@ -50,7 +50,7 @@ def obtener_reportes_evaluacion_estudiante(
 def obtener_tendencias_progreso_estudiante(
     estudiante_id: int,
     dias: int = 30,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """Obtener tendencias de progreso de un estudiante"""
@@ -59,7 +59,7 @@ def obtener_tendencias_progreso_estudiante(
 @router.get("/dashboard/docente/{docente_id}", response_model=DashboardDocente)
 def obtener_dashboard_docente(
     docente_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """Obtener dashboard completo para docente"""
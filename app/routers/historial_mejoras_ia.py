@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.config import get_db
+from app.config import get_read_db
 from app.servicios.seguridad import obtener_usuario_actual, obtener_docente_actual
 from app.modelos import Usuario, Estudiante, Padre, Docente
 from app.modelos.historial_mejoras_ia import HistorialMejorasIA
@@ -20,7 +20,7 @@ router = APIRouter(
     response_model=List[HistorialMejorasIAResponse]
 )
 def obtener_mis_mejoras_ia(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     estudiante = (
@@ -46,7 +46,7 @@ def obtener_mis_mejoras_ia(
 )
 def obtener_mejoras_ia_hijo(
     estudiante_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual),
 ):
     """Mejoras IA (tutor) para vista padre."""
@@ -80,7 +80,7 @@ def obtener_mejoras_ia_hijo(
 )
 def obtener_mejoras_ia_estudiante_docente(
     estudiante_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     docente: Docente = Depends(obtener_docente_actual),
 ):
     """Mejoras IA (tutor) para vista docente."""
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
-import json
+from typing import Optional
 
-from app.config import get_db
+from app.config import get_read_db
 from app.servicios.seguridad import obtener_usuario_actual, obtener_docente_actual
-from app.modelos import Usuario, Estudiante, Padre, Docente, EjercicioPractica, EvaluacionLectura, ContenidoLectura
+from app.servicios.historial_practica_pronunciacion import obtener_historial_practicas
+from app.servicios.paginacion import publicar_cursor
+from app.modelos import Usuario, Estudiante, Padre, Docente
 
 router = APIRouter(
     prefix="/historial/practicas",
@@ -14,14 +14,33 @@ router = APIRouter(
 )
 
 
+def _responder_historial(
+    db: Session,
+    response: Response,
+    estudiante_id: int,
+    limite: Optional[int],
+    cursor: Optional[str],
+):
+    historial, siguiente = obtener_historial_practicas(
+        db, estudiante_id, limite=limite, cursor=cursor
+    )
+    publicar_cursor(response, siguiente)
+    return historial
+
 
 @router.get("/mis")
 def obtener_mis_practicas(
-    db: Session = Depends(get_db),
+    response: Response,
+    limite: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """
     ACTUALIZADO: Consulta ejercicio_practica en lugar de historial_practica_pronunciacion
+
+    Paginación opcional por cursor: enviar `limite` y, para las páginas
+    siguientes, el valor de la cabecera `X-Next-Cursor` como `cursor`.
     """
     estudiante = (
         db.query(Estudiante)
@@ -32,72 +51,17 @@ def obtener_mis_practicas(
     if not estudiante:
         raise HTTPException(404, "Estudiante no encontrado")
 
-   
-    ejercicios = (
-        db.query(EjercicioPractica)
-        .filter(EjercicioPractica.estudiante_id == estudiante.id)
-        .order_by(EjercicioPractica.fecha_creacion.desc())  
-        .all()
-    )
-
-  
-    historial = []
-    for ej in ejercicios:
-        
-        num_errores = 0
-        if ej.palabras_objetivo:
-            if isinstance(ej.palabras_objetivo, list):
-                num_errores = len(ej.palabras_objetivo)
-            elif isinstance(ej.palabras_objetivo, str):
-                try:
-                    palabras = json.loads(ej.palabras_objetivo)
-                    num_errores = len(palabras) if isinstance(palabras, list) else 0
-                except:
-                    num_errores = 0
-        
-        # Calcular puntuación basada en completado
-        puntuacion = 100 if ej.completado else 50
-        
-        # Datos de lectura (si existe evaluacion)
-        lectura_id = None
-        lectura_titulo = None
-        try:
-            if ej.evaluacion:
-                lectura_id = ej.evaluacion.contenido_id
-                if lectura_id:
-                    cont = db.query(ContenidoLectura).filter(ContenidoLectura.id == lectura_id).first()
-                    lectura_titulo = cont.titulo if cont else None
-        except Exception:
-            pass
-
-        historial.append({
-            "id": ej.id,
-            "estudiante_id": ej.estudiante_id,
-            "fecha": ej.fecha_creacion.isoformat() if ej.fecha_creacion else datetime.now().isoformat(),  
-            "puntuacion": puntuacion,
-            "errores_detectados": num_errores,
-            "errores_corregidos": 1 if ej.completado else 0,
-            "tiempo_practica": ej.intentos * 60 if ej.intentos else 0,  
-            "tipo_ejercicio": ej.tipo_ejercicio or "pronunciacion",
-            "completado": ej.completado,
-            "intentos": ej.intentos or 0,
-            "dificultad": ej.dificultad or 2,
-            # ✅ Detalle para historial (lo que el usuario pide ver)
-            "palabras_objetivo": ej.palabras_objetivo or [],
-            "texto_practica": ej.texto_practica or "",
-            "evaluacion_id": ej.evaluacion_id,
-            "lectura_id": lectura_id,
-            "lectura_titulo": lectura_titulo,
-        })
-
-    return historial
+    return _responder_historial(db, response, estudiante.id, limite, cursor)
 
 
 
 @router.get("/hijo/{estudiante_id}")
 def obtener_practicas_hijo(
     estudiante_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    limite: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """
@@ -124,70 +88,17 @@ def obtener_practicas_hijo(
     if not estudiante:
         raise HTTPException(403, "No autorizado")
 
- 
-    ejercicios = (
-        db.query(EjercicioPractica)
-        .filter(EjercicioPractica.estudiante_id == estudiante.id)
-        .order_by(EjercicioPractica.fecha_creacion.desc()) 
-        .all()
-    )
-
-    
-    historial = []
-    for ej in ejercicios:
-       
-        num_errores = 0
-        if ej.palabras_objetivo:
-            if isinstance(ej.palabras_objetivo, list):
-                num_errores = len(ej.palabras_objetivo)
-            elif isinstance(ej.palabras_objetivo, str):
-                try:
-                    palabras = json.loads(ej.palabras_objetivo)
-                    num_errores = len(palabras) if isinstance(palabras, list) else 0
-                except:
-                    num_errores = 0
-        
-       
-        puntuacion = 100 if ej.completado else 50
-        
-        lectura_id = None
-        lectura_titulo = None
-        try:
-            if ej.evaluacion:
-                lectura_id = ej.evaluacion.contenido_id
-                if lectura_id:
-                    cont = db.query(ContenidoLectura).filter(ContenidoLectura.id == lectura_id).first()
-                    lectura_titulo = cont.titulo if cont else None
-        except Exception:
-            pass
-
-        historial.append({
-            "id": ej.id,
-            "estudiante_id": ej.estudiante_id,
-            "fecha": ej.fecha_creacion.isoformat() if ej.fecha_creacion else datetime.now().isoformat(), 
-            "puntuacion": puntuacion,
-            "errores_detectados": num_errores,
-            "errores_corregidos": 1 if ej.completado else 0,
-            "tiempo_practica": ej.intentos * 60 if ej.intentos else 0,  
-            "tipo_ejercicio": ej.tipo_ejercicio or "pronunciacion",
-            "completado": ej.completado,
-            "intentos": ej.intentos or 0,
-            "dificultad": ej.dificultad or 2,
-            "palabras_objetivo": ej.palabras_objetivo or [],
-            "texto_practica": ej.texto_practica or "",
-            "evaluacion_id": ej.evaluacion_id,
-            "lectura_id": lectura_id,
-            "lectura_titulo": lectura_titulo,
-        })
-
-    return historial
+    return _responder_historial(db, response, estudiante.id, limite, cursor)
 
 
 @router.get("/docente/{estudiante_id}")
 @router.get("/estudiante/{estudiante_id}")
 def obtener_practicas_estudiante_docente(
     estudiante_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    limite: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     docente: Docente = Depends(obtener_docente_actual),
 ):
     """Historial de prácticas (zona práctica) para vista docente."""
@@ -204,49 +115,4 @@ def obtener_practicas_estudiante_docente(
     if not estudiante:
         raise HTTPException(403, "No autorizado")
 
-    ejercicios = (
-        db.query(EjercicioPractica)
-        .filter(EjercicioPractica.estudiante_id == estudiante.id)
-        .order_by(EjercicioPractica.fecha_creacion.desc())
-        .all()
-    )
-
-    historial = []
-    for ej in ejercicios:
-        num_errores = 0
-        if ej.palabras_objetivo:
-            num_errores = len(ej.palabras_objetivo) if isinstance(ej.palabras_objetivo, list) else 0
-
-        puntuacion = 100 if ej.completado else 50
-
-        lectura_id = None
-        lectura_titulo = None
-        try:
-            if ej.evaluacion:
-                lectura_id = ej.evaluacion.contenido_id
-                if lectura_id:
-                    cont = db.query(ContenidoLectura).filter(ContenidoLectura.id == lectura_id).first()
-                    lectura_titulo = cont.titulo if cont else None
-        except Exception:
-            pass
-
-        historial.append({
-            "id": ej.id,
-            "estudiante_id": ej.estudiante_id,
-            "fecha": ej.fecha_creacion.isoformat() if ej.fecha_creacion else datetime.now().isoformat(),
-            "puntuacion": puntuacion,
-            "errores_detectados": num_errores,
-            "errores_corregidos": 1 if ej.completado else 0,
-            "tiempo_practica": ej.intentos * 60 if ej.intentos else 0,
-            "tipo_ejercicio": ej.tipo_ejercicio or "pronunciacion",
-            "completado": ej.completado,
-            "intentos": ej.intentos or 0,
-            "dificultad": ej.dificultad or 2,
-            "palabras_objetivo": ej.palabras_objetivo or [],
-            "texto_practica": ej.texto_practica or "",
-            "evaluacion_id": ej.evaluacion_id,
-            "lectura_id": lectura_id,
-            "lectura_titulo": lectura_titulo,
-        })
-
-    return historial
+    return _responder_historial(db, response, estudiante.id, limite, cursor)
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
 
-from app.config import get_db
+from app.config import get_async_read_db
 from app.servicios.seguridad import obtener_usuario_actual, obtener_docente_actual
 from app.modelos import Usuario, Estudiante, Padre, Docente, EvaluacionLectura, ContenidoLectura
 
@@ -13,44 +14,24 @@ router = APIRouter(
 )
 
 
-
-@router.get("/mis")
-def obtener_mi_historial_pronunciacion(
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
-):
+async def _historial_evaluaciones(db: AsyncSession, estudiante_id: int) -> List[dict]:
     """
-    ACTUALIZADO: Consulta evaluacion_lectura en lugar de historial_pronunciacion
+    Evaluaciones del estudiante (más recientes primero) con el título de la
+    lectura, en una sola consulta.
     """
-    estudiante = (
-        db.query(Estudiante)
-        .filter(Estudiante.usuario_id == usuario_actual.id)
-        .first()
-    )
-
-    if not estudiante:
-        raise HTTPException(404, "Estudiante no encontrado")
-
-  
-    evaluaciones = (
-        db.query(EvaluacionLectura)
-        .filter(EvaluacionLectura.estudiante_id == estudiante.id)
+    resultado = await db.execute(
+        select(EvaluacionLectura, ContenidoLectura.titulo)
+        .outerjoin(ContenidoLectura, ContenidoLectura.id == EvaluacionLectura.contenido_id)
+        .where(EvaluacionLectura.estudiante_id == estudiante_id)
         .order_by(EvaluacionLectura.fecha_evaluacion.desc())
-        .all()
     )
 
-    
     historial = []
-    for ev in evaluaciones:
-        
-        contenido = db.query(ContenidoLectura).filter(
-            ContenidoLectura.id == ev.contenido_id
-        ).first()
-
+    for ev, titulo in resultado.all():
         historial.append({
             "id": ev.id,
             "estudiante_id": ev.estudiante_id,
-            "lectura_titulo": contenido.titulo if contenido else "Sin título",
+            "lectura_titulo": titulo or "Sin título",
             "lectura_id": ev.contenido_id,
             "fecha": ev.fecha_evaluacion.isoformat() if ev.fecha_evaluacion else datetime.now().isoformat(),
             "puntuacion_global": round(ev.precision_palabras or 0, 1),
@@ -67,119 +48,71 @@ def obtener_mi_historial_pronunciacion(
 
 
 
+@router.get("/mis")
+async def obtener_mi_historial_pronunciacion(
+    db: AsyncSession = Depends(get_async_read_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+):
+    """
+    ACTUALIZADO: Consulta evaluacion_lectura en lugar de historial_pronunciacion
+    """
+    estudiante_id = await db.scalar(
+        select(Estudiante.id).where(Estudiante.usuario_id == usuario_actual.id).limit(1)
+    )
+
+    if not estudiante_id:
+        raise HTTPException(404, "Estudiante no encontrado")
+
+    return await _historial_evaluaciones(db, estudiante_id)
+
+
+
 @router.get("/hijo/{estudiante_id}")
-def obtener_historial_pronunciacion_hijo(
+async def obtener_historial_pronunciacion_hijo(
     estudiante_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """
     ACTUALIZADO: Consulta evaluacion_lectura en lugar de historial_pronunciacion
     """
-    padre = (
-        db.query(Padre)
-        .filter(Padre.usuario_id == usuario_actual.id)
-        .first()
+    padre_id = await db.scalar(
+        select(Padre.id).where(Padre.usuario_id == usuario_actual.id).limit(1)
     )
 
-    if not padre:
+    if not padre_id:
         raise HTTPException(403, "Acceso solo para padres")
 
-    estudiante = (
-        db.query(Estudiante)
-        .filter(
+    autorizado = await db.scalar(
+        select(Estudiante.id).where(
             Estudiante.id == estudiante_id,
-            Estudiante.padre_id == padre.id
+            Estudiante.padre_id == padre_id
         )
-        .first()
     )
 
-    if not estudiante:
+    if not autorizado:
         raise HTTPException(403, "No autorizado para ver este estudiante")
 
-   
-    evaluaciones = (
-        db.query(EvaluacionLectura)
-        .filter(EvaluacionLectura.estudiante_id == estudiante.id)
-        .order_by(EvaluacionLectura.fecha_evaluacion.desc())
-        .all()
-    )
-
-   
-    historial = []
-    for ev in evaluaciones:
-        
-        contenido = db.query(ContenidoLectura).filter(
-            ContenidoLectura.id == ev.contenido_id
-        ).first()
-
-        historial.append({
-            "id": ev.id,
-            "estudiante_id": ev.estudiante_id,
-            "lectura_titulo": contenido.titulo if contenido else "Sin título",
-            "lectura_id": ev.contenido_id,
-            "fecha": ev.fecha_evaluacion.isoformat() if ev.fecha_evaluacion else datetime.now().isoformat(),
-            "puntuacion_global": round(ev.precision_palabras or 0, 1),
-            "fluidez": round(ev.puntuacion_pronunciacion or 0, 1),
-            "velocidad": round(ev.velocidad_lectura or 0, 1),
-            "palabras_por_minuto": round(ev.velocidad_lectura or 0, 1),
-            "precision": round(ev.precision_palabras or 0, 1),
-            "retroalimentacion": ev.retroalimentacion_ia or "",
-            "audio_url": ev.audio_url,
-            "duracion_audio": ev.duracion_audio,
-        })
-
-    return historial
+    return await _historial_evaluaciones(db, estudiante_id)
 
 
 
 @router.get("/docente/{estudiante_id}")
 @router.get("/estudiante/{estudiante_id}")
-def obtener_historial_pronunciacion_estudiante_docente(
+async def obtener_historial_pronunciacion_estudiante_docente(
     estudiante_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     docente: Docente = Depends(obtener_docente_actual),
 ):
     """Historial de pronunciación de un estudiante (vista docente)."""
-    estudiante = (
-        db.query(Estudiante)
-        .filter(
+    autorizado = await db.scalar(
+        select(Estudiante.id).where(
             Estudiante.id == estudiante_id,
             Estudiante.docente_id == docente.id,
         )
-        .first()
     )
 
-    if not estudiante:
+    if not autorizado:
         raise HTTPException(403, "No autorizado para ver este estudiante")
 
-    evaluaciones = (
-        db.query(EvaluacionLectura)
-        .filter(EvaluacionLectura.estudiante_id == estudiante.id)
-        .order_by(EvaluacionLectura.fecha_evaluacion.desc())
-        .all()
-    )
-
-    historial = []
-    for ev in evaluaciones:
-        contenido = db.query(ContenidoLectura).filter(
-            ContenidoLectura.id == ev.contenido_id
-        ).first()
-
-        historial.append({
-            "id": ev.id,
-            "estudiante_id": ev.estudiante_id,
-            "lectura_titulo": contenido.titulo if contenido else "Sin título",
-            "lectura_id": ev.contenido_id,
-            "fecha": ev.fecha_evaluacion.isoformat() if ev.fecha_evaluacion else datetime.now().isoformat(),
-            "puntuacion_global": round(ev.precision_palabras or 0, 1),
-            "fluidez": round(ev.puntuacion_pronunciacion or 0, 1),
-            "velocidad": round(ev.velocidad_lectura or 0, 1),
-            "palabras_por_minuto": round(ev.velocidad_lectura or 0, 1),
-            "precision": round(ev.precision_palabras or 0, 1),
-            "retroalimentacion": ev.retroalimentacion_ia or "",
-            "audio_url": ev.audio_url,
-            "duracion_audio": ev.duracion_audio,
-        })
-
-    return historial
+    return await _historial_evaluaciones(db, estudiante_id)
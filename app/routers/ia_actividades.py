@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from app.config import get_db
 from app.modelos import ContenidoLectura, Actividad, Usuario
 from app.servicios.seguridad import obtener_usuario_actual
 from app.servicios.ia_actividades import generar_actividad_ia_para_contenido
+from app.servicios.cache_respuestas import ACTIVIDADES, invalidar_cache, responder_cacheado
 from app.esquemas.actividad_ia import (
     GenerarActividadesIARequest,
     GenerarActividadesIAResponse,
@@ -66,20 +67,23 @@ def generar_actividades_ia(
 )
 def listar_actividades_lectura(
     contenido_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
 
-    actividades = (
-        db.query(Actividad)
-        .filter(
-            Actividad.contenido_id == contenido_id,
-            Actividad.activo == True
+    def generar(cabeceras):
+        actividades = (
+            db.query(Actividad)
+            .filter(
+                Actividad.contenido_id == contenido_id,
+                Actividad.activo == True
+            )
+            .all()
         )
-        .all()
-    )
+        return [ActividadResponse.model_validate(a) for a in actividades]
 
-    return actividades
+    return responder_cacheado(request, (ACTIVIDADES,), generar)
 
 
 
@@ -122,6 +126,7 @@ def actualizar_actividad(
     
     db.commit()
     db.refresh(actividad)
+    invalidar_cache(ACTIVIDADES)
     
     return actividad
 
@@ -141,6 +146,7 @@ def eliminar_actividad(
   
     actividad.activo = False
     db.commit()
+    invalidar_cache(ACTIVIDADES)
     
     return {"mensaje": "Actividad eliminada exitosamente"}
 
@@ -160,5 +166,6 @@ def eliminar_pregunta(
     
     db.delete(pregunta)
     db.commit()
+    invalidar_cache(ACTIVIDADES)
     
     return {"mensaje": "Pregunta eliminada exitosamente"}
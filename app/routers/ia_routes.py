@@ -4,18 +4,21 @@ import os
 import uuid
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
 from app.config import get_db
 from app.logs.logger import logger
+from app.metricas import CronometroEtapas
 from app.modelos import (
     ContenidoLectura,
     Estudiante,
     Padre,
 )
 from app.servicios.seguridad import obtener_usuario_actual
+from app.servicios.cache_respuestas import CONTENIDO, responder_cacheado
 from app.modelos import Usuario
 from app.servicios.ia_lectura_service import ServicioAnalisisLectura
 from app.servicios.manager_aprendizaje_ia import ManagerAprendizajeIA
@@ -31,6 +34,16 @@ analizador = ServicioAnalisisLectura(modelo="small")
 manager_ia = ManagerAprendizajeIA()  # ✅ Ya lo tienes instanciado
 
 
+def _liberar_conexion(db: Session) -> None:
+    """
+    Devuelve la conexión al pool antes de una inferencia larga.
+
+    La transcripción tarda segundos y no usa la BD; la sesión sigue siendo
+    utilizable y vuelve a tomar una conexión al guardar los resultados.
+    """
+    db.close()
+
+
 def _asegurar_directorios() -> None:
     os.makedirs(UPLOAD_AUDIO_DIR, exist_ok=True)
     os.makedirs(TTS_DIR, exist_ok=True)
@@ -78,22 +91,26 @@ def _verificar_estudiante_de_padre(
 @router.get("/lectura-texto/{contenido_id}")
 def obtener_texto_lectura(
     contenido_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual),
 ):
-    contenido = (
-        db.query(ContenidoLectura)
-        .filter(ContenidoLectura.id == contenido_id)
-        .first()
-    )
-    if not contenido:
-        raise HTTPException(status_code=404, detail="Contenido de lectura no encontrado.")
+    def generar(cabeceras):
+        contenido = (
+            db.query(ContenidoLectura)
+            .filter(ContenidoLectura.id == contenido_id)
+            .first()
+        )
+        if not contenido:
+            raise HTTPException(status_code=404, detail="Contenido de lectura no encontrado.")
 
-    return {
-        "id": contenido.id,
-        "titulo": contenido.titulo,
-        "contenido": contenido.contenido,
-    }
+        return {
+            "id": contenido.id,
+            "titulo": contenido.titulo,
+            "contenido": contenido.contenido,
+        }
+
+    return responder_cacheado(request, (CONTENIDO,), generar)
 
 
 # ============================================================
@@ -144,18 +161,32 @@ async def analizar_lectura_endpoint(
     filename = f"lectura_{estudiante_id}_{contenido_id}_{uuid.uuid4().hex}{ext}"
     audio_path = os.path.join(UPLOAD_AUDIO_DIR, filename)
 
+    cronometro = CronometroEtapas("lectura")
+
     try:
-        with open(audio_path, "wb") as f:
-            contenido_bytes = await audio.read()
-            f.write(contenido_bytes)
+        with cronometro.etapa("recepcion_audio"):
+            with open(audio_path, "wb") as f:
+                contenido_bytes = await audio.read()
+                f.write(contenido_bytes)
 
         # ✅ CAMBIO: Usar manager_ia en lugar de analizador directamente
-        resultado = manager_ia.procesar_lectura(
+        with cronometro.etapa("texto_referencia"):
+            texto_referencia = manager_ia.analizador.obtener_texto_referencia(
+                db, estudiante_id, contenido_id
+            )
+        _liberar_conexion(db)
+
+        # Inferencia fuera del event loop y sin conexión tomada
+        resultado_audio = await run_in_threadpool(
+            manager_ia.analizador.analizar_audio_lectura, texto_referencia, audio_path, cronometro
+        )
+
+        resultado = manager_ia.guardar_resultado_lectura(
             db=db,
             estudiante_id=estudiante_id,
             contenido_id=contenido_id,
             audio_path=audio_path,
-            evaluacion_id=evaluacion_id,
+            resultado_audio=resultado_audio,
         )
 
         logger.info(f"✅ Análisis completo | Ejercicios generados: {len(resultado.get('ejercicios_recomendados', []))}")
@@ -200,13 +231,16 @@ async def practicar_ejercicio_endpoint(
 
         logger.info(f"✅ Audio guardado | size={len(contenido_bytes)} bytes")
 
-        resultado = manager_ia.practicar_ejercicio(
-            db=db,
-            estudiante_id=estudiante_id,
-            ejercicio_id=ejercicio_id,
-            audio_path=audio_path,
+        texto_practica = manager_ia.obtener_texto_practica(db, estudiante_id, ejercicio_id)
+        _liberar_conexion(db)
+
+        # Inferencia fuera del event loop y sin conexión tomada
+        analisis = await run_in_threadpool(
+            manager_ia.analizador.analizar_practica_ejercicio, texto_practica, audio_path
         )
 
+        resultado = manager_ia.registrar_practica(db, estudiante_id, ejercicio_id, analisis)
+
         logger.info("🎉 Práctica completada exitosamente")
         return resultado
 
@@ -248,9 +282,9 @@ async def analizar_palabra_individual_endpoint(
         logger.info(f"💾 Audio guardado: {len(contenido_bytes)} bytes")
         
         # Analizar solo esta palabra
-        resultado = analizador.analizar_practica_ejercicio(
-            texto_practica=palabra_objetivo,
-            audio_path=audio_path,
+        # Inferencia fuera del event loop (este endpoint no usa la BD)
+        resultado = await run_in_threadpool(
+            analizador.analizar_practica_ejercicio, palabra_objetivo, audio_path
         )
         
         # Agregar feedback específico para niños
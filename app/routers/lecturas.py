@@ -5,6 +5,7 @@ from datetime import datetime
 
 from app.config import get_db
 from app.servicios.seguridad import obtener_docente_actual
+from app.servicios.cache_respuestas import CONTENIDO, invalidar_cache
 from app.modelos import (
     ContenidoLectura,
     Docente,
@@ -140,6 +141,7 @@ def crear_lectura(
     db.add(lectura)
     db.commit()
     db.refresh(lectura)
+    invalidar_cache(CONTENIDO)
     return lectura
 
 
@@ -157,6 +159,7 @@ def actualizar_lectura(
 
     db.commit()
     db.refresh(lectura)
+    invalidar_cache(CONTENIDO)
     return lectura
 
 
@@ -173,6 +176,7 @@ def desactivar_lectura(
     lectura.deleted_at = datetime.utcnow()
 
     db.commit()
+    invalidar_cache(CONTENIDO)
     return {"mensaje": "Lectura desactivada", "lectura_id": lectura_id}
 
 
@@ -202,6 +206,7 @@ def eliminar_lectura(
     lectura.activo = False
     lectura.deleted_at = datetime.utcnow()
     db.commit()
+    invalidar_cache(CONTENIDO)
     return {"mensaje": "Lectura desactivada (sin datos relacionados)", "lectura_id": lectura_id}
 
  
@@ -1,25 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from pydantic import BaseModel, EmailStr
-from passlib.context import CryptContext
 
-from app.config import get_db
-from app.modelos import Estudiante, Padre, ContenidoLectura, Actividad, Usuario, EvaluacionLectura
-from app.servicios.seguridad import obtener_usuario_actual
+from app.config import get_db, get_async_db
+from app.modelos import Estudiante, Padre, ContenidoLectura, Actividad, Usuario, EvaluacionLectura, Curso, EstudianteCurso
+from app.servicios.seguridad import obtener_usuario_actual, verificar_password, obtener_password_hash
+from app.servicios.cache_principal import invalidar_principal
 
-from app.servicios.padre_hijos import obtener_hijos_con_cursos
+from app.servicios.padre_hijos import cargar_hijos_con_cursos, obtener_hijos_con_cursos
 from app.esquemas.padre_hijos import EstudianteConCursosResponse
 
 from app.esquemas.padre import PadreResponse, PadreCreate, PadreUpdate, VincularHijoRequest
 from app.servicios.padre import crear_padre, obtener_padres, obtener_padre as obtener_padre_service
 
-from app.servicios.estudiante import obtener_cursos_estudiante
+from app.servicios.paginacion import publicar_cursor, siguiente_cursor
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 router = APIRouter(prefix="/padres", tags=["Padres"])
 
 
@@ -59,27 +58,14 @@ def listar_hijos_con_cursos(
     Obtiene la lista de hijos vinculados al padre actual.
     Solo retorna estudiantes activos.
     """
-    padre = db.query(Padre).filter(Padre.usuario_id == usuario_actual.id).first()
-    
-    if not padre:
+    if usuario_actual.padre_id is None:
         raise HTTPException(status_code=404, detail="No se encontró el perfil de padre")
-    
 
-    estudiantes = (
-        db.query(Estudiante)
-        .filter(
-            Estudiante.padre_id == padre.id,
-            Estudiante.activo == True
-        )
-        .all()
-    )
-    
+    # Hijos, docentes y cursos en dos consultas
+    hijos = cargar_hijos_con_cursos(db, usuario_actual.id, solo_hijos_activos=True)
 
     result = []
-    for estudiante in estudiantes:
-        cursos = obtener_cursos_estudiante(db, estudiante.id)
-        
-   
+    for estudiante, cursos in hijos:
         docente_info = None
         if estudiante.docente:
             if estudiante.docente.usuario:
@@ -120,8 +106,16 @@ def crear_padre_route(padre: PadreCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=List[PadreResponse])
-def listar_padres_route(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return obtener_padres(db, skip, limit)
+def listar_padres_route(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    padres = obtener_padres(db, skip, limit, cursor)
+    publicar_cursor(response, siguiente_cursor(padres, (Padre.id,), limit))
+    return padres
 
 
 
@@ -246,7 +240,7 @@ def actualizar_mi_perfil(
 
     if datos.password_actual and datos.password:
        
-        if not pwd_context.verify(datos.password_actual, usuario.password_hash):
+        if not verificar_password(datos.password_actual, usuario.password_hash):
             raise HTTPException(
                 status_code=400,
                 detail="La contraseña actual es incorrecta."
@@ -260,7 +254,7 @@ def actualizar_mi_perfil(
             )
         
   
-        usuario.password_hash = pwd_context.hash(datos.password)
+        usuario.password_hash = obtener_password_hash(datos.password)
     
   
     usuario.nombre = datos.nombre
@@ -277,6 +271,7 @@ def actualizar_mi_perfil(
         db.commit()
         db.refresh(usuario)
         db.refresh(padre)
+        invalidar_principal(usuario.id)
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -423,30 +418,35 @@ def desvincular_hijo(
 
 
 @router.get("/hijos/{hijo_id}/lecturas")
-def obtener_lecturas_hijo(
+async def obtener_lecturas_hijo(
     hijo_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """
     Obtiene las lecturas y actividades disponibles para un hijo específico.
     ACTUALIZADO: Marca como completadas las lecturas que tienen evaluación.
+
+    Async y con consultas por lote (cursos, lecturas, actividades y mejor
+    puntaje), sin consultas por cada lectura.
     """
-    padre = db.query(Padre).filter(Padre.usuario_id == usuario_actual.id).first()
+    padre_id = await db.scalar(
+        select(Padre.id).where(Padre.usuario_id == usuario_actual.id).limit(1)
+    )
     
-    if not padre:
+    if not padre_id:
         raise HTTPException(
             status_code=403, 
             detail="No existe registro de padre para este usuario."
         )
 
-    estudiante = db.query(Estudiante).filter(Estudiante.id == hijo_id).first()
+    estudiante = await db.get(Estudiante, hijo_id)
     
     if not estudiante:
         raise HTTPException(status_code=404, detail="El estudiante no existe.")
 
  
-    if estudiante.padre_id != padre.id:
+    if estudiante.padre_id != padre_id:
         raise HTTPException(
             status_code=403, 
             detail="No tienes permiso para ver las lecturas de este estudiante."
@@ -461,62 +461,63 @@ def obtener_lecturas_hijo(
 
  
     UMBRAL_APROBACION = 70.0  # Puedes cambiar este valor (60, 70, 80, etc.)
-    
-    evaluaciones = (
-        db.query(EvaluacionLectura.contenido_id)
-        .filter(
-            EvaluacionLectura.estudiante_id == hijo_id,
-            EvaluacionLectura.precision_palabras.isnot(None),  
-            EvaluacionLectura.precision_palabras >= UMBRAL_APROBACION 
-        )
-        .distinct()
-        .all()
-    )
-    
- 
-    lecturas_completadas_ids = {ev.contenido_id for ev in evaluaciones}
 
-    cursos = obtener_cursos_estudiante(db, hijo_id)
+    cursos = (await db.execute(
+        select(Curso)
+        .join(EstudianteCurso, EstudianteCurso.curso_id == Curso.id)
+        .where(EstudianteCurso.estudiante_id == hijo_id)
+    )).scalars().all()
     
     if not cursos:
         return []
 
-    lecturas_finales = []
-
-    for curso in cursos:
-        lecturas = (
-            db.query(ContenidoLectura)
-            .filter(
-                ContenidoLectura.curso_id == curso.id,
-                ContenidoLectura.activo == True
+    lecturas = (await db.execute(
+        select(ContenidoLectura)
+        .where(
+            ContenidoLectura.curso_id.in_([c.id for c in cursos]),
+            ContenidoLectura.activo == True
+        )
+        .order_by(ContenidoLectura.id)
+    )).scalars().all()
+
+    lecturas_ids = [l.id for l in lecturas]
+
+    actividades_por_lectura = {}
+    mejor_puntaje_por_lectura = {}
+    if lecturas_ids:
+        actividades = (await db.execute(
+            select(Actividad)
+            .where(
+                Actividad.contenido_id.in_(lecturas_ids),
+                Actividad.activo == True
+            )
+            .order_by(Actividad.id)
+        )).scalars().all()
+        for act in actividades:
+            actividades_por_lectura.setdefault(act.contenido_id, []).append(act)
+
+        # Mejor precisión por lectura (una lectura está completada si supera el umbral)
+        mejores = await db.execute(
+            select(EvaluacionLectura.contenido_id, func.max(EvaluacionLectura.precision_palabras))
+            .where(
+                EvaluacionLectura.estudiante_id == hijo_id,
+                EvaluacionLectura.contenido_id.in_(lecturas_ids),
+                EvaluacionLectura.precision_palabras.isnot(None)
             )
-            .all()
+            .group_by(EvaluacionLectura.contenido_id)
         )
+        mejor_puntaje_por_lectura = dict(mejores.all())
 
-        for lectura in lecturas:
-            actividades = (
-                db.query(Actividad)
-                .filter(
-                    Actividad.contenido_id == lectura.id,
-                    Actividad.activo == True
-                )
-                .all()
-            )
+    lecturas_por_curso = {}
+    for lectura in lecturas:
+        lecturas_por_curso.setdefault(lectura.curso_id, []).append(lectura)
 
-           
-            mejor_evaluacion = (
-                db.query(EvaluacionLectura)
-                .filter(
-                    EvaluacionLectura.estudiante_id == hijo_id,
-                    EvaluacionLectura.contenido_id == lectura.id,
-                    EvaluacionLectura.precision_palabras.isnot(None)  
-                )
-                .order_by(EvaluacionLectura.precision_palabras.desc())
-                .first()
-            )
-            
-            mejor_puntaje = mejor_evaluacion.precision_palabras if mejor_evaluacion else None
-            esta_completada = lectura.id in lecturas_completadas_ids
+    lecturas_finales = []
+
+    for curso in cursos:
+        for lectura in lecturas_por_curso.get(curso.id, []):
+            mejor_puntaje = mejor_puntaje_por_lectura.get(lectura.id)
+            esta_completada = mejor_puntaje is not None and mejor_puntaje >= UMBRAL_APROBACION
             
           
             lecturas_finales.append(
@@ -540,7 +541,7 @@ def obtener_lecturas_hijo(
                             "tiempo_estimado": getattr(act, 'tiempo_estimado', None),
                             "dificultad": getattr(act, 'dificultad', None),
                         }
-                        for act in actividades
+                        for act in actividades_por_lectura.get(lectura.id, [])
                     ],
                 }
             )
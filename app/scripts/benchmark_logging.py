@@ -0,0 +1,127 @@
+"""
+Benchmark: req/s con el logging de la aplicación activado y desactivado.
+
+Monta una app mínima con el middleware de requests real
+(MiddlewareRegistroRequests, una línea de log por request) y un endpoint
+JSON pequeño que registra dos líneas más, como un servicio típico. La carga
+se hace en el mismo proceso con tres configuraciones del logger:
+
+- desactivado: logger.disabled (cota superior)
+- cola: la configuración actual (QueueHandler + hilo de escritura)
+- directo: StreamHandler en el hilo del request (la configuración anterior)
+
+Los logs se escriben en un archivo temporal (o --salida) en lugar de la
+consola, para no mezclar la salida y medir una escritura real. Un archivo
+local casi nunca bloquea; --escritura-lenta-ms agrega una espera por línea
+para simular una consola o tubería lenta (el log stream de Azure), que es
+el caso en que escribir desde el hilo del request frena la aplicación:
+
+    python -m app.scripts.benchmark_logging
+    python -m app.scripts.benchmark_logging --escritura-lenta-ms 1
+    python -m app.scripts.benchmark_logging --peticiones 20000 --concurrencia 50 --formato texto
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+
+from fastapi import FastAPI
+
+from app.logs import logger as modulo_logger
+from app.logs.logger import FormateadorJSON, logger, logs_descartados
+from app.middlewares.registro_requests import MiddlewareRegistroRequests
+from app.scripts.utilidades_benchmark import cliente_asgi, imprimir_tabla, medir_carga
+
+
+class EscrituraLenta:
+    """Archivo cuya escritura tarda `espera_s` por llamada (consola lenta)."""
+
+    def __init__(self, archivo, espera_s: float) -> None:
+        self.archivo = archivo
+        self.espera_s = espera_s
+
+    def write(self, texto: str) -> int:
+        time.sleep(self.espera_s)
+        return self.archivo.write(texto)
+
+    def flush(self) -> None:
+        self.archivo.flush()
+
+
+def construir_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MiddlewareRegistroRequests)
+
+    @app.get("/items/{item_id}")
+    async def obtener_item(item_id: int):
+        logger.info("Buscando item %s", item_id)
+        item = {"id": item_id, "nombre": f"item {item_id}", "activo": True}
+        logger.info("Item %s encontrado", item_id, extra={"item_id": item_id})
+        return item
+
+    return app
+
+
+def formateador(formato: str) -> logging.Formatter:
+    if formato == "json":
+        return FormateadorJSON()
+    return logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+
+
+async def medir(app: FastAPI, args) -> dict:
+    async with cliente_asgi(app) as cliente:
+        await medir_carga(lambda i: cliente.get(f"/items/{i}"), 200, args.concurrencia)
+        return await medir_carga(lambda i: cliente.get(f"/items/{i}"), args.peticiones, args.concurrencia)
+
+
+async def ejecutar(args) -> None:
+    salida = open(args.salida, "a", encoding="utf-8") if args.salida else tempfile.TemporaryFile("w+")
+    if args.escritura_lenta_ms:
+        salida = EscrituraLenta(salida, args.escritura_lenta_ms / 1000)
+    app = construir_app()
+    manejadores_cola = list(logger.handlers)
+
+    # El hilo de escritura de la cola escribe en el mismo archivo
+    for manejador in modulo_logger._listener.handlers:
+        manejador.setStream(salida)
+        manejador.setFormatter(formateador(args.formato))
+
+    filas = []
+
+    logger.disabled = True
+    filas.append({"logging": "desactivado", **await medir(app, args)})
+    logger.disabled = False
+
+    descartados_antes = logs_descartados()
+    filas.append({"logging": "cola", **await medir(app, args)})
+    filas[-1]["descartados"] = logs_descartados() - descartados_antes
+
+    directo = logging.StreamHandler(salida)
+    directo.setFormatter(formateador(args.formato))
+    logger.handlers = [directo]
+    try:
+        filas.append({"logging": "directo", **await medir(app, args)})
+    finally:
+        logger.handlers = manejadores_cola
+
+    print(
+        f"\n{args.peticiones} peticiones, concurrencia {args.concurrencia}, formato {args.formato}, "
+        f"escritura lenta {args.escritura_lenta_ms} ms\n"
+    )
+    imprimir_tabla(filas, ["logging", "req_s", "p50_ms", "p95_ms", "max_ms", "descartados"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara req/s con logging activado y desactivado")
+    parser.add_argument("--peticiones", type=int, default=5000)
+    parser.add_argument("--concurrencia", type=int, default=20)
+    parser.add_argument("--formato", choices=["json", "texto"], default="json")
+    parser.add_argument("--salida", help="Archivo donde escribir los logs (por defecto, uno temporal)")
+    parser.add_argument("--escritura-lenta-ms", type=float, default=0.0, help="Espera por línea escrita")
+    asyncio.run(ejecutar(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
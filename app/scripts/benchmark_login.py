@@ -0,0 +1,96 @@
+"""
+Benchmark: tormenta de logins (inicio de clase) contra un servidor en marcha.
+
+Lanza --logins peticiones a POST /api/auth/login con --concurrencia en
+vuelo (un aula entrando a la vez) y, en paralelo, consulta /health cada
+100 ms para ver si el resto de la API sigue respondiendo mientras bcrypt
+ocupa el pool de hashing. Reporta logins/segundo, latencias y códigos de
+respuesta (200 ok, 429 límite de fallos, 503 pool de hashing saturado).
+
+Levantar el servidor como en producción (mismos workers) y ejecutar:
+
+    python -m app.scripts.benchmark_login --url http://localhost:8000 \\
+        --email alumno@colegio.edu --password Secreta123 --logins 300 --concurrencia 30
+
+Con --credenciales se usa un CSV email,password (una cuenta por alumno).
+Variar HASH_MAX_CONCURRENTES / HASH_MAX_EN_ESPERA en el servidor entre
+corridas para comparar.
+"""
+
+import argparse
+import asyncio
+import csv
+import time
+from typing import List, Tuple
+
+import httpx
+
+from app.scripts.utilidades_benchmark import imprimir_tabla, medir_carga, resumen_ms
+
+
+def leer_credenciales(args) -> List[Tuple[str, str]]:
+    if args.credenciales:
+        with open(args.credenciales, newline="", encoding="utf-8") as archivo:
+            return [(fila[0].strip(), fila[1].strip()) for fila in csv.reader(archivo) if len(fila) >= 2]
+    if not (args.email and args.password):
+        raise SystemExit("Indicar --email y --password, o --credenciales")
+    return [(args.email, args.password)]
+
+
+async def sondear_salud(cliente: httpx.AsyncClient, terminar: asyncio.Event, latencias: List[float]) -> None:
+    while not terminar.is_set():
+        inicio = time.perf_counter()
+        try:
+            await cliente.get("/health")
+            latencias.append(time.perf_counter() - inicio)
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.1)
+
+
+async def ejecutar(args) -> None:
+    credenciales = leer_credenciales(args)
+
+    async def login(i: int) -> httpx.Response:
+        email, password = credenciales[i % len(credenciales)]
+        return await cliente.post("/api/auth/login", data={"username": email, "password": password})
+
+    limites = httpx.Limits(max_connections=args.concurrencia + 1)
+    async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=60) as cliente:
+        latencias_salud: List[float] = []
+        terminar = asyncio.Event()
+        sonda = asyncio.create_task(sondear_salud(cliente, terminar, latencias_salud))
+
+        # Línea base de /health sin carga
+        await asyncio.sleep(1)
+        base = resumen_ms(latencias_salud)
+        latencias_salud.clear()
+
+        resultado = await medir_carga(login, args.logins, args.concurrencia)
+        terminar.set()
+        await sonda
+
+    print(f"\n{args.logins} logins, {args.concurrencia} simultáneos, {len(credenciales)} cuenta(s)\n")
+    imprimir_tabla(
+        [
+            {"medida": "login", **resultado},
+            {"medida": "/health sin carga", **base},
+            {"medida": "/health con carga", **resumen_ms(latencias_salud)},
+        ],
+        ["medida", "req_s", "p50_ms", "p95_ms", "max_ms", "estados"],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mide logins/segundo durante una tormenta de logins")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    parser.add_argument("--credenciales", help="CSV con email,password por fila")
+    parser.add_argument("--logins", type=int, default=300)
+    parser.add_argument("--concurrencia", type=int, default=30)
+    asyncio.run(ejecutar(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark: middleware de requests ASGI puro contra BaseHTTPMiddleware.
+
+Monta la misma app mínima tres veces y la carga en el mismo proceso:
+
+- sin_middleware: cota superior
+- asgi: MiddlewareRegistroRequests (la configuración actual)
+- base_http: el mismo trabajo (tiempo, Server-Timing, métricas y log) hecho
+  desde @app.middleware("http"), como antes de reemplazarlo
+
+Cada variante se mide en un endpoint JSON pequeño y en una subida grande
+(--tamano-mb, enviada en bloques de 64 KB y leída completa por el endpoint),
+que es donde BaseHTTPMiddleware agrega streams y tareas por request:
+
+    python -m app.scripts.benchmark_middleware
+    python -m app.scripts.benchmark_middleware --peticiones 5000 --subidas 200 --tamano-mb 10
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from fastapi import FastAPI, Request
+
+from app.logs.logger import logger
+from app.metricas import iniciar_medicion, terminar_medicion
+from app.middlewares.registro_requests import MiddlewareRegistroRequests
+from app.scripts.utilidades_benchmark import cliente_asgi, imprimir_tabla, medir_carga
+
+TAMANO_BLOQUE = 64 * 1024
+
+
+def agregar_endpoints(app: FastAPI) -> FastAPI:
+    @app.get("/items/{item_id}")
+    async def obtener_item(item_id: int):
+        return {"id": item_id, "nombre": f"item {item_id}", "activo": True}
+
+    @app.post("/subidas")
+    async def subir(request: Request):
+        recibidos = 0
+        async for bloque in request.stream():
+            recibidos += len(bloque)
+        return {"bytes": recibidos}
+
+    return app
+
+
+def app_sin_middleware() -> FastAPI:
+    return agregar_endpoints(FastAPI())
+
+
+def app_asgi() -> FastAPI:
+    app = agregar_endpoints(FastAPI())
+    app.add_middleware(MiddlewareRegistroRequests)
+    return app
+
+
+def app_base_http() -> FastAPI:
+    app = agregar_endpoints(FastAPI())
+
+    @app.middleware("http")
+    async def registrar_request(request: Request, call_next):
+        inicio = time.perf_counter()
+        medicion, token = iniciar_medicion()
+        status = None
+        try:
+            respuesta = await call_next(request)
+            status = respuesta.status_code
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+            respuesta.headers.append("server-timing", f"app;dur={duracion_ms:.1f}")
+            return respuesta
+        finally:
+            terminar_medicion(token)
+            MiddlewareRegistroRequests._registrar(request.scope, status, inicio, medicion)
+
+    return app
+
+
+def cuerpo_subida(tamano: int):
+    bloque = b"x" * TAMANO_BLOQUE
+
+    async def generar():
+        restantes = tamano
+        while restantes > 0:
+            yield bloque[:restantes]
+            restantes -= TAMANO_BLOQUE
+
+    return generar()
+
+
+async def medir(app: FastAPI, args) -> list:
+    tamano = int(args.tamano_mb * 1024 * 1024)
+    filas = []
+    async with cliente_asgi(app) as cliente:
+        json_pequeno = lambda i: cliente.get(f"/items/{i}")
+        subida = lambda i: cliente.post("/subidas", content=cuerpo_subida(tamano))
+
+        await medir_carga(json_pequeno, 200, args.concurrencia)
+        filas.append({"endpoint": "json", **await medir_carga(json_pequeno, args.peticiones, args.concurrencia)})
+        await medir_carga(subida, 5, args.concurrencia)
+        filas.append({
+            "endpoint": f"subida {args.tamano_mb:g} MB",
+            **await medir_carga(subida, args.subidas, args.concurrencia),
+        })
+    return filas
+
+
+async def ejecutar(args) -> None:
+    # Se mide el costo del middleware, no el de escribir logs
+    logger.setLevel(logging.WARNING)
+
+    filas = []
+    for variante, construir in (
+        ("sin_middleware", app_sin_middleware),
+        ("asgi", app_asgi),
+        ("base_http", app_base_http),
+    ):
+        for fila in await medir(construir(), args):
+            filas.append({"variante": variante, **fila})
+
+    filas.sort(key=lambda f: f["endpoint"])
+    print(
+        f"\n{args.peticiones} peticiones JSON y {args.subidas} subidas de {args.tamano_mb:g} MB, "
+        f"concurrencia {args.concurrencia}\n"
+    )
+    imprimir_tabla(filas, ["endpoint", "variante", "req_s", "p50_ms", "p95_ms", "max_ms", "estados"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara el middleware ASGI puro con BaseHTTPMiddleware")
+    parser.add_argument("--peticiones", type=int, default=3000)
+    parser.add_argument("--subidas", type=int, default=100)
+    parser.add_argument("--tamano-mb", type=float, default=5.0)
+    parser.add_argument("--concurrencia", type=int, default=20)
+    asyncio.run(ejecutar(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
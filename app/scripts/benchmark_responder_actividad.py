@@ -0,0 +1,198 @@
+"""
+Benchmark: POST /actividades/responder con una actividad de 50 preguntas.
+
+Crea una actividad con --preguntas preguntas para un estudiante y un
+contenido existentes y la responde --repeticiones veces con dos variantes:
+
+- actual: responder_actividad (una consulta de preguntas, INSERT en bloque
+  de las respuestas y UPSERT del nivel)
+- anterior: la implementación previa, reproducida aquí (una consulta por
+  pregunta, un INSERT por respuesta y lectura/escritura del nivel por ORM)
+
+Reporta la mediana y el p95 por respuesta y las consultas SQL por
+respuesta. Todo ocurre dentro de una transacción que se revierte al final
+(los commits del endpoint liberan un savepoint), así que la base de datos
+queda como estaba:
+
+    python -m app.scripts.benchmark_responder_actividad
+    python -m app.scripts.benchmark_responder_actividad --estudiante-id 12 --contenido-id 3 --repeticiones 50
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.config import SessionLocal, engine
+from app.modelos import (
+    Actividad, ContenidoLectura, Estudiante, HistorialPuntos, NivelEstudiante,
+    Pregunta, ProgresoActividad, RespuestaPregunta,
+)
+from app.routers.actividades_estudiante import (
+    RespuestaRequest, ResponderActividadRequest, _es_respuesta_correcta, responder_actividad,
+)
+from app.scripts.utilidades_benchmark import imprimir_tabla, resumen_ms
+
+
+def responder_anterior(request: ResponderActividadRequest, db: Session) -> None:
+    """Versión previa de responder_actividad (sin validaciones ni respuesta)."""
+    actividad = db.query(Actividad).filter(Actividad.id == request.actividad_id, Actividad.activo == True).first()
+    db.query(Estudiante).filter(Estudiante.id == request.estudiante_id).first()
+
+    progreso = ProgresoActividad(
+        estudiante_id=request.estudiante_id,
+        actividad_id=request.actividad_id,
+        fecha_completacion=datetime.now(),
+        tiempo_completacion=request.tiempo_total,
+        intentos=1,
+        errores_cometidos=0,
+        puntuacion=0.0,
+    )
+    db.add(progreso)
+    db.flush()
+
+    puntos_totales = 0
+    incorrectas = 0
+    for resp in request.respuestas:
+        pregunta = db.query(Pregunta).filter(Pregunta.id == resp.pregunta_id).first()
+        if not pregunta:
+            continue
+        es_correcta = _es_respuesta_correcta(pregunta, resp.respuesta_estudiante)
+        puntos_obtenidos = pregunta.puntuacion if es_correcta else 0
+        puntos_totales += puntos_obtenidos
+        incorrectas += 0 if es_correcta else 1
+        db.add(RespuestaPregunta(
+            progreso_id=progreso.id,
+            pregunta_id=pregunta.id,
+            respuesta_estudiante=resp.respuesta_estudiante,
+            correcta=es_correcta,
+            puntuacion_obtenida=puntos_obtenidos,
+        ))
+
+    progreso.puntuacion = float(puntos_totales)
+    progreso.errores_cometidos = incorrectas
+    xp_ganado = puntos_totales * 10
+
+    nivel = db.query(NivelEstudiante).filter(NivelEstudiante.estudiante_id == request.estudiante_id).first()
+    if not nivel:
+        nivel = NivelEstudiante(
+            estudiante_id=request.estudiante_id,
+            nivel_actual=1,
+            puntos_nivel_actual=0,
+            puntos_para_siguiente_nivel=500,
+            racha_actual=0,
+        )
+        db.add(nivel)
+        db.flush()
+    nivel.puntos_nivel_actual += xp_ganado
+    while nivel.puntos_nivel_actual >= nivel.puntos_para_siguiente_nivel:
+        nivel.puntos_nivel_actual -= nivel.puntos_para_siguiente_nivel
+        nivel.nivel_actual += 1
+        nivel.puntos_para_siguiente_nivel = nivel.nivel_actual * 500
+
+    db.add(HistorialPuntos(
+        estudiante_id=request.estudiante_id,
+        puntos=xp_ganado,
+        motivo=f"Actividad completada: {actividad.titulo}",
+        fecha=datetime.now(),
+    ))
+    db.commit()
+
+
+def crear_actividad(db: Session, contenido_id: int, cantidad: int) -> Actividad:
+    actividad = Actividad(
+        contenido_id=contenido_id,
+        tipo="preguntas",
+        titulo="Benchmark responder actividad",
+        configuracion={},
+        puntos_maximos=cantidad * 10,
+    )
+    db.add(actividad)
+    db.flush()
+    db.add_all(
+        Pregunta(
+            actividad_id=actividad.id,
+            texto_pregunta=f"Pregunta {n}",
+            tipo_respuesta="multiple_choice",
+            respuesta_correcta="a",
+            puntuacion=10,
+            orden=n,
+        )
+        for n in range(1, cantidad + 1)
+    )
+    db.flush()
+    return actividad
+
+
+def primer_id(db: Session, modelo) -> int:
+    valor = db.scalars(select(modelo.id).order_by(modelo.id).limit(1)).first()
+    if valor is None:
+        raise SystemExit(f"La base de datos no tiene filas en {modelo.__tablename__}")
+    return valor
+
+
+def ejecutar(args) -> None:
+    conexion = engine.connect()
+    transaccion = conexion.begin()
+    consultas = [0]
+
+    @event.listens_for(conexion, "before_cursor_execute")
+    def contar(*_):
+        consultas[0] += 1
+
+    # Los commits del endpoint liberan savepoints dentro de `transaccion`
+    db = SessionLocal(bind=conexion, join_transaction_mode="create_savepoint")
+    try:
+        estudiante_id = args.estudiante_id or primer_id(db, Estudiante)
+        contenido_id = args.contenido_id or primer_id(db, ContenidoLectura)
+        actividad = crear_actividad(db, contenido_id, args.preguntas)
+        preguntas = db.scalars(select(Pregunta.id).where(Pregunta.actividad_id == actividad.id)).all()
+        db.commit()
+
+        # Mitad de respuestas correctas
+        request = ResponderActividadRequest(
+            estudiante_id=estudiante_id,
+            actividad_id=actividad.id,
+            respuestas=[
+                RespuestaRequest(pregunta_id=p, respuesta_estudiante="a" if n % 2 else "b")
+                for n, p in enumerate(preguntas)
+            ],
+            tiempo_total=120,
+        )
+
+        filas = []
+        for variante, responder in (("anterior", responder_anterior), ("actual", responder_actividad)):
+            responder(request, db)  # calentamiento
+            latencias = []
+            consultas[0] = 0
+            for _ in range(args.repeticiones):
+                inicio = time.perf_counter()
+                responder(request, db)
+                latencias.append(time.perf_counter() - inicio)
+            filas.append({
+                "variante": variante,
+                **resumen_ms(latencias),
+                "consultas": round(consultas[0] / args.repeticiones, 1),
+            })
+    finally:
+        db.close()
+        transaccion.rollback()
+        conexion.close()
+
+    print(f"\n{args.repeticiones} respuestas por variante, {args.preguntas} preguntas, estudiante {estudiante_id}\n")
+    imprimir_tabla(filas, ["variante", "p50_ms", "p95_ms", "max_ms", "consultas"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mide responder_actividad con una actividad grande")
+    parser.add_argument("--estudiante-id", type=int, help="Por defecto, el primer estudiante de la BD")
+    parser.add_argument("--contenido-id", type=int, help="Por defecto, el primer contenido de la BD")
+    parser.add_argument("--preguntas", type=int, default=50)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    ejecutar(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
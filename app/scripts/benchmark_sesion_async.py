@@ -0,0 +1,96 @@
+"""
+Benchmark: sesión sync (get_db, threadpool) contra sesión async
+(get_async_db, asyncpg) en un endpoint de lectura.
+
+Monta una app mínima con dos endpoints que hacen la misma búsqueda del
+usuario autenticado (cargar_principal, sin caché) y los carga con distintas
+concurrencias, en el mismo proceso. --latencia-ms agrega un pg_sleep por
+request para simular la latencia de red hasta una BD remota (Azure), que es
+donde el endpoint sync ocupa un hilo del threadpool esperando:
+
+    python -m app.scripts.benchmark_sesion_async
+    python -m app.scripts.benchmark_sesion_async --latencia-ms 20 --concurrencia 1 20 100
+"""
+
+import argparse
+import asyncio
+
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import SessionLocal, async_engine, engine, get_async_db, get_db
+from app.modelos import Usuario
+from app.servicios.cache_principal import cargar_principal, cargar_principal_async
+from app.scripts.utilidades_benchmark import cliente_asgi, imprimir_tabla, medir_carga
+
+
+def construir_app(latencia_s: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync/{email}")
+    def principal_sync(email: str, db: Session = Depends(get_db)):
+        if latencia_s:
+            db.execute(text("SELECT pg_sleep(:s)"), {"s": latencia_s})
+        principal = cargar_principal(db, email)
+        if principal is None:
+            raise HTTPException(status_code=404)
+        return {"id": principal.id}
+
+    @app.get("/async/{email}")
+    async def principal_async(email: str, db: AsyncSession = Depends(get_async_db)):
+        if latencia_s:
+            await db.execute(text("SELECT pg_sleep(:s)"), {"s": latencia_s})
+        principal = await cargar_principal_async(db, email)
+        if principal is None:
+            raise HTTPException(status_code=404)
+        return {"id": principal.id}
+
+    return app
+
+
+def email_de_prueba() -> str:
+    db = SessionLocal()
+    try:
+        email = db.scalars(select(Usuario.email).limit(1)).first()
+    finally:
+        db.close()
+    if email is None:
+        raise SystemExit("La base de datos no tiene usuarios; crear uno (p. ej. crear_admin_inicial)")
+    return email
+
+
+async def ejecutar(args) -> None:
+    email = args.email or email_de_prueba()
+    app = construir_app(args.latencia_ms / 1000)
+
+    filas = []
+    async with cliente_asgi(app) as cliente:
+        for variante in ("sync", "async"):
+            # Calentamiento: abre las conexiones de los pools
+            await medir_carga(lambda i: cliente.get(f"/{variante}/{email}"), 20, 5)
+            for concurrencia in args.concurrencia:
+                resultado = await medir_carga(
+                    lambda i: cliente.get(f"/{variante}/{email}"), args.peticiones, concurrencia
+                )
+                filas.append({"variante": variante, "concurrencia": concurrencia, **resultado})
+
+    await async_engine.dispose()
+    engine.dispose()
+
+    print(f"\n{args.peticiones} peticiones por fila, latencia simulada {args.latencia_ms:.0f} ms\n")
+    imprimir_tabla(filas, ["variante", "concurrencia", "req_s", "p50_ms", "p95_ms", "max_ms", "estados"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara req/s de get_db y get_async_db")
+    parser.add_argument("--email", help="Usuario a buscar (por defecto, el primero de la BD)")
+    parser.add_argument("--peticiones", type=int, default=1000)
+    parser.add_argument("--concurrencia", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--latencia-ms", type=float, default=0.0, help="pg_sleep por request")
+    asyncio.run(ejecutar(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Calibra el costo del hashing de contraseñas para esta máquina.
+
+Mide cuánto tarda un hash con distintos costos y recomienda el mayor que
+cabe en el presupuesto de latencia. Ejecutar en el mismo tipo de máquina
+que producción y copiar las variables sugeridas al .env:
+
+    python -m app.scripts.calibrar_hash --objetivo-ms 250
+    python -m app.scripts.calibrar_hash --esquema argon2 --objetivo-ms 250
+"""
+
+import argparse
+import statistics
+import time
+
+from app import settings
+from app.servicios.hash_contrasenas import construir_contexto
+
+
+PASSWORD_PRUEBA = "Calibracion-Hash-2025"
+
+
+def medir_ms(contexto, muestras: int) -> float:
+    """Mediana en ms de `muestras` hashes con el contexto dado."""
+    tiempos = []
+    for _ in range(muestras):
+        inicio = time.perf_counter()
+        contexto.hash(PASSWORD_PRUEBA)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def calibrar_bcrypt(objetivo_ms: float, muestras: int) -> None:
+    elegido = None
+    for rounds in range(10, 17):
+        ms = medir_ms(construir_contexto(esquema="bcrypt", bcrypt_rounds=rounds), muestras)
+        print(f"  bcrypt rounds={rounds}: {ms:.1f} ms")
+        if ms > objetivo_ms:
+            break
+        elegido = rounds
+
+    if elegido is None:
+        print("Ni siquiera rounds=10 cabe en el objetivo; se recomienda el mínimo.")
+        elegido = 10
+
+    print("\nVariables sugeridas:")
+    print("PASSWORD_ESQUEMA=bcrypt")
+    print(f"BCRYPT_ROUNDS={elegido}")
+
+
+def calibrar_argon2(objetivo_ms: float, muestras: int) -> None:
+    parallelism = settings.ARGON2_PARALLELISM
+    memoria = settings.ARGON2_MEMORY_COST_KIB
+    elegido = None
+
+    # Se reduce la memoria hasta que time_cost=1 quepa en el objetivo
+    while memoria >= 8192 and elegido is None:
+        for time_cost in range(1, 11):
+            contexto = construir_contexto(
+                esquema="argon2",
+                argon2_time_cost=time_cost,
+                argon2_memory_cost=memoria,
+                argon2_parallelism=parallelism,
+            )
+            ms = medir_ms(contexto, muestras)
+            print(f"  argon2id memoria={memoria} KiB time_cost={time_cost}: {ms:.1f} ms")
+            if ms > objetivo_ms:
+                break
+            elegido = (memoria, time_cost)
+        if elegido is None:
+            memoria //= 2
+
+    if elegido is None:
+        print("Ninguna configuración de argon2id cabe en el objetivo; usar bcrypt.")
+        return
+
+    print("\nVariables sugeridas:")
+    print("PASSWORD_ESQUEMA=argon2")
+    print(f"ARGON2_MEMORY_COST_KIB={elegido[0]}")
+    print(f"ARGON2_TIME_COST={elegido[1]}")
+    print(f"ARGON2_PARALLELISM={parallelism}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibra el costo del hashing de contraseñas")
+    parser.add_argument("--esquema", choices=["bcrypt", "argon2"], default=settings.PASSWORD_ESQUEMA.lower())
+    parser.add_argument("--objetivo-ms", type=float, default=250.0, help="Latencia máxima por hash")
+    parser.add_argument("--muestras", type=int, default=3, help="Hashes medidos por configuración")
+    args = parser.parse_args()
+
+    print(f"Calibrando {args.esquema} con objetivo de {args.objetivo_ms:.0f} ms por hash...")
+    if args.esquema == "argon2":
+        calibrar_argon2(args.objetivo_ms, args.muestras)
+    else:
+        calibrar_bcrypt(args.objetivo_ms, args.muestras)
+
+    print(
+        "\nLos hashes existentes con otro esquema o costo se rehacen "
+        "en el siguiente login exitoso de cada usuario."
+    )
+
+
+if __name__ == "__main__":
+    main()
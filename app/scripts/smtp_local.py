@@ -0,0 +1,125 @@
+"""
+Servidor SMTP local de prueba: acepta todos los mensajes y los imprime.
+
+Sirve para probar la cola de correos de punta a punta sin un servidor
+real. No implementa STARTTLS ni AUTH, así que en el .env:
+
+    EMAIL_PROVIDER=smtp
+    SMTP_HOST=localhost
+    SMTP_PORT=8025
+    SMTP_USE_TLS=false
+    # SMTP_USER / SMTP_PASSWORD vacíos
+
+    python -m app.scripts.smtp_local --puerto 8025
+    python -m app.scripts.smtp_local --puerto 8025 --directorio /tmp/correos
+"""
+
+import argparse
+import asyncio
+import email
+from email.policy import default as politica_default
+from pathlib import Path
+from typing import List, Optional
+
+
+class SesionSMTP:
+    """Una conexión de cliente: comandos SMTP mínimos (RFC 5321)."""
+
+    contador = 0
+
+    def __init__(self, reader, writer, directorio: Optional[Path]) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.directorio = directorio
+        self.remitente: Optional[str] = None
+        self.destinatarios: List[str] = []
+
+    async def responder(self, linea: str) -> None:
+        self.writer.write((linea + "\r\n").encode())
+        await self.writer.drain()
+
+    async def atender(self) -> None:
+        await self.responder("220 smtp-local listo")
+        while True:
+            linea = await self.reader.readline()
+            if not linea:
+                break
+            comando = linea.decode(errors="replace").strip()
+            verbo = comando[:4].upper()
+
+            if verbo == "EHLO":
+                await self.responder("250-smtp-local")
+                await self.responder("250 8BITMIME")
+            elif verbo == "HELO":
+                await self.responder("250 smtp-local")
+            elif verbo == "MAIL":
+                self.remitente = comando.split(":", 1)[-1].strip()
+                self.destinatarios = []
+                await self.responder("250 OK")
+            elif verbo == "RCPT":
+                self.destinatarios.append(comando.split(":", 1)[-1].strip())
+                await self.responder("250 OK")
+            elif verbo == "DATA":
+                await self.responder("354 Terminar con <CRLF>.<CRLF>")
+                await self.recibir_mensaje()
+                await self.responder("250 OK mensaje aceptado")
+            elif verbo == "RSET":
+                self.remitente, self.destinatarios = None, []
+                await self.responder("250 OK")
+            elif verbo == "NOOP":
+                await self.responder("250 OK")
+            elif verbo == "QUIT":
+                await self.responder("221 Adiós")
+                break
+            else:
+                await self.responder("502 Comando no implementado")
+
+        self.writer.close()
+
+    async def recibir_mensaje(self) -> None:
+        lineas = []
+        while True:
+            linea = await self.reader.readline()
+            if not linea or linea in (b".\r\n", b".\n"):
+                break
+            # Quitar el punto de escape (dot-stuffing)
+            lineas.append(linea[1:] if linea.startswith(b"..") else linea)
+
+        crudo = b"".join(lineas)
+        mensaje = email.message_from_bytes(crudo, policy=politica_default)
+        print(f"📧 {self.remitente} -> {', '.join(self.destinatarios)} | {mensaje['Subject']}")
+
+        if self.directorio is not None:
+            SesionSMTP.contador += 1
+            archivo = self.directorio / f"correo_{SesionSMTP.contador:05d}.eml"
+            archivo.write_bytes(crudo)
+
+
+async def servir(host: str, puerto: int, directorio: Optional[Path]) -> None:
+    async def atender(reader, writer):
+        await SesionSMTP(reader, writer, directorio).atender()
+
+    servidor = await asyncio.start_server(atender, host, puerto)
+    print(f"Servidor SMTP local escuchando en {host}:{puerto}")
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor SMTP local de prueba")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8025)
+    parser.add_argument("--directorio", type=Path, default=None, help="Guardar cada mensaje como .eml")
+    args = parser.parse_args()
+
+    if args.directorio is not None:
+        args.directorio.mkdir(parents=True, exist_ok=True)
+
+    try:
+        asyncio.run(servir(args.host, args.puerto, args.directorio))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Utilidades comunes de los scripts de benchmark (app/scripts/benchmark_*).
+
+Los benchmarks no son parte de ninguna suite: se ejecutan a mano, contra la
+base de datos de desarrollo del .env, y comparan las variantes en la misma
+corrida para que el resultado no dependa de la máquina.
+"""
+
+import asyncio
+import statistics
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+import httpx
+
+
+def resumen_ms(latencias: Sequence[float]) -> Dict[str, float]:
+    """Mediana, p95 y máximo (en ms) de latencias medidas en segundos."""
+    if not latencias:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordenadas = sorted(latencias)
+    p95 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.95))]
+    return {
+        "p50_ms": round(statistics.median(ordenadas) * 1000, 2),
+        "p95_ms": round(p95 * 1000, 2),
+        "max_ms": round(ordenadas[-1] * 1000, 2),
+    }
+
+
+async def medir_carga(
+    peticion: Callable[[int], Awaitable[httpx.Response]],
+    total: int,
+    concurrencia: int,
+) -> Dict[str, Any]:
+    """
+    Ejecuta `total` peticiones manteniendo `concurrencia` en vuelo.
+
+    `peticion(i)` recibe el número de petición (para variar datos). Devuelve
+    req/s, latencias y el conteo de respuestas por código de estado.
+    """
+    latencias: List[float] = []
+    estados: Counter = Counter()
+    pendientes = iter(range(total))
+
+    async def trabajador() -> None:
+        for i in pendientes:
+            inicio = time.perf_counter()
+            try:
+                respuesta = await peticion(i)
+                estados[respuesta.status_code] += 1
+            except httpx.HTTPError as e:
+                estados[type(e).__name__] += 1
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    duracion = time.perf_counter() - inicio
+
+    return {
+        "req_s": round(total / duracion, 1),
+        **resumen_ms(latencias),
+        "estados": dict(sorted(estados.items(), key=lambda e: str(e[0]))),
+    }
+
+
+def cliente_asgi(app) -> httpx.AsyncClient:
+    """Cliente HTTP que llama a la app en el mismo proceso (sin red ni lifespan)."""
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+
+
+def imprimir_tabla(filas: List[Dict[str, Any]], columnas: Sequence[str]) -> None:
+    anchos = {c: max(len(c), *(len(str(f.get(c, ""))) for f in filas)) for c in columnas}
+    print("  ".join(c.ljust(anchos[c]) for c in columnas))
+    print("  ".join("-" * anchos[c] for c in columnas))
+    for fila in filas:
+        print("  ".join(str(fila.get(c, "")).ljust(anchos[c]) for c in columnas))
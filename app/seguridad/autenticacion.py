@@ -1,6 +1,6 @@
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from typing import Optional
@@ -8,6 +8,8 @@ from typing import Optional
 from app import settings
 from app.config import get_db
 from app.modelos import Usuario, UsuarioRol
+from app.servicios.cache_principal import Principal, obtener_principal
+from app.servicios.registro_auditoria import fijar_contexto_request, ip_cliente
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
@@ -33,10 +35,11 @@ def verificar_token_acceso(token: str) -> Optional[dict]:
         return None
 
 async def obtener_usuario_actual(
+    request: Request,
     token: str = Depends(oauth2_scheme), 
     db: Session = Depends(get_db)
-) -> Usuario:
-    """Obtener usuario actual desde el token"""
+) -> Principal:
+    """Obtener usuario actual desde el token (caché de principales)"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudieron validar las credenciales",
@@ -53,8 +56,8 @@ async def obtener_usuario_actual(
     if email is None or usuario_id is None:
         raise credentials_exception
     
-    usuario = db.query(Usuario).filter(Usuario.id == usuario_id, Usuario.email == email).first()
-    if usuario is None:
+    usuario = obtener_principal(db, email)
+    if usuario is None or usuario.id != usuario_id:
         raise credentials_exception
     
     if not usuario.activo:
@@ -63,6 +66,7 @@ async def obtener_usuario_actual(
             detail="Usuario inactivo"
         )
     
+    fijar_contexto_request(usuario.id, ip_cliente(request))
     return usuario
 
 def crear_token_actualizacion(usuario_id: int) -> str:
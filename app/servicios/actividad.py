@@ -4,12 +4,14 @@ from typing import List, Optional
 
 from app.modelos import Actividad, Pregunta, ProgresoActividad, RespuestaPregunta
 from app.esquemas.actividad import ActividadCreate, ActividadUpdate, PreguntaCreate, ProgresoActividadCreate, RespuestaPreguntaCreate
+from app.servicios.cache_respuestas import ACTIVIDADES, invalidar_cache
 
 def crear_actividad(db: Session, actividad: ActividadCreate):
     db_actividad = Actividad(**actividad.dict())
     db.add(db_actividad)
     db.commit()
     db.refresh(db_actividad)
+    invalidar_cache(ACTIVIDADES)
     return db_actividad
 
 def obtener_actividades(db: Session, skip: int = 0, limit: int = 100, 
@@ -35,6 +37,7 @@ def actualizar_actividad(db: Session, actividad_id: int, actividad: ActividadUpd
     
     db.commit()
     db.refresh(db_actividad)
+    invalidar_cache(ACTIVIDADES)
     return db_actividad
 
 def eliminar_actividad(db: Session, actividad_id: int):
@@ -45,6 +48,7 @@ def eliminar_actividad(db: Session, actividad_id: int):
     # Soft delete
     db_actividad.activo = False
     db.commit()
+    invalidar_cache(ACTIVIDADES)
     return db_actividad
 
 def crear_pregunta(db: Session, actividad_id: int, pregunta: PreguntaCreate):
@@ -52,6 +56,7 @@ def crear_pregunta(db: Session, actividad_id: int, pregunta: PreguntaCreate):
     db.add(db_pregunta)
     db.commit()
     db.refresh(db_pregunta)
+    invalidar_cache(ACTIVIDADES)
     return db_pregunta
 
 def obtener_preguntas_actividad(db: Session, actividad_id: int):
@@ -67,6 +72,12 @@ def crear_progreso_actividad(db: Session, progreso: ProgresoActividadCreate):
 def obtener_progreso_estudiante(db: Session, estudiante_id: int):
     return db.query(ProgresoActividad).filter(ProgresoActividad.estudiante_id == estudiante_id).all()
 
+def consulta_historial_actividades(db: Session, estudiante_id: int):
+    """Actividades completadas por el estudiante, las más recientes primero."""
+    return db.query(ProgresoActividad).filter(
+        ProgresoActividad.estudiante_id == estudiante_id
+    ).order_by(ProgresoActividad.fecha_completacion.desc())
+
 def crear_respuesta_pregunta(db: Session, progreso_id: int, respuesta: RespuestaPreguntaCreate):
     db_respuesta = RespuestaPregunta(progreso_id=progreso_id, **respuesta.dict())
     db.add(db_respuesta)
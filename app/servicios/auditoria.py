@@ -0,0 +1,26 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from app.modelos import Auditoria
+from app.servicios.paginacion import paginar_keyset
+
+
+def obtener_auditoria(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    """Registros de auditoría, del más reciente al más antiguo."""
+    query = paginar_keyset(db.query(Auditoria), (Auditoria.id,), cursor, limit, descendente=True)
+    if not cursor and skip:
+        query = query.offset(skip)
+    return query.all()
+
+
+def obtener_auditoria_por_id(db: Session, auditoria_id: int):
+    return db.query(Auditoria).filter(Auditoria.id == auditoria_id).first()
+
+
+def obtener_auditoria_por_usuario(db: Session, usuario_id: int):
+    return (
+        db.query(Auditoria)
+        .filter(Auditoria.usuario_id == usuario_id)
+        .order_by(Auditoria.id.desc())
+        .all()
+    )
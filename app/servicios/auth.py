@@ -7,8 +7,10 @@ import secrets
 from app import settings
 from app.modelos import Usuario, UsuarioRol
 from app.esquemas.auth import UsuarioCreate, CambioPassword
-from app.servicios.seguridad import verificar_password, obtener_password_hash
+from app.servicios.seguridad import verificar_password, verificar_y_actualizar_password, obtener_password_hash
 from app.servicios.email_service import email_service
+from app.servicios.cache_principal import invalidar_principal
+from app.servicios.revocacion_tokens import revocar_tokens_usuario
 from app.logs.logger import logger
 
 
@@ -34,7 +36,8 @@ def autenticar_usuario(db: Session, email: str, password: str):
     if not usuario:
         return False
 
-    if not verificar_password(password, usuario.password_hash):
+    valida, nuevo_hash = verificar_y_actualizar_password(password, usuario.password_hash)
+    if not valida:
         return False
 
     # ✅ VALIDACIÓN 1: Email verificado
@@ -70,8 +73,13 @@ def autenticar_usuario(db: Session, email: str, password: str):
         )
 
 
+    # Rehash con la política vigente (se guarda junto con ultimo_login)
+    if nuevo_hash:
+        usuario.password_hash = nuevo_hash
+
     usuario.ultimo_login = now_utc()
     db.commit()
+    invalidar_principal(usuario.id)
     
     logger.info(f"✅ Login exitoso: {email}")
     return usuario
@@ -215,6 +223,7 @@ def cambiar_password(db: Session, usuario_id: int, cambio: CambioPassword):
     usuario.fecha_actualizacion = now_utc()
 
     db.commit()
+    revocar_tokens_usuario(db, usuario.id)
     return {"mensaje": "Contraseña actualizada correctamente"}
 
 
@@ -301,6 +310,7 @@ def confirmar_reset_password(db: Session, token: str, nuevo_password: str):
         db.rollback()
         logger.exception(f"❌ Error al confirmar reset: {e}")
         raise HTTPException(status_code=500, detail="Error al procesar el reset de contraseña")
+    revocar_tokens_usuario(db, usuario.id)
 
     return {
         "mensaje": "Contraseña restablecida correctamente. Ya puedes iniciar sesión con tu nueva contraseña.",
@@ -330,5 +340,6 @@ def configurar_cuenta_docente(db: Session, token: str, nuevo_password: str):
 
     usuario.fecha_actualizacion = now_utc()
     db.commit()
+    revocar_tokens_usuario(db, usuario.id)
 
     return {"mensaje": "Cuenta configurada correctamente. Ya puedes iniciar sesión.", "email": usuario.email}
@@ -4,6 +4,7 @@ from fastapi import HTTPException, status
 from pydantic import BaseModel as PydanticBaseModel  
 
 from app.config import Base  
+from app.servicios.paginacion import paginar_keyset
 
 ModelType = TypeVar("ModelType", bound=Base)  
 CreateSchemaType = TypeVar("CreateSchemaType", bound=PydanticBaseModel)
@@ -17,9 +18,12 @@ class ServiceBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return db.query(self.model).filter(self.model.id == id).first()
 
     def get_multi(
-        self, db: Session, skip: int = 0, limit: int = 100
+        self, db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
     ) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        query = paginar_keyset(db.query(self.model), (self.model.id,), cursor, limit)
+        if not cursor and skip:
+            query = query.offset(skip)
+        return query.all()
 
     def create(self, db: Session, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = obj_in.dict()
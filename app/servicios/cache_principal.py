@@ -0,0 +1,225 @@
+"""
+Caché de principales autenticados.
+
+Cada request autenticado necesita el estado del usuario (activo, bloqueado,
+eliminado), sus roles y los ids de sus perfiles (padre, docente, estudiante).
+Este módulo los resuelve con UNA consulta y los guarda en memoria con un TTL
+corto, de modo que el camino caliente de autenticación no toca la base de datos.
+
+- Clave: el `sub` del token (email del usuario)
+- Los tokens con claims de autorización no pasan por aquí (ver
+  revocacion_tokens); la caché atiende tokens antiguos y recargas puntuales
+- Tamaño acotado (LRU) y TTL configurables en settings
+- Invalidación explícita con `invalidar_principal(usuario_id)` al bloquear,
+  desactivar, eliminar o cambiar roles/perfil de un usuario
+
+La caché es por proceso: con varios workers de gunicorn, un cambio hecho en
+otro worker se ve como máximo PRINCIPAL_CACHE_TTL_SEGUNDOS después.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, FrozenSet, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import settings
+from app.metricas import registrar_cache
+from app.modelos import Usuario, UsuarioRol, Padre, Docente, Estudiante
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Instantánea de solo lectura del usuario autenticado.
+
+    Expone los mismos atributos de Usuario que usan los routers
+    (id, email, nombre, ...). Para modificar el usuario, cargarlo
+    desde la sesión con su id.
+    """
+    id: int
+    email: str
+    nombre: str
+    apellido: str
+    activo: bool
+    bloqueado: bool
+    email_verificado: bool
+    deleted_at: Optional[datetime]
+    fecha_creacion: Optional[datetime]
+    ultimo_login: Optional[datetime]
+    roles: FrozenSet[str]
+    padre_id: Optional[int] = None
+    docente_id: Optional[int] = None
+    docente_activo: bool = False
+    estudiante_id: Optional[int] = None
+    token_version: int = 0
+
+    def tiene_rol(self, rol: str) -> bool:
+        return rol.lower() in self.roles
+
+
+class CachePrincipales:
+    """LRU con TTL, segura entre hilos."""
+
+    def __init__(self, ttl_segundos: float, max_entradas: int) -> None:
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[str, tuple]" = OrderedDict()
+        self._sub_por_usuario: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, sub: str) -> Optional[Principal]:
+        with self._lock:
+            entrada = self._entradas.get(sub)
+            if entrada is None:
+                return None
+            principal, expira = entrada
+            if expira < time.monotonic():
+                self._quitar(sub)
+                return None
+            self._entradas.move_to_end(sub)
+            return principal
+
+    def guardar(self, sub: str, principal: Principal) -> None:
+        if self.ttl_segundos <= 0 or self.max_entradas <= 0:
+            return
+        with self._lock:
+            self._quitar(sub)
+            self._entradas[sub] = (principal, time.monotonic() + self.ttl_segundos)
+            self._sub_por_usuario[principal.id] = sub
+            while len(self._entradas) > self.max_entradas:
+                sub_antiguo = next(iter(self._entradas))
+                self._quitar(sub_antiguo)
+
+    def invalidar_usuario(self, usuario_id: int) -> None:
+        with self._lock:
+            sub = self._sub_por_usuario.get(usuario_id)
+            if sub is not None:
+                self._quitar(sub)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._sub_por_usuario.clear()
+
+    def _quitar(self, sub: str) -> None:
+        entrada = self._entradas.pop(sub, None)
+        if entrada is None:
+            return
+        usuario_id = entrada[0].id
+        if self._sub_por_usuario.get(usuario_id) == sub:
+            del self._sub_por_usuario[usuario_id]
+
+
+cache_principales = CachePrincipales(
+    ttl_segundos=settings.PRINCIPAL_CACHE_TTL_SEGUNDOS,
+    max_entradas=settings.PRINCIPAL_CACHE_MAX,
+)
+
+
+def _consulta_principal(email: str):
+    """SELECT de usuario, roles activos e ids de perfil (una sola consulta)."""
+    roles = (
+        select(func.array_agg(UsuarioRol.rol))
+        .where(UsuarioRol.usuario_id == Usuario.id, UsuarioRol.activo == True)
+        .scalar_subquery()
+    )
+    padre_id = (
+        select(Padre.id).where(Padre.usuario_id == Usuario.id).limit(1).scalar_subquery()
+    )
+    docente_id = (
+        select(Docente.id)
+        .where(Docente.usuario_id == Usuario.id, Docente.deleted_at.is_(None))
+        .limit(1)
+        .scalar_subquery()
+    )
+    docente_activo = (
+        select(Docente.activo)
+        .where(Docente.usuario_id == Usuario.id, Docente.deleted_at.is_(None))
+        .limit(1)
+        .scalar_subquery()
+    )
+    estudiante_id = (
+        select(Estudiante.id).where(Estudiante.usuario_id == Usuario.id).limit(1).scalar_subquery()
+    )
+
+    return (
+        select(Usuario, roles, padre_id, docente_id, docente_activo, estudiante_id)
+        .where(Usuario.email == email)
+    )
+
+
+def _principal_desde_fila(fila) -> Optional[Principal]:
+    if fila is None:
+        return None
+
+    usuario, roles_usuario, padre, docente, docente_ok, estudiante = fila
+    return Principal(
+        id=usuario.id,
+        email=usuario.email,
+        nombre=usuario.nombre,
+        apellido=usuario.apellido,
+        activo=bool(usuario.activo),
+        bloqueado=bool(usuario.bloqueado),
+        email_verificado=bool(usuario.email_verificado),
+        deleted_at=usuario.deleted_at,
+        fecha_creacion=usuario.fecha_creacion,
+        ultimo_login=usuario.ultimo_login,
+        roles=frozenset(r.lower() for r in (roles_usuario or [])),
+        padre_id=padre,
+        docente_id=docente,
+        docente_activo=bool(docente_ok),
+        estudiante_id=estudiante,
+        token_version=usuario.token_version or 0,
+    )
+
+
+def cargar_principal(db: Session, email: str) -> Optional[Principal]:
+    """
+    Carga usuario, roles activos e ids de perfil en una sola consulta.
+    """
+    return _principal_desde_fila(db.execute(_consulta_principal(email)).first())
+
+
+async def cargar_principal_async(db: AsyncSession, email: str) -> Optional[Principal]:
+    """Igual que cargar_principal, con sesión async."""
+    resultado = await db.execute(_consulta_principal(email))
+    return _principal_desde_fila(resultado.first())
+
+
+def obtener_principal(db: Session, email: str) -> Optional[Principal]:
+    """Principal desde la caché; si no está o expiró, lo carga de la BD."""
+    principal = cache_principales.obtener(email)
+    registrar_cache("principales", principal is not None)
+    if principal is None:
+        principal = cargar_principal(db, email)
+        if principal is not None:
+            cache_principales.guardar(email, principal)
+    return principal
+
+
+async def obtener_principal_async(db: AsyncSession, email: str) -> Optional[Principal]:
+    """Igual que obtener_principal, con sesión async."""
+    principal = cache_principales.obtener(email)
+    registrar_cache("principales", principal is not None)
+    if principal is None:
+        principal = await cargar_principal_async(db, email)
+        if principal is not None:
+            cache_principales.guardar(email, principal)
+    return principal
+
+
+def invalidar_principal(usuario_id: Optional[int]) -> None:
+    """
+    Descarta el principal cacheado de un usuario.
+
+    Llamar después de bloquear, desactivar, eliminar o restaurar un usuario,
+    cambiar sus roles, su email o sus perfiles padre/docente/estudiante.
+    """
+    if usuario_id is not None:
+        cache_principales.invalidar_usuario(usuario_id)
@@ -0,0 +1,186 @@
+"""
+Caché de respuestas para los catálogos de lectura.
+
+Los catálogos (lecturas, categorías, cursos activos, texto de una lectura y
+sus actividades) se leen en cada pantalla y cambian muy poco. Este módulo
+guarda el cuerpo JSON ya serializado junto con su ETag:
+
+- Clave: ruta + query string ordenada + alcance del principal ("global"
+  para catálogos iguales para todos, "usuario:<id>" si depende del usuario)
+- ETag: hash del cuerpo serializado. Para las lecturas el cuerpo incluye
+  `fecha_actualizacion`, así que el ETag cambia al editar la lectura
+- Si el cliente envía `If-None-Match` con el ETag vigente se responde 304
+  sin cuerpo (ni consulta a la BD si la entrada está en caché)
+- Invalidación por etiqueta al escribir: `invalidar_cache("contenido")`
+  descarta todas las entradas que dependen de ContenidoLectura
+
+La caché es por proceso: con varios workers, un cambio hecho en otro worker
+se ve como máximo RESPONSE_CACHE_TTL_SEGUNDOS después.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app import settings
+from app.metricas import registrar_cache
+
+
+# Etiquetas de invalidación (una por tabla de catálogo)
+CONTENIDO = "contenido"
+CATEGORIAS = "categorias"
+CURSOS = "cursos"
+ACTIVIDADES = "actividades"
+
+CACHE_CONTROL = "private, no-cache"
+
+
+@dataclass(frozen=True)
+class EntradaCache:
+    cuerpo: bytes
+    etag: str
+    cabeceras: Dict[str, str] = field(default_factory=dict)
+
+
+class CacheRespuestas:
+    """LRU con TTL e invalidación por etiqueta, segura entre hilos."""
+
+    def __init__(self, ttl_segundos: float, max_entradas: int) -> None:
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[str, Tuple[EntradaCache, float, Tuple[str, ...]]]" = OrderedDict()
+        self._generaciones: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str) -> Optional[EntradaCache]:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            respuesta, expira, _ = entrada
+            if expira < time.monotonic():
+                del self._entradas[clave]
+                return None
+            self._entradas.move_to_end(clave)
+            return respuesta
+
+    def generacion(self, etiquetas: Iterable[str]) -> Tuple[int, ...]:
+        """Versión actual de cada etiqueta; cambia con cada invalidación."""
+        with self._lock:
+            return tuple(self._generaciones.get(e, 0) for e in etiquetas)
+
+    def guardar(
+        self,
+        clave: str,
+        respuesta: EntradaCache,
+        etiquetas: Tuple[str, ...],
+        generacion: Tuple[int, ...],
+    ) -> None:
+        """
+        Guarda la respuesta salvo que alguna etiqueta se haya invalidado
+        mientras se generaba (el resultado podría ser anterior al cambio).
+        """
+        if self.ttl_segundos <= 0 or self.max_entradas <= 0:
+            return
+        with self._lock:
+            if tuple(self._generaciones.get(e, 0) for e in etiquetas) != generacion:
+                return
+            self._entradas[clave] = (respuesta, time.monotonic() + self.ttl_segundos, etiquetas)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, *etiquetas: str) -> None:
+        with self._lock:
+            for etiqueta in etiquetas:
+                self._generaciones[etiqueta] = self._generaciones.get(etiqueta, 0) + 1
+            afectadas = [
+                clave for clave, (_, _, tags) in self._entradas.items()
+                if any(e in tags for e in etiquetas)
+            ]
+            for clave in afectadas:
+                del self._entradas[clave]
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+
+cache_respuestas = CacheRespuestas(
+    ttl_segundos=settings.RESPONSE_CACHE_TTL_SEGUNDOS,
+    max_entradas=settings.RESPONSE_CACHE_MAX,
+)
+
+
+def invalidar_cache(*etiquetas: str) -> None:
+    """Descarta las respuestas cacheadas que dependen de esas etiquetas."""
+    cache_respuestas.invalidar(*etiquetas)
+
+
+def _clave(request: Request, alcance: str) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}|{alcance}"
+
+
+def _serializar(contenido: Any) -> EntradaCache:
+    cuerpo = json.dumps(
+        jsonable_encoder(contenido), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    etag = '"' + hashlib.sha1(cuerpo).hexdigest() + '"'
+    return EntradaCache(cuerpo=cuerpo, etag=etag)
+
+
+def _coincide_etag(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidatos = [c.strip() for c in if_none_match.split(",")]
+    # Comparación débil (RFC 9110): se ignora el prefijo W/
+    return "*" in candidatos or etag in (c.removeprefix("W/") for c in candidatos)
+
+
+def responder_cacheado(
+    request: Request,
+    etiquetas: Tuple[str, ...],
+    generar: Callable[[Dict[str, str]], Any],
+    alcance: str = "global",
+) -> Response:
+    """
+    Responde desde la caché o genera y cachea la respuesta.
+
+    Args:
+        request: Request actual (ruta, query y If-None-Match)
+        etiquetas: Tablas de las que depende la respuesta
+        generar: Función que consulta la BD y devuelve el contenido
+            (modelos pydantic, dicts, ...). Recibe un dict donde puede
+            añadir cabeceras que se cachean junto al cuerpo (X-Next-Cursor)
+        alcance: "global" o un identificador del principal si el resultado
+            depende del usuario
+
+    Las excepciones de `generar` (p. ej. HTTPException 404) se propagan sin
+    cachear nada.
+    """
+    clave = _clave(request, alcance)
+    entrada = cache_respuestas.obtener(clave)
+    registrar_cache("respuestas", entrada is not None)
+
+    if entrada is None:
+        generacion = cache_respuestas.generacion(etiquetas)
+        cabeceras: Dict[str, str] = {}
+        contenido = generar(cabeceras)
+        serializada = _serializar(contenido)
+        entrada = EntradaCache(serializada.cuerpo, serializada.etag, cabeceras)
+        cache_respuestas.guardar(clave, entrada, etiquetas, generacion)
+
+    headers = {**entrada.cabeceras, "ETag": entrada.etag, "Cache-Control": CACHE_CONTROL}
+
+    if _coincide_etag(request.headers.get("if-none-match"), entrada.etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=entrada.cuerpo, media_type="application/json", headers=headers)
@@ -0,0 +1,280 @@
+"""
+Cola durable de emails salientes.
+
+Los flujos de usuario (registro, verificación, reset de contraseña, alta de
+docentes) no esperan al proveedor de email: `encolar_correo` inserta una
+fila en `correo_saliente` y despierta al emisor, que corre en un hilo de
+fondo por proceso:
+
+1. Reclama un lote de pendientes vencidos con FOR UPDATE SKIP LOCKED (varios
+   workers no se pisan) y adelanta su proximo_intento como reserva: si el
+   proceso muere a mitad del envío, el correo vuelve a la cola
+2. Envía el lote por EMAIL_SMTP_CONEXIONES hilos, cada uno con una conexión
+   SMTP reutilizada (ver PoolConexionesSMTP en email_service)
+3. Marca enviados; los fallidos se reintentan con backoff exponencial
+   (EMAIL_REINTENTO_BASE_SEGUNDOS * 2^n, hasta EMAIL_REINTENTO_MAX_SEGUNDOS)
+   y pasan a "fallido" al agotar EMAIL_MAX_INTENTOS
+
+Para desarrollo sin servidor real: EMAIL_PROVIDER=dev (solo log) o
+`python -m app.scripts.smtp_local` con SMTP_HOST=localhost.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app import settings
+from app.config import SessionLocal
+from app.modelos import CorreoSaliente
+from app.servicios.email_service import email_service
+from app.logs.logger import logger
+from app.metricas import registro_metricas
+
+
+# Tiempo que un lote reclamado queda reservado para el worker que lo envía
+RESERVA_SEGUNDOS = 300
+
+
+def calcular_backoff(intentos: int) -> float:
+    """Segundos hasta el siguiente reintento tras `intentos` fallos."""
+    base = settings.EMAIL_REINTENTO_BASE_SEGUNDOS
+    return min(base * (2 ** max(intentos - 1, 0)), settings.EMAIL_REINTENTO_MAX_SEGUNDOS)
+
+
+class EmisorCorreos:
+    """Hilo de fondo que vacía la tabla correo_saliente."""
+
+    def __init__(self, lote: int, intervalo_segundos: float, hilos_envio: int) -> None:
+        self.lote = lote
+        self.intervalo_segundos = intervalo_segundos
+        self.hilos_envio = max(1, hilos_envio)
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def iniciar(self) -> None:
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.hilos_envio, thread_name_prefix="correo-envio"
+        )
+        self._hilo = threading.Thread(target=self._bucle, name="correo-emisor", daemon=True)
+        self._hilo.start()
+        logger.info("📧 Emisor de la cola de correos iniciado")
+
+    def detener(self, timeout: float = 10.0) -> None:
+        self._detener.set()
+        self._despertar.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        email_service.pool_smtp.cerrar()
+
+    def notificar(self) -> None:
+        """Despierta al emisor (hay correos nuevos)."""
+        self._despertar.set()
+
+    def _bucle(self) -> None:
+        while not self._detener.is_set():
+            try:
+                procesados = self.procesar_lote()
+            except Exception as e:
+                logger.error(f"❌ Error procesando la cola de correos: {e}")
+                procesados = 0
+
+            # Lote incompleto: la cola quedó vacía, esperar aviso o intervalo
+            if procesados < self.lote:
+                self._despertar.wait(self.intervalo_segundos)
+                self._despertar.clear()
+
+    def procesar_lote(self) -> int:
+        """Reclama, envía y actualiza un lote. Devuelve cuántos reclamó."""
+        db = SessionLocal()
+        try:
+            correos = self._reclamar(db)
+            if not correos:
+                return 0
+
+            if self._executor is not None:
+                resultados = list(self._executor.map(_entregar, correos))
+            else:
+                resultados = [_entregar(c) for c in correos]
+
+            db.execute(update(CorreoSaliente), _actualizaciones(correos, resultados))
+            db.commit()
+            return len(correos)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _reclamar(self, db: Session) -> List[Any]:
+        vencidos = (
+            select(CorreoSaliente.id)
+            .where(
+                CorreoSaliente.estado == "pendiente",
+                CorreoSaliente.proximo_intento <= func.now(),
+            )
+            .order_by(CorreoSaliente.proximo_intento, CorreoSaliente.id)
+            .limit(self.lote)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        filas = db.execute(
+            update(CorreoSaliente)
+            .where(CorreoSaliente.id.in_(vencidos))
+            .values(
+                intentos=CorreoSaliente.intentos + 1,
+                proximo_intento=func.now() + timedelta(seconds=RESERVA_SEGUNDOS),
+            )
+            .returning(
+                CorreoSaliente.id,
+                CorreoSaliente.destinatario,
+                CorreoSaliente.asunto,
+                CorreoSaliente.html,
+                CorreoSaliente.texto,
+                CorreoSaliente.intentos,
+            )
+        ).all()
+        db.commit()
+        return filas
+
+
+def _entregar(correo: Any) -> Tuple[bool, Optional[str]]:
+    try:
+        if email_service.send_email_now(correo.destinatario, correo.asunto, correo.html, correo.texto):
+            return True, None
+        return False, "El proveedor de email rechazó el envío"
+    except Exception as e:
+        return False, str(e)[:1000]
+
+
+def _actualizaciones(
+    correos: List[Any], resultados: List[Tuple[bool, Optional[str]]]
+) -> List[Dict[str, Any]]:
+    ahora = datetime.now(timezone.utc)
+    filas = []
+    for correo, (enviado, error) in zip(correos, resultados):
+        if enviado:
+            filas.append({"id": correo.id, "estado": "enviado", "enviado_en": ahora, "ultimo_error": None})
+        elif correo.intentos >= settings.EMAIL_MAX_INTENTOS:
+            logger.error(f"❌ Email a {correo.destinatario} descartado tras {correo.intentos} intentos: {error}")
+            filas.append({"id": correo.id, "estado": "fallido", "ultimo_error": error})
+        else:
+            filas.append({
+                "id": correo.id,
+                "ultimo_error": error,
+                "proximo_intento": ahora + timedelta(seconds=calcular_backoff(correo.intentos)),
+            })
+    return filas
+
+
+emisor_correos = EmisorCorreos(
+    lote=settings.EMAIL_COLA_LOTE,
+    intervalo_segundos=settings.EMAIL_COLA_INTERVALO_SEGUNDOS,
+    hilos_envio=settings.EMAIL_SMTP_CONEXIONES,
+)
+
+
+def encolar_correo(
+    destinatario: str,
+    asunto: str,
+    html: str,
+    texto: Optional[str] = None,
+) -> bool:
+    """
+    Guarda el email en la cola y despierta al emisor.
+
+    Usa su propia sesión: el correo queda encolado aunque el request haga
+    rollback después. Si la cola no está disponible (p. ej. falta la
+    migración) se envía en el momento para no perder el email.
+    """
+    db = SessionLocal()
+    try:
+        db.execute(
+            insert(CorreoSaliente).values(
+                destinatario=destinatario, asunto=asunto, html=html, texto=texto,
+            )
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ No se pudo encolar email a {destinatario}, enviando en el momento: {e}")
+        return email_service.send_email_now(destinatario, asunto, html, texto)
+    finally:
+        db.close()
+
+    emisor_correos.notificar()
+    return True
+
+
+def encolar_correos(correos: List[Dict[str, Any]]) -> int:
+    """
+    Encola muchos emails con un solo INSERT (altas masivas, invitaciones).
+
+    Args:
+        correos: Dicts con to_email, subject, html_content y text_content
+            (el formato de EmailService.build_setup_account_emails)
+
+    Returns:
+        Cantidad de emails encolados (o enviados en el momento si la cola
+        no está disponible)
+    """
+    if not correos:
+        return 0
+
+    db = SessionLocal()
+    try:
+        db.execute(insert(CorreoSaliente), [
+            {
+                "destinatario": c["to_email"],
+                "asunto": c["subject"],
+                "html": c["html_content"],
+                "texto": c.get("text_content"),
+            }
+            for c in correos
+        ])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ No se pudieron encolar {len(correos)} emails, enviando en el momento: {e}")
+        return sum(1 for c in correos if email_service.send_email_now(**c))
+    finally:
+        db.close()
+
+    emisor_correos.notificar()
+    return len(correos)
+
+
+def estado_cola_correos(db: Session) -> Dict[str, int]:
+    """Conteo de correos por estado (para el panel de administración)."""
+    filas = db.execute(
+        select(CorreoSaliente.estado, func.count()).group_by(CorreoSaliente.estado)
+    ).all()
+    return {estado: total for estado, total in filas}
+
+
+def _correos_pendientes() -> int:
+    db = SessionLocal()
+    try:
+        return db.scalar(
+            select(func.count()).select_from(CorreoSaliente).where(CorreoSaliente.estado == "pendiente")
+        )
+    finally:
+        db.close()
+
+
+registro_metricas.indicador(
+    "bookismart_cola_correos_pendientes", "Correos pendientes de envío (todos los workers)",
+    _correos_pendientes, por_proceso=False,
+)
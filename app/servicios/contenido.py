@@ -4,17 +4,21 @@ from typing import List, Optional
 
 from app.modelos import ContenidoLectura, CategoriaLectura, AudioReferencia
 from app.esquemas.contenido import ContenidoLecturaCreate, ContenidoLecturaUpdate, CategoriaLecturaCreate, CategoriaLecturaUpdate, AudioReferenciaCreate
+from app.servicios.paginacion import paginar_keyset
+from app.servicios.cache_respuestas import CATEGORIAS, CONTENIDO, invalidar_cache
 
 def crear_contenido_lectura(db: Session, contenido: ContenidoLecturaCreate):
     db_contenido = ContenidoLectura(**contenido.dict())
     db.add(db_contenido)
     db.commit()
     db.refresh(db_contenido)
+    invalidar_cache(CONTENIDO)
     return db_contenido
 
 def obtener_contenidos(db: Session, skip: int = 0, limit: int = 100, 
                       curso_id: Optional[int] = None, categoria_id: Optional[int] = None,
-                      docente_id: Optional[int] = None, activo: Optional[bool] = None):
+                      docente_id: Optional[int] = None, activo: Optional[bool] = None,
+                      cursor: Optional[str] = None):
     query = db.query(ContenidoLectura)
     if curso_id is not None:
         query = query.filter(ContenidoLectura.curso_id == curso_id)
@@ -24,7 +28,10 @@ def obtener_contenidos(db: Session, skip: int = 0, limit: int = 100,
         query = query.filter(ContenidoLectura.docente_id == docente_id)
     if activo is not None:
         query = query.filter(ContenidoLectura.activo == activo)
-    return query.offset(skip).limit(limit).all()
+    query = paginar_keyset(query, (ContenidoLectura.id,), cursor, limit)
+    if not cursor and skip:
+        query = query.offset(skip)
+    return query.all()
 
 def obtener_contenido(db: Session, contenido_id: int):
     return db.query(ContenidoLectura).filter(ContenidoLectura.id == contenido_id).first()
@@ -40,6 +47,7 @@ def actualizar_contenido(db: Session, contenido_id: int, contenido: ContenidoLec
     
     db.commit()
     db.refresh(db_contenido)
+    invalidar_cache(CONTENIDO)
     return db_contenido
 
 def eliminar_contenido(db: Session, contenido_id: int):
@@ -50,6 +58,7 @@ def eliminar_contenido(db: Session, contenido_id: int):
     # Soft delete
     db_contenido.activo = False
     db.commit()
+    invalidar_cache(CONTENIDO)
     return db_contenido
 
 def crear_categoria_lectura(db: Session, categoria: CategoriaLecturaCreate):
@@ -57,6 +66,7 @@ def crear_categoria_lectura(db: Session, categoria: CategoriaLecturaCreate):
     db.add(db_categoria)
     db.commit()
     db.refresh(db_categoria)
+    invalidar_cache(CATEGORIAS)
     return db_categoria
 
 def obtener_categorias(db: Session, skip: int = 0, limit: int = 100, activo: Optional[bool] = None):
@@ -79,6 +89,7 @@ def actualizar_categoria(db: Session, categoria_id: int, categoria: CategoriaLec
     
     db.commit()
     db.refresh(db_categoria)
+    invalidar_cache(CATEGORIAS)
     return db_categoria
 
 def eliminar_categoria(db: Session, categoria_id: int):
@@ -89,6 +100,7 @@ def eliminar_categoria(db: Session, categoria_id: int):
     # Soft delete
     db_categoria.activo = False
     db.commit()
+    invalidar_cache(CATEGORIAS)
     return db_categoria
 
 def crear_audio_referencia(db: Session, audio: AudioReferenciaCreate):
@@ -6,6 +6,8 @@ import string
 
 from app.modelos import Curso, EstudianteCurso
 from app.esquemas.curso import CursoCreate, CursoUpdate
+from app.servicios.paginacion import paginar_keyset
+from app.servicios.cache_respuestas import CURSOS, invalidar_cache
 
 
 def generar_codigo_acceso(length: int = 8) -> str:
@@ -34,6 +36,7 @@ def crear_curso(db: Session, curso: CursoCreate):
     db.add(db_curso)
     db.commit()
     db.refresh(db_curso)
+    invalidar_cache(CURSOS)
     return db_curso
 
 
@@ -43,17 +46,19 @@ def obtener_cursos(
     skip: int = 0,
     limit: int = 100,
     docente_id: Optional[int] = None,
-    activo: Optional[bool] = None
+    activo: Optional[bool] = None,
+    cursor: Optional[str] = None
 ):
     """
     Lista cursos con filtros opcionales.
     
     Args:
         db: Sesión de base de datos
-        skip: Offset para paginación
+        skip: Offset para paginación (ignorado si se envía cursor)
         limit: Límite de resultados
         docente_id: Filtrar por docente específico
         activo: Filtrar por estado activo/inactivo
+        cursor: Cursor keyset de la página anterior
     
     Returns:
         Lista de cursos
@@ -70,7 +75,10 @@ def obtener_cursos(
     if activo is not None:
         query = query.filter(Curso.activo == activo)
     
-    return query.offset(skip).limit(limit).all()
+    query = paginar_keyset(query, (Curso.id,), cursor, limit)
+    if not cursor and skip:
+        query = query.offset(skip)
+    return query.all()
 
 
 
@@ -143,6 +151,7 @@ def actualizar_curso(db: Session, curso_id: int, curso: CursoUpdate):
 
     db.commit()
     db.refresh(db_curso)
+    invalidar_cache(CURSOS)
     return db_curso
 
 
@@ -251,6 +260,7 @@ def eliminar_curso(db: Session, curso_id: int):
     try:
         db.delete(db_curso)
         db.commit()
+        invalidar_cache(CURSOS)
         
         return {
             "mensaje": "Curso eliminado correctamente",
@@ -285,6 +295,7 @@ def toggle_curso_activo(db: Session, curso_id: int):
     
     db.commit()
     db.refresh(db_curso)
+    invalidar_cache(CURSOS)
     
     return db_curso
 
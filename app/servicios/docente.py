@@ -4,6 +4,7 @@ from typing import List, Optional
 
 from app.modelos import Docente
 from app.esquemas.docente import DocenteCreate, DocenteUpdate
+from app.servicios.revocacion_tokens import revocar_tokens_usuario
 
 def crear_docente(db: Session, docente: DocenteCreate):
     # Verificar si el usuario ya tiene un perfil de docente
@@ -43,6 +44,8 @@ def actualizar_docente(db: Session, docente_id: int, docente: DocenteUpdate):
     
     db.commit()
     db.refresh(db_docente)
+    if "activo" in update_data:
+        revocar_tokens_usuario(db, db_docente.usuario_id)
     return db_docente
 
 def eliminar_docente(db: Session, docente_id: int):
@@ -52,4 +55,5 @@ def eliminar_docente(db: Session, docente_id: int):
     
     db_docente.activo = False
     db.commit()
+    revocar_tokens_usuario(db, db_docente.usuario_id)
     return db_docente
\ No newline at end of file
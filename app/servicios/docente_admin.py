@@ -7,6 +7,7 @@ from app.modelos import Usuario, UsuarioRol, Docente, Estudiante
 from app.esquemas.docente import DocenteCreateAdmin, DocenteUpdate
 from app.servicios.seguridad import obtener_password_hash
 from app.servicios.email_service import email_service
+from app.servicios.revocacion_tokens import revocar_tokens_usuario
 import secrets
 
 
@@ -160,6 +161,7 @@ def crear_docente_admin(db: Session, data: DocenteCreateAdmin) -> Docente:
 
         db.commit()
         db.refresh(docente)
+        revocar_tokens_usuario(db, usuario_existente.id)
 
         # Enviar correo de setup nuevamente
         try:
@@ -259,6 +261,7 @@ def actualizar_docente_admin(db: Session, docente_id: int, data: DocenteUpdate)
 
     db.commit()
     db.refresh(docente)
+    revocar_tokens_usuario(db, usuario.id)
     return docente
 
 
@@ -287,6 +290,7 @@ def toggle_docente_admin(db: Session, docente_id: int) -> Docente:
 
     db.commit()
     db.refresh(docente)
+    revocar_tokens_usuario(db, docente.usuario_id)
     return docente
 
 
@@ -316,6 +320,7 @@ def eliminar_docente_admin(db: Session, docente_id: int):
             docente.usuario.activo = False
 
         db.commit()
+        revocar_tokens_usuario(db, docente.usuario_id)
         return {"mensaje": "Docente eliminado correctamente"}
 
     except Exception as e:
@@ -352,6 +357,7 @@ def restaurar_docente_admin(db: Session, docente_id: int) -> Docente:
 
         db.commit()
         db.refresh(docente)
+        revocar_tokens_usuario(db, docente.usuario_id)
         return docente
 
     except Exception as e:
@@ -1,14 +1,127 @@
 import smtplib
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 from pathlib import Path
 
+from jinja2 import Environment, FileSystemLoader, TemplateNotFound, select_autoescape
+
 from app import settings
 from app.logs.logger import logger
 
 
+TEMPLATES_DIR = Path(__file__).parent.parent / 'templates'
+
+# Si falta la plantilla se envía el texto plano dentro de un HTML básico
+PLANTILLA_BASICA = "<html><body><pre>{{ TEXTO }}</pre></body></html>"
+
+
+def crear_entorno_plantillas() -> Environment:
+    """
+    Entorno Jinja2 para las plantillas de email.
+
+    Cada plantilla se lee y compila una sola vez y queda en la caché del
+    entorno. Solo en desarrollo (ENVIRONMENT=development) se vuelve a
+    comprobar el archivo en cada uso para ver los cambios sin reiniciar.
+    """
+    return Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR), encoding='utf-8'),
+        autoescape=select_autoescape(['html']),
+        auto_reload=str(getattr(settings, 'ENVIRONMENT', 'production')).lower() == 'development',
+        cache_size=50,
+    )
+
+
+class PoolConexionesSMTP:
+    """
+    Conexiones SMTP reutilizables, seguras entre hilos.
+
+    Abrir una conexión cuesta TCP + STARTTLS + login; aquí cada conexión
+    se reutiliza para muchos mensajes:
+
+    - Como máximo `max_conexiones` abiertas; si están todas en uso se espera
+    - Una conexión inactiva más de `max_inactividad_segundos` se cierra y se
+      reabre (los servidores cortan las conexiones ociosas)
+    - Una conexión que falla durante el envío se descarta
+    """
+
+    def __init__(
+        self,
+        host: Optional[str],
+        port: int,
+        user: Optional[str],
+        password: Optional[str],
+        use_tls: bool,
+        max_conexiones: int,
+        max_inactividad_segundos: float,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.max_inactividad_segundos = max_inactividad_segundos
+        self._libres: "queue.LifoQueue[tuple]" = queue.LifoQueue()
+        self._cupos = threading.BoundedSemaphore(max(1, max_conexiones))
+
+    def _abrir(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        if self.use_tls:
+            server.starttls()
+        if self.user and self.password:
+            server.login(self.user, self.password)
+        return server
+
+    @staticmethod
+    def _cerrar_conexion(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    @contextmanager
+    def conexion(self) -> Iterator[smtplib.SMTP]:
+        """Presta una conexión abierta; se devuelve al pool al salir."""
+        self._cupos.acquire()
+        server = None
+        try:
+            try:
+                server, ultimo_uso = self._libres.get_nowait()
+                if time.monotonic() - ultimo_uso > self.max_inactividad_segundos:
+                    self._cerrar_conexion(server)
+                    server = None
+            except queue.Empty:
+                pass
+
+            if server is None:
+                server = self._abrir()
+
+            try:
+                yield server
+            except Exception:
+                self._cerrar_conexion(server)
+                server = None
+                raise
+        finally:
+            if server is not None:
+                self._libres.put((server, time.monotonic()))
+            self._cupos.release()
+
+    def cerrar(self) -> None:
+        """Cierra las conexiones libres (al apagar la aplicación)."""
+        while True:
+            try:
+                server, _ = self._libres.get_nowait()
+            except queue.Empty:
+                return
+            self._cerrar_conexion(server)
+
+
 class EmailService:
     """
     Servicio centralizado para envío de emails.
@@ -36,24 +149,58 @@ class EmailService:
         # Configuración SendGrid
         self.sendgrid_api_key = getattr(settings, 'SENDGRID_API_KEY', None)
 
-    def _load_template(self, template_name: str) -> str:
+        # Plantillas compiladas (Jinja2)
+        self.templates = crear_entorno_plantillas()
+
+        self.pool_smtp = PoolConexionesSMTP(
+            host=self.smtp_host,
+            port=self.smtp_port,
+            user=self.smtp_user,
+            password=self.smtp_password,
+            use_tls=self.smtp_use_tls,
+            max_conexiones=getattr(settings, 'EMAIL_SMTP_CONEXIONES', 2),
+            max_inactividad_segundos=getattr(settings, 'EMAIL_SMTP_INACTIVIDAD_SEGUNDOS', 60),
+        )
+
+    def _load_template(self, template_name: str):
         """
-        Carga una plantilla HTML desde app/templates/
+        Plantilla compilada de app/templates/ (desde la caché del entorno).
 
         Args:
             template_name: Nombre del archivo de plantilla (ej: 'email_reset_password.html')
 
         Returns:
-            str: Contenido HTML de la plantilla
+            jinja2.Template: Plantilla lista para render()
         """
-        template_path = Path(__file__).parent.parent / 'templates' / template_name
-
         try:
-            with open(template_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except FileNotFoundError:
+            return self.templates.get_template(template_name)
+        except TemplateNotFound:
             logger.warning(f"⚠️ Plantilla {template_name} no encontrada, usando HTML básico")
-            return "<html><body>{content}</body></html>"
+            return self.templates.from_string(PLANTILLA_BASICA)
+
+    def render_template(self, template_name: str, **contexto: Any) -> str:
+        """
+        Renderiza una plantilla de email.
+
+        Las variables de las plantillas van en mayúsculas ({{ USUARIO_NOMBRE }});
+        FRONTEND_URL se agrega siempre.
+        """
+        return self._load_template(template_name).render(FRONTEND_URL=self.frontend_url, **contexto)
+
+    def render_template_batch(
+        self,
+        template_name: str,
+        contextos: Iterable[Dict[str, Any]]
+    ) -> List[str]:
+        """
+        Renderiza la misma plantilla para muchos destinatarios (invitaciones
+        a una clase, altas masivas): se resuelve una vez y se reutiliza.
+        """
+        template = self._load_template(template_name)
+        return [
+            template.render(FRONTEND_URL=self.frontend_url, **contexto)
+            for contexto in contextos
+        ]
 
     def _send_via_smtp(
         self,
@@ -74,7 +221,8 @@ class EmailService:
         Returns:
             bool: True si se envió correctamente, False si hubo error
         """
-        if not all([self.smtp_host, self.smtp_user, self.smtp_password]):
+        # Sin usuario/contraseña se envía sin AUTH (p. ej. app.scripts.smtp_local)
+        if not self.smtp_host or bool(self.smtp_user) != bool(self.smtp_password):
             logger.error("❌ Configuración SMTP incompleta. Verifica .env")
             return False
 
@@ -94,13 +242,14 @@ class EmailService:
             part_html = MIMEText(html_content, 'html', 'utf-8')
             msg.attach(part_html)
 
-            # Conectar y enviar
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                if self.smtp_use_tls:
-                    server.starttls()
-
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            # Enviar por una conexión reutilizada; si el servidor la cerró
+            # mientras estaba libre, se reintenta una vez con otra nueva
+            try:
+                with self.pool_smtp.conexion() as server:
+                    server.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                with self.pool_smtp.conexion() as server:
+                    server.send_message(msg)
 
             logger.info(f"📧 Email SMTP enviado exitosamente a {to_email}")
             return True
@@ -202,7 +351,11 @@ class EmailService:
         text_content: Optional[str] = None
     ) -> bool:
         """
-        Envía un email usando el proveedor configurado.
+        Encola un email para el emisor en segundo plano.
+
+        El request no espera al proveedor: el email se guarda en la tabla
+        correo_saliente y se envía (con reintentos) desde cola_correos.
+        Con EMAIL_COLA_ACTIVA=False se envía en el momento.
 
         Args:
             to_email: Email del destinatario
@@ -210,6 +363,28 @@ class EmailService:
             html_content: Contenido HTML
             text_content: Contenido texto plano (opcional)
 
+        Returns:
+            bool: True si se encoló (o envió), False si hubo error
+        """
+        if not getattr(settings, 'EMAIL_COLA_ACTIVA', True):
+            return self.send_email_now(to_email, subject, html_content, text_content)
+
+        from app.servicios.cola_correos import encolar_correo
+        return encolar_correo(to_email, subject, html_content, text_content)
+
+    def send_email_now(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None
+    ) -> bool:
+        """
+        Envía un email en el momento usando el proveedor configurado.
+
+        Lo usa el emisor de la cola; los flujos de la aplicación deben usar
+        send_email.
+
         Returns:
             bool: True si se envió (o modo dev), False si hubo error
         """
@@ -247,18 +422,9 @@ class EmailService:
         Returns:
             bool: True si se envió correctamente
         """
-        # Cargar plantilla
-        template = self._load_template('email_reset_password.html')
-
         # URL completa para resetear
         reset_url = f"{self.frontend_url}/reset-password?token={reset_token}"
 
-        # Reemplazar variables en la plantilla
-        html_content = template.replace('{{USUARIO_NOMBRE}}', usuario_nombre)
-        html_content = html_content.replace('{{RESET_URL}}', reset_url)
-        html_content = html_content.replace('{{TOKEN}}', reset_token)
-        html_content = html_content.replace('{{FRONTEND_URL}}', self.frontend_url)
-
         # Contenido texto plano (fallback)
         text_content = f"""
 Hola {usuario_nombre},
@@ -279,6 +445,14 @@ Saludos,
 Equipo  BookiSmartIA
         """.strip()
 
+        html_content = self.render_template(
+            'email_reset_password.html',
+            USUARIO_NOMBRE=usuario_nombre,
+            RESET_URL=reset_url,
+            TOKEN=reset_token,
+            TEXTO=text_content,
+        )
+
         # Enviar
         subject = "Resetear Contraseña - BookiSmartIA"
         return self.send_email(to_email, subject, html_content, text_content)
@@ -301,18 +475,9 @@ Equipo  BookiSmartIA
         Returns:
             bool: True si se envió correctamente
         """
-        # Cargar plantilla
-        template = self._load_template('email_verification.html')
-
         # URL completa para verificar
         verify_url = f"{self.frontend_url}/verificar-email?token={verify_token}"
 
-        # Reemplazar variables en la plantilla
-        html_content = template.replace('{{USUARIO_NOMBRE}}', usuario_nombre)
-        html_content = html_content.replace('{{VERIFY_URL}}', verify_url)
-        html_content = html_content.replace('{{TOKEN}}', verify_token)
-        html_content = html_content.replace('{{FRONTEND_URL}}', self.frontend_url)
-
         # Contenido texto plano (fallback)
         text_content = f"""
 Hola {usuario_nombre},
@@ -333,20 +498,38 @@ Saludos,
 Equipo BookiSmartIA
         """.strip()
 
+        html_content = self.render_template(
+            'email_verification.html',
+            USUARIO_NOMBRE=usuario_nombre,
+            VERIFY_URL=verify_url,
+            TOKEN=verify_token,
+            TEXTO=text_content,
+        )
+
         # Enviar
         subject = "Verifica tu correo - BookiSmartIA"
         return self.send_email(to_email, subject, html_content, text_content)
 
-    def send_setup_account_email(self, to_email: str, usuario_nombre: str, setup_token: str) -> bool:
-        template = self._load_template('email_setup_account.html')
-        setup_url = f"{self.frontend_url}/configurar-cuenta?token={setup_token}"
+    def build_setup_account_emails(
+        self,
+        invitaciones: Iterable[Dict[str, str]]
+    ) -> List[Dict[str, str]]:
+        """
+        Arma los emails de configuración de cuenta de muchos usuarios con
+        una sola plantilla compilada (altas masivas, invitaciones a una clase).
 
-        html_content = template.replace('{{USUARIO_NOMBRE}}', usuario_nombre)
-        html_content = html_content.replace('{{SETUP_URL}}', setup_url)
-        html_content = html_content.replace('{{TOKEN}}', setup_token)
-        html_content = html_content.replace('{{FRONTEND_URL}}', self.frontend_url)
+        Args:
+            invitaciones: Dicts con to_email, usuario_nombre y setup_token
 
-        text_content = f"""Hola {usuario_nombre},
+        Returns:
+            Dicts con to_email, subject, html_content y text_content
+        """
+        invitaciones = list(invitaciones)
+        contextos = []
+        textos = []
+        for inv in invitaciones:
+            setup_url = f"{self.frontend_url}/configurar-cuenta?token={inv['setup_token']}"
+            text_content = f"""Hola {inv['usuario_nombre']},
 
 El administrador creó tu cuenta en BookiSmartIA.
 
@@ -354,12 +537,51 @@ Configura tu cuenta aquí:
 {setup_url}
 
 Token:
-{setup_token}
+{inv['setup_token']}
 
 Este enlace expira en 48 horas.
 """.strip()
-
+            textos.append(text_content)
+            contextos.append({
+                "USUARIO_NOMBRE": inv['usuario_nombre'],
+                "SETUP_URL": setup_url,
+                "TOKEN": inv['setup_token'],
+                "TEXTO": text_content,
+            })
+
+        htmls = self.render_template_batch('email_setup_account.html', contextos)
         subject = "Configura tu cuenta - BookiSmartIA"
-        return self.send_email(to_email, subject, html_content, text_content)
+        return [
+            {
+                "to_email": inv['to_email'],
+                "subject": subject,
+                "html_content": html_content,
+                "text_content": text_content,
+            }
+            for inv, html_content, text_content in zip(invitaciones, htmls, textos)
+        ]
+
+    def send_setup_account_emails(self, invitaciones: Iterable[Dict[str, str]]) -> int:
+        """
+        Envía (encola) los emails de configuración de cuenta de un lote de
+        usuarios: una plantilla compilada y un solo INSERT en la cola.
+
+        Returns:
+            int: Cantidad de emails encolados o enviados
+        """
+        emails = self.build_setup_account_emails(invitaciones)
+        if not getattr(settings, 'EMAIL_COLA_ACTIVA', True):
+            return sum(1 for email in emails if self.send_email_now(**email))
+
+        from app.servicios.cola_correos import encolar_correos
+        return encolar_correos(emails)
+
+    def send_setup_account_email(self, to_email: str, usuario_nombre: str, setup_token: str) -> bool:
+        email = self.build_setup_account_emails([{
+            "to_email": to_email,
+            "usuario_nombre": usuario_nombre,
+            "setup_token": setup_token,
+        }])[0]
+        return self.send_email(**email)
 
 email_service = EmailService()
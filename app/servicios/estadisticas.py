@@ -66,10 +66,21 @@ def obtener_progreso_cursos(db: Session, docente_id: int):
     
     return resultados
 
-def obtener_reportes_evaluacion(db: Session, estudiante_id: int, limite: int = 10):
-    evaluaciones = db.query(EvaluacionLectura).filter(
+def consulta_evaluaciones_recientes(db: Session, estudiante_id: int, limite: int = 10):
+    """Últimas evaluaciones del estudiante, las más recientes primero."""
+    return db.query(EvaluacionLectura).filter(
         EvaluacionLectura.estudiante_id == estudiante_id
-    ).order_by(EvaluacionLectura.fecha_evaluacion.desc()).limit(limite).all()
+    ).order_by(EvaluacionLectura.fecha_evaluacion.desc()).limit(limite)
+
+def consulta_lecturas_aprobadas(db: Session, estudiante_id: int):
+    """Número de lecturas distintas aprobadas (precisión >= 70%) por el estudiante."""
+    return db.query(func.count(EvaluacionLectura.contenido_id.distinct())).filter(
+        EvaluacionLectura.estudiante_id == estudiante_id,
+        EvaluacionLectura.precision_palabras >= 70
+    )
+
+def obtener_reportes_evaluacion(db: Session, estudiante_id: int, limite: int = 10):
+    evaluaciones = consulta_evaluaciones_recientes(db, estudiante_id, limite).all()
     
     reportes = []
     for eval in evaluaciones:
@@ -1,6 +1,7 @@
 from typing import List, Dict, Set
 from collections import defaultdict
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.modelos import (
@@ -37,78 +38,129 @@ class GeneradorEjercicios:
             resultado[tipo].add(palabra)
         return resultado
 
-    def crear_ejercicios_desde_errores(
+    def _plan_ejercicio(self, tipo_error: str) -> tuple:
+        """Texto de práctica y dificultad según el tipo de error."""
+        if tipo_error == "puntuacion":
+            return (
+                "Lee en voz alta las oraciones poniendo especial atención a los puntos y comas.",
+                2,
+            )
+        if tipo_error in ("sustitucion", "insercion"):
+            return (
+                "Repite las palabras indicadas hasta que suenen claras y correctas.",
+                1,
+            )
+        if tipo_error == "omision":
+            return (
+                "Lee nuevamente las oraciones completas, sin saltarte palabras.",
+                2,
+            )
+        return "Practica las partes indicadas de la lectura.", 1
+
+    def insertar_ejercicios(
         self,
         db: Session,
         estudiante_id: int,
         evaluacion_id: int,
         errores: List[Dict],
-    ) -> List[int]:
-        estudiante = db.query(Estudiante).filter(Estudiante.id == estudiante_id).first()
-        if not estudiante:
-            return []
+    ) -> List[Dict]:
+        """
+        Inserta en bloque los ejercicios y fragmentos derivados de los errores.
 
+        Un INSERT ... RETURNING para los ejercicios y un INSERT para todos
+        los fragmentos. No hace commit ni valida al estudiante: se usa dentro
+        de una transacción ya abierta.
+
+        Returns:
+            Ejercicios creados, con el mismo formato que devuelve la API
+        """
         palabras_por_tipo = self._extraer_palabras_por_tipo(errores)
-        ejercicios_ids: List[int] = []
 
+        ejercicios: List[Dict] = []
+        tipos_error: List[str] = []
         for tipo_error, palabras_set in palabras_por_tipo.items():
             if not palabras_set:
                 continue
 
-            tipo_ejercicio = self.mapa_tipo_a_ejercicio.get(
-                tipo_error, "palabras_aisladas"
+            texto_practica, dificultad = self._plan_ejercicio(tipo_error)
+            ejercicios.append(
+                {
+                    "estudiante_id": estudiante_id,
+                    "evaluacion_id": evaluacion_id,
+                    "tipo_ejercicio": self.mapa_tipo_a_ejercicio.get(
+                        tipo_error, "palabras_aisladas"
+                    ),
+                    "palabras_objetivo": list(palabras_set),
+                    "texto_practica": texto_practica,
+                    "dificultad": dificultad,
+                    "completado": False,
+                    "intentos": 0,
+                }
             )
-            palabras_objetivo = list(palabras_set)
+            tipos_error.append(tipo_error)
 
-            if tipo_error == "puntuacion":
-                texto_practica = (
-                    "Lee en voz alta las oraciones poniendo especial atención a los puntos y comas."
-                )
-                dificultad = 2
-            elif tipo_error in ("sustitucion", "insercion"):
-                texto_practica = (
-                    "Repite las palabras indicadas hasta que suenen claras y correctas."
-                )
-                dificultad = 1
-            elif tipo_error == "omision":
-                texto_practica = (
-                    "Lee nuevamente las oraciones completas, sin saltarte palabras."
-                )
-                dificultad = 2
-            else:
-                texto_practica = "Practica las partes indicadas de la lectura."
-                dificultad = 1
-
-            ejercicio = EjercicioPractica(
-                estudiante_id=estudiante_id,
-                evaluacion_id=evaluacion_id,
-                tipo_ejercicio=tipo_ejercicio,
-                palabras_objetivo=palabras_objetivo,
-                texto_practica=texto_practica,
-                dificultad=dificultad,
-                completado=False,
-                intentos=0,
-            )
-            db.add(ejercicio)
-            db.flush()
+        if not ejercicios:
+            return []
 
-            ejercicios_ids.append(ejercicio.id)
+        ejercicios_ids = db.scalars(
+            insert(EjercicioPractica).returning(
+                EjercicioPractica.id, sort_by_parameter_order=True
+            ),
+            ejercicios,
+        ).all()
 
-            for palabra in palabras_objetivo:
+        fragmentos: List[Dict] = []
+        for ejercicio, ejercicio_id, tipo_error in zip(ejercicios, ejercicios_ids, tipos_error):
+            ejercicio["id"] = ejercicio_id
+            for palabra in ejercicio["palabras_objetivo"]:
                 frag_text = f"Lee en voz alta la palabra: {palabra}"
-                fragmento = FragmentoPractica(
-                    ejercicio_id=ejercicio.id,
-                    texto_fragmento=frag_text,
-                    posicion_inicio=0,
-                    posicion_fin=len(frag_text),
-                    tipo_error_asociado=tipo_error,
-                    completado=False,
-                    mejora_lograda=False,
+                fragmentos.append(
+                    {
+                        "ejercicio_id": ejercicio_id,
+                        "texto_fragmento": frag_text,
+                        "posicion_inicio": 0,
+                        "posicion_fin": len(frag_text),
+                        "tipo_error_asociado": tipo_error,
+                        "completado": False,
+                        "mejora_lograda": False,
+                    }
                 )
-                db.add(fragmento)
+
+        if fragmentos:
+            db.execute(insert(FragmentoPractica), fragmentos)
+
+        return [
+            {
+                "id": ej["id"],
+                "tipo_ejercicio": ej["tipo_ejercicio"],
+                "texto_practica": ej["texto_practica"],
+                "palabras_objetivo": ej["palabras_objetivo"],
+                "dificultad": ej["dificultad"],
+                "completado": ej["completado"],
+            }
+            for ej in ejercicios
+        ]
+
+    def crear_ejercicios_desde_errores(
+        self,
+        db: Session,
+        estudiante_id: int,
+        evaluacion_id: int,
+        errores: List[Dict],
+    ) -> List[int]:
+        estudiante = db.query(Estudiante).filter(Estudiante.id == estudiante_id).first()
+        if not estudiante:
+            return []
+
+        ejercicios = self.insertar_ejercicios(
+            db=db,
+            estudiante_id=estudiante_id,
+            evaluacion_id=evaluacion_id,
+            errores=errores,
+        )
 
         db.commit()
-        return ejercicios_ids
+        return [ej["id"] for ej in ejercicios]
 
     def crear_ejercicios_desde_bd(
         self,
@@ -0,0 +1,175 @@
+"""
+Política y ejecución acotada del hashing de contraseñas.
+
+POLÍTICA (settings):
+- PASSWORD_ESQUEMA: "bcrypt" (por defecto) o "argon2" (argon2id, requiere
+  el paquete opcional argon2-cffi)
+- BCRYPT_ROUNDS / ARGON2_*: costo de cada hash. Elegirlos con
+  `python -m app.scripts.calibrar_hash --objetivo-ms 250` en la máquina
+  de producción.
+- Los hashes que no cumplen la política vigente (otro esquema u otro costo)
+  se rehacen en el siguiente login exitoso (`needs_update` de passlib).
+
+EJECUCIÓN:
+bcrypt/argon2 consumen ~250 ms de CPU por operación. Si cada request lo
+ejecuta en su propio hilo, una ráfaga de logins ocupa todos los hilos del
+servidor y todos los núcleos a la vez, y el resto de endpoints deja de
+responder. Aquí todas las operaciones pasan por un pool dedicado:
+
+- Como máximo HASH_MAX_CONCURRENTES hashes en paralelo (pool de hilos)
+- Como máximo HASH_MAX_EN_ESPERA operaciones encoladas o en curso; por
+  encima se responde 503 de inmediato en lugar de acumular latencia
+
+MÉTRICAS:
+`metricas_hash()` devuelve conteo, tiempo total/máximo de hash y de espera
+en cola por operación, rechazos y rehashes.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app import settings
+from app.logs.logger import logger
+
+
+ESQUEMAS_SOPORTADOS = ("bcrypt", "argon2")
+
+
+def construir_contexto(
+    esquema: Optional[str] = None,
+    bcrypt_rounds: Optional[int] = None,
+    argon2_time_cost: Optional[int] = None,
+    argon2_memory_cost: Optional[int] = None,
+    argon2_parallelism: Optional[int] = None,
+) -> CryptContext:
+    """
+    CryptContext según la política de hashing (por defecto la de settings).
+
+    El esquema configurado es el único no deprecado; bcrypt se mantiene
+    siempre para poder verificar los hashes existentes.
+    """
+    esquema = (esquema or settings.PASSWORD_ESQUEMA).lower()
+    if esquema not in ESQUEMAS_SOPORTADOS:
+        raise ValueError(
+            f"PASSWORD_ESQUEMA inválido: {esquema}. Opciones: {', '.join(ESQUEMAS_SOPORTADOS)}"
+        )
+
+    rounds = bcrypt_rounds or settings.BCRYPT_ROUNDS
+    config: Dict[str, Any] = {
+        "schemes": [esquema] if esquema == "bcrypt" else [esquema, "bcrypt"],
+        "default": esquema,
+        "deprecated": "auto",
+        # min = max = default: un hash con otro costo se rehace al hacer login
+        "bcrypt__default_rounds": rounds,
+        "bcrypt__min_rounds": rounds,
+        "bcrypt__max_rounds": rounds,
+    }
+    if esquema == "argon2":
+        config.update({
+            "argon2__type": "ID",
+            "argon2__time_cost": argon2_time_cost or settings.ARGON2_TIME_COST,
+            "argon2__memory_cost": argon2_memory_cost or settings.ARGON2_MEMORY_COST_KIB,
+            "argon2__parallelism": argon2_parallelism or settings.ARGON2_PARALLELISM,
+        })
+    return CryptContext(**config)
+
+
+pwd_context = construir_contexto()
+
+
+class MetricasHash:
+    """Contadores de tiempo de hashing por operación, seguros entre hilos."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._operaciones: Dict[str, Dict[str, float]] = {}
+        self.rechazos = 0
+        self.rehashes = 0
+
+    def registrar(self, operacion: str, segundos_hash: float, segundos_espera: float) -> None:
+        with self._lock:
+            m = self._operaciones.setdefault(operacion, {
+                "total": 0, "segundos_total": 0.0, "segundos_max": 0.0,
+                "espera_segundos_total": 0.0, "espera_segundos_max": 0.0,
+            })
+            m["total"] += 1
+            m["segundos_total"] += segundos_hash
+            m["segundos_max"] = max(m["segundos_max"], segundos_hash)
+            m["espera_segundos_total"] += segundos_espera
+            m["espera_segundos_max"] = max(m["espera_segundos_max"], segundos_espera)
+
+    def registrar_rechazo(self) -> None:
+        with self._lock:
+            self.rechazos += 1
+
+    def registrar_rehash(self) -> None:
+        with self._lock:
+            self.rehashes += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            operaciones = {op: dict(m) for op, m in self._operaciones.items()}
+            rechazos, rehashes = self.rechazos, self.rehashes
+
+        for m in operaciones.values():
+            m["ms_promedio"] = round(m["segundos_total"] * 1000 / m["total"], 2) if m["total"] else 0.0
+
+        return {
+            "esquema": settings.PASSWORD_ESQUEMA.lower(),
+            "operaciones": operaciones,
+            "rechazos": rechazos,
+            "rehashes": rehashes,
+        }
+
+
+metricas = MetricasHash()
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.HASH_MAX_CONCURRENTES,
+    thread_name_prefix="hash-password",
+)
+_limitador = threading.BoundedSemaphore(settings.HASH_MAX_EN_ESPERA)
+
+
+def ejecutar_hash(operacion: str, funcion: Callable[..., Any], *args: Any) -> Any:
+    """
+    Ejecuta una operación de hashing en el pool dedicado y espera su resultado.
+
+    Args:
+        operacion: Nombre para las métricas ("hash", "verificar", ...)
+        funcion: Método de pwd_context a ejecutar
+
+    Raises:
+        HTTPException 503: Si la cola de hashing está llena
+    """
+    if not _limitador.acquire(blocking=False):
+        metricas.registrar_rechazo()
+        logger.warning("⚠️ Cola de hashing de contraseñas llena, rechazando request")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado. Intenta nuevamente en unos segundos.",
+            headers={"Retry-After": "2"},
+        )
+
+    encolado = time.perf_counter()
+
+    def _medido() -> Any:
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args)
+        finally:
+            metricas.registrar(operacion, time.perf_counter() - inicio, inicio - encolado)
+
+    try:
+        return _executor.submit(_medido).result()
+    finally:
+        _limitador.release()
+
+
+def metricas_hash() -> Dict[str, Any]:
+    return metricas.snapshot()
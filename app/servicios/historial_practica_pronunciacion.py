@@ -1,11 +1,17 @@
-from sqlalchemy.orm import Session
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
+from sqlalchemy.orm import Query, Session
+
+from app.modelos import EjercicioPractica, EvaluacionLectura, ContenidoLectura
 from app.modelos.historial_practica_pronunciacion import (
     HistorialPracticaPronunciacion
 )
 from app.esquemas.historial_practica_pronunciacion import (
     HistorialPracticaPronunciacionCreate
 )
+from app.servicios.paginacion import paginar_keyset, siguiente_cursor
 
 
 def crear_historial_practica_pronunciacion(
@@ -29,3 +35,103 @@ def crear_historial_practica_pronunciacion(
     db.refresh(historial)
 
     return historial
+
+
+# ============================================
+# HISTORIAL DE PRÁCTICAS (ejercicio_practica)
+# ============================================
+
+def _contar_palabras_objetivo(palabras_objetivo: Any) -> int:
+    if not palabras_objetivo:
+        return 0
+    if isinstance(palabras_objetivo, list):
+        return len(palabras_objetivo)
+    if isinstance(palabras_objetivo, str):
+        # Registros antiguos guardaban la lista serializada como JSON
+        try:
+            palabras = json.loads(palabras_objetivo)
+            return len(palabras) if isinstance(palabras, list) else 0
+        except ValueError:
+            return 0
+    return 0
+
+
+def construir_fila_practica(
+    ej: EjercicioPractica,
+    lectura_id: Optional[int],
+    lectura_titulo: Optional[str],
+) -> Dict[str, Any]:
+    """Fila del historial de prácticas compartida por las vistas estudiante, padre y docente."""
+    return {
+        "id": ej.id,
+        "estudiante_id": ej.estudiante_id,
+        "fecha": ej.fecha_creacion.isoformat() if ej.fecha_creacion else datetime.now().isoformat(),
+        "puntuacion": 100 if ej.completado else 50,
+        "errores_detectados": _contar_palabras_objetivo(ej.palabras_objetivo),
+        "errores_corregidos": 1 if ej.completado else 0,
+        "tiempo_practica": ej.intentos * 60 if ej.intentos else 0,
+        "tipo_ejercicio": ej.tipo_ejercicio or "pronunciacion",
+        "completado": ej.completado,
+        "intentos": ej.intentos or 0,
+        "dificultad": ej.dificultad or 2,
+        "palabras_objetivo": ej.palabras_objetivo or [],
+        "texto_practica": ej.texto_practica or "",
+        "evaluacion_id": ej.evaluacion_id,
+        "lectura_id": lectura_id,
+        "lectura_titulo": lectura_titulo,
+    }
+
+
+ORDEN_PRACTICAS = (EjercicioPractica.fecha_creacion, EjercicioPractica.id)
+
+
+def consulta_historial_practicas(
+    db: Session,
+    estudiante_id: int,
+    limite: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Query:
+    """Página del historial de prácticas con evaluación y título de la lectura."""
+    query = (
+        db.query(
+            EjercicioPractica,
+            EvaluacionLectura.contenido_id,
+            ContenidoLectura.titulo,
+        )
+        .outerjoin(EvaluacionLectura, EvaluacionLectura.id == EjercicioPractica.evaluacion_id)
+        .outerjoin(ContenidoLectura, ContenidoLectura.id == EvaluacionLectura.contenido_id)
+        .filter(EjercicioPractica.estudiante_id == estudiante_id)
+    )
+    return paginar_keyset(query, ORDEN_PRACTICAS, cursor, limite, descendente=True)
+
+
+def obtener_historial_practicas(
+    db: Session,
+    estudiante_id: int,
+    limite: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Historial de ejercicios de práctica de un estudiante, del más reciente
+    al más antiguo.
+
+    Evaluación y título de la lectura se obtienen en la misma consulta
+    (outer join), sin consultas adicionales por ejercicio.
+
+    Args:
+        db: Sesión de base de datos
+        estudiante_id: ID del estudiante
+        limite: Tamaño de página (None devuelve todo el historial)
+        cursor: Cursor devuelto por la página anterior
+
+    Returns:
+        Tupla (filas, cursor de la página siguiente o None).
+    """
+    filas = consulta_historial_practicas(db, estudiante_id, limite, cursor).all()
+
+    historial = [
+        construir_fila_practica(ej, lectura_id, lectura_titulo)
+        for ej, lectura_id, lectura_titulo in filas
+    ]
+
+    return historial, siguiente_cursor([fila[0] for fila in filas], ORDEN_PRACTICAS, limite)
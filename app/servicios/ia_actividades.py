@@ -7,6 +7,8 @@ from sqlalchemy.orm import Session
 from app.modelos import ContenidoLectura, Actividad, Pregunta
 from app.esquemas.actividad_ia import GenerarActividadesIARequest
 from app.logs.logger import logger
+from app.metricas import medir_inferencia
+from app.servicios.cache_respuestas import ACTIVIDADES, invalidar_cache
 
 
 MODEL_NAME = "lmqg/mt5-small-esquad-qag"
@@ -217,11 +219,11 @@ def generar_json_actividad_ia(texto: str, opciones: GenerarActividadesIARequest)
 
 
     if len(texto_resumido) < MIN_LEN_PARA_IA:
-        logger.warning(f"⚠️ Texto muy corto (len={len(texto_resumido)}). Usando modo guiado niños.")
+        logger.warning("⚠️ Texto muy corto (len=%d). Usando modo guiado niños.", len(texto_resumido))
         return _preguntas_guiadas_para_ninos(texto_resumido)
 
     dificultad = getattr(opciones, "dificultad", "media")
-    logger.info(f"📤 Texto a IA len={len(texto_resumido)} dificultad={dificultad}")
+    logger.info("📤 Texto a IA len=%d dificultad=%s", len(texto_resumido), dificultad)
 
 
     prompt = (
@@ -233,7 +235,7 @@ def generar_json_actividad_ia(texto: str, opciones: GenerarActividadesIARequest)
     try:
         inputs = tokenizer(prompt, return_tensors="pt", max_length=512, truncation=True)
 
-        with torch.inference_mode():
+        with torch.inference_mode(), medir_inferencia("qag"):
             output = model.generate(
                 **inputs,
                 max_new_tokens=MAX_NEW_TOKENS,
@@ -243,11 +245,11 @@ def generar_json_actividad_ia(texto: str, opciones: GenerarActividadesIARequest)
             )
 
         raw = tokenizer.decode(output[0], skip_special_tokens=True)
-        logger.info(f"📥 RAW MODELO (inicio): {raw[:500]}")
-        logger.info(f"📏 RAW MODELO len={len(raw)}")
+        logger.debug("📥 RAW MODELO (inicio): %.500s", raw)
+        logger.debug("📏 RAW MODELO len=%d", len(raw))
 
         pares = extraer_pares_qa(raw)
-        logger.info(f"PARES QA parseados: {len(pares)}")
+        logger.info("PARES QA parseados: %d", len(pares))
 
         # Rescate por '?' si no parseó nada
         if len(pares) == 0:
@@ -344,7 +346,7 @@ def generar_json_actividad_ia(texto: str, opciones: GenerarActividadesIARequest)
             "preguntas": preguntas
         }
 
-        logger.info(f"✅ JSON armado con {len(preguntas)} preguntas (niños)")
+        logger.info("✅ JSON armado con %d preguntas (niños)", len(preguntas))
         return final_json
 
     except Exception as e:
@@ -398,7 +400,7 @@ def generar_actividad_ia_para_contenido(
     contenido: ContenidoLectura,
     opciones: GenerarActividadesIARequest
 ):
-    logger.info(f"🚀 Generando actividades IA para contenido_id={contenido.id}")
+    logger.info("🚀 Generando actividades IA para contenido_id=%s", contenido.id)
 
     texto = contenido.contenido or ""
 
@@ -447,6 +449,7 @@ def generar_actividad_ia_para_contenido(
 
     db.commit()
     db.refresh(actividad)
+    invalidar_cache(ACTIVIDADES)
 
-    logger.info(f"Actividad IA creada exitosamente con {len(actividad.preguntas)} preguntas.")
+    logger.info("Actividad IA creada exitosamente con %d preguntas.", len(actividad.preguntas))
     return actividad
@@ -1,13 +1,15 @@
 import re
 import time
 import unicodedata
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from difflib import SequenceMatcher
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from faster_whisper import WhisperModel
+from faster_whisper import WhisperModel, decode_audio
 
 from app.logs.logger import logger
+from app.metricas import CronometroEtapas, medir_inferencia
 from app.modelos import (
     ContenidoLectura,
     EvaluacionLectura,
@@ -24,6 +26,7 @@ class ServicioAnalisisLectura:
 
     def __init__(self, modelo: str = "small") -> None:
         logger.info(f"Cargando modelo Faster-Whisper '{modelo}' (modo niños 7-10 años)...")
+        self.nombre_modelo = modelo
         self.model = WhisperModel(modelo, device="cpu", compute_type="int8")
         logger.info("Modelo Faster-Whisper cargado correctamente.")
 
@@ -77,25 +80,34 @@ class ServicioAnalisisLectura:
         return SequenceMatcher(None, a_norm, b_norm).ratio()
 
     # ================= TRANSCRIPCIÓN =================
-    def _transcribir_audio(self, audio_path: str) -> Dict:
+    def _transcribir_audio(self, audio_path: str, cronometro: Optional[CronometroEtapas] = None) -> Dict:
+        cronometro = cronometro or CronometroEtapas("transcripcion")
         inicio = time.time()
 
         try:
-            segments, info = self.model.transcribe(
-                audio_path,
-                language="es",
-                beam_size=1,
-                best_of=1,
-                temperature=0.4,
-                vad_filter=True,
-                vad_parameters={
-                    "min_silence_duration_ms": 300,
-                    "speech_pad_ms": 200,
-                },
-                condition_on_previous_text=False,
-            )
-
-            texto = "".join(seg.text for seg in segments).strip()
+            with cronometro.etapa("decodificacion"):
+                audio = decode_audio(audio_path, sampling_rate=self.model.feature_extractor.sampling_rate)
+
+            # transcribe() corre el VAD y extrae características; los segmentos
+            # se decodifican recién al iterarlos
+            with medir_inferencia("whisper"):
+                with cronometro.etapa("vad"):
+                    segments, info = self.model.transcribe(
+                        audio,
+                        language="es",
+                        beam_size=1,
+                        best_of=1,
+                        temperature=0.4,
+                        vad_filter=True,
+                        vad_parameters={
+                            "min_silence_duration_ms": 300,
+                            "speech_pad_ms": 200,
+                        },
+                        condition_on_previous_text=False,
+                    )
+
+                with cronometro.etapa("transcripcion"):
+                    texto = "".join(seg.text for seg in segments).strip()
             duracion = float(getattr(info, "duration", 0.0) or 0.0)
 
             logger.info(
@@ -266,29 +278,74 @@ class ServicioAnalisisLectura:
         return mensaje_base
 
     # ================= FLUJO PRINCIPAL =================
-    def analizar_lectura(
+    def obtener_texto_referencia(
         self,
         db: Session,
         estudiante_id: int,
         contenido_id: int,
-        audio_path: str,
-        evaluacion_id: Optional[int] = None,
-    ) -> Dict:
-
+    ) -> str:
+        """Valida estudiante y contenido y devuelve el texto a leer."""
         estudiante = db.get(Estudiante, estudiante_id)
         contenido = db.get(ContenidoLectura, contenido_id)
 
         if not estudiante or not contenido:
             raise ValueError("Estudiante o contenido no encontrado")
 
-        trans = self._transcribir_audio(audio_path)
-        analisis = self._comparar_textos(
-            contenido.contenido,
-            trans["texto"],
-            trans["duracion"],
-        )
+        return contenido.contenido
+
+    def analizar_audio_lectura(
+        self,
+        texto_referencia: str,
+        audio_path: str,
+        cronometro: Optional[CronometroEtapas] = None,
+    ) -> Dict:
+        """
+        Transcribe y compara contra el texto de referencia. No usa la BD:
+        el llamador puede liberar su conexión mientras corre la inferencia.
+
+        Los tiempos por etapa se acumulan en `cronometro` (uno nuevo si no se
+        pasa), que viaja en el resultado hasta guardar el AnalisisIA.
+        """
+        cronometro = cronometro or CronometroEtapas("lectura")
+        trans = self._transcribir_audio(audio_path, cronometro)
+
+        with cronometro.etapa("comparacion"):
+            analisis = self._comparar_textos(
+                texto_referencia,
+                trans["texto"],
+                trans["duracion"],
+            )
+
+        with cronometro.etapa("feedback"):
+            feedback = self._generar_feedback(analisis)
+
+        return {
+            "texto_transcrito": trans["texto"],
+            "analisis": analisis,
+            "feedback": feedback,
+            "duracion_audio": trans["duracion"],
+            "cronometro": cronometro,
+        }
+
+    def guardar_analisis_lectura(
+        self,
+        db: Session,
+        estudiante_id: int,
+        contenido_id: int,
+        audio_path: str,
+        resultado_audio: Dict,
+        commit: bool = True,
+    ) -> Dict:
+        """
+        Persiste evaluación, detalles y errores de un análisis ya calculado.
 
-        feedback = self._generar_feedback(analisis)
+        Con commit=False la transacción queda abierta para que el llamador
+        agregue más escrituras y registre el AnalisisIA con
+        `registrar_analisis_ia` (ver ManagerAprendizajeIA.procesar_lectura).
+        """
+        analisis = resultado_audio["analisis"]
+        feedback = resultado_audio["feedback"]
+        cronometro = resultado_audio.setdefault("cronometro", CronometroEtapas("lectura"))
 
         evaluacion = EvaluacionLectura(
             estudiante_id=estudiante_id,
@@ -301,32 +358,145 @@ class ServicioAnalisisLectura:
             estado="completado",
         )
 
-        db.add(evaluacion)
-        db.commit()
-        db.refresh(evaluacion)
+        # Evaluación, detalles y errores se escriben en una sola transacción
+        with cronometro.etapa("guardado_evaluacion"):
+            db.add(evaluacion)
+            db.flush()
+            evaluacion_id_real = evaluacion.id
+
+            self._guardar_detalles_y_errores(
+                db=db,
+                evaluacion_id=evaluacion_id_real,
+                tokens_leidos=analisis.get("tokens_leidos", []),
+                errores_detectados=analisis.get("errores_detectados", [])
+            )
+
+        if commit:
+            self.registrar_analisis_ia(db, evaluacion_id_real, resultado_audio)
+            db.commit()
 
         logger.info(
-            f"✅ Evaluación creada: ID={evaluacion.id}, "
+            f"✅ Evaluación creada: ID={evaluacion_id_real}, "
             f"Precisión={analisis['precision_global']:.1f}%"
         )
 
-        self._guardar_detalles_y_errores(
-            db=db,
-            evaluacion_id=evaluacion.id,
-            tokens_leidos=analisis.get("tokens_leidos", []),
-            errores_detectados=analisis.get("errores_detectados", [])
-        )
-
         return {
             "success": True,
-            "evaluacion_id": evaluacion.id,
+            "evaluacion_id": evaluacion_id_real,
             "precision_global": analisis["precision_global"],
             "palabras_por_minuto": analisis["palabras_por_minuto"],
             "errores": analisis["errores_detectados"],
-            "texto_transcrito": trans["texto"],
+            "texto_transcrito": resultado_audio["texto_transcrito"],
             "retroalimentacion": feedback,
         }
 
+    def registrar_analisis_ia(self, db: Session, evaluacion_id: int, resultado_audio: Dict) -> Dict:
+        """
+        Agrega (sin commit) el AnalisisIA de la evaluación con el tiempo total
+        de procesamiento y el desglose por etapa en `tiempos_etapas`.
+        Llamar al final, justo antes del commit.
+        """
+        analisis = resultado_audio["analisis"]
+        cronometro = resultado_audio.setdefault("cronometro", CronometroEtapas("lectura"))
+        desglose = cronometro.desglose(resultado_audio.get("duracion_audio"))
+
+        db.add(AnalisisIA(
+            evaluacion_id=evaluacion_id,
+            modelo_usado=f"faster-whisper-{self.nombre_modelo}",
+            precision_global=analisis["precision_global"],
+            palabras_por_minuto=analisis["palabras_por_minuto"],
+            tiempo_procesamiento=desglose["transcurrido_ms"] / 1000,
+            tiempos_etapas=desglose,
+        ))
+
+        logger.info(
+            "Tiempos del análisis de lectura (evaluación %s): %.0f ms",
+            evaluacion_id, desglose["transcurrido_ms"],
+            extra={"evaluacion_id": evaluacion_id, **desglose},
+        )
+        return desglose
+
+    def analizar_lectura(
+        self,
+        db: Session,
+        estudiante_id: int,
+        contenido_id: int,
+        audio_path: str,
+        evaluacion_id: Optional[int] = None,
+        commit: bool = True,
+    ) -> Dict:
+        """
+        Transcribe, compara y persiste evaluación, detalles y errores.
+
+        Con commit=False la transacción queda abierta para que el llamador
+        agregue más escrituras (ver ManagerAprendizajeIA.procesar_lectura).
+        """
+        texto_referencia = self.obtener_texto_referencia(db, estudiante_id, contenido_id)
+        resultado_audio = self.analizar_audio_lectura(texto_referencia, audio_path)
+        return self.guardar_analisis_lectura(
+            db=db,
+            estudiante_id=estudiante_id,
+            contenido_id=contenido_id,
+            audio_path=audio_path,
+            resultado_audio=resultado_audio,
+            commit=commit,
+        )
+
+    def _construir_detalle_y_error(
+        self,
+        evaluacion_id: int,
+        error: Dict,
+    ) -> Tuple[Dict, Dict]:
+        """
+        Construye las filas de detalle_evaluacion y error_pronunciacion
+        para un error detectado. El error aún no tiene detalle_evaluacion_id.
+        """
+        palabra_original = error.get("palabra_original")
+        palabra_leida = error.get("palabra_leida")
+        posicion = error.get("posicion", 0)
+        tipo_error = error.get("tipo_error", "otro")
+        severidad = error.get("severidad", 1)
+
+        if palabra_original and palabra_leida:
+            precision_palabra = self._similitud_palabra(palabra_original, palabra_leida) * 100
+        else:
+            precision_palabra = 0.0
+
+        if tipo_error == "omision":
+            mensaje = f"Te saltaste '{palabra_original}'. ¡No pasa nada! Lee despacito y verás todas las palabras. "
+        elif tipo_error == "sustitucion":
+            mensaje = f"Dijiste '{palabra_leida}' pero es '{palabra_original}'. ¡Casi la tienes! Sigue intentando. "
+        elif tipo_error == "insercion":
+            mensaje = f"Agregaste una palabra de más. ¡Lee siguiendo con tu dedito y verás! "
+        else:
+            mensaje = f"Pequeño errorito en '{palabra_original}'. ¡No te preocupes! Practica esta palabra. "
+
+        if tipo_error == "omision":
+            sugerencia = f"¡Lee despacito y marca '{palabra_original}' con tu dedito! Así no te la saltarás. "
+        elif tipo_error == "sustitucion":
+            sugerencia = f"Di '{palabra_original}' varias veces en voz alta. ¡Repite conmigo! "
+        elif tipo_error == "insercion":
+            sugerencia = "Sigue las palabras del texto con tu dedo. ¡Eso te ayudará muchísimo! "
+        else:
+            sugerencia = f"Escucha cómo suena '{palabra_original}' y repítelo despacito. "
+
+        detalle = {
+            "evaluacion_id": evaluacion_id,
+            "palabra": palabra_original or palabra_leida or "?",
+            "posicion_en_texto": posicion,
+            "precision_pronunciacion": precision_palabra,
+            "retroalimentacion_palabra": mensaje,
+            "tipo_tokenizacion": "word",
+        }
+        error_pronunciacion = {
+            "tipo_error": tipo_error,
+            "palabra_original": palabra_original,
+            "palabra_detectada": palabra_leida,
+            "severidad": severidad,
+            "sugerencia_correccion": sugerencia,
+        }
+        return detalle, error_pronunciacion
+
     def _guardar_detalles_y_errores(
         self,
         db: Session,
@@ -334,70 +504,35 @@ class ServicioAnalisisLectura:
         tokens_leidos: List[str],
         errores_detectados: List[Dict]
     ):
+        """
+        Inserta detalles y errores en bloque: un INSERT ... RETURNING para
+        los detalles y un INSERT para los errores, sin importar cuántos haya.
+        No hace commit; lo hace quien abrió la transacción.
+        """
         if not errores_detectados:
             logger.info(f"📊 ¡Perfecto! No hay errores para evaluación {evaluacion_id}")
             return
 
-        total_detalles = 0
-        total_errores = 0
-
-        for error in errores_detectados:
-            palabra_original = error.get("palabra_original")
-            palabra_leida = error.get("palabra_leida")
-            posicion = error.get("posicion", 0)
-            tipo_error = error.get("tipo_error", "otro")
-            severidad = error.get("severidad", 1)
-
-            if palabra_original and palabra_leida:
-                precision_palabra = self._similitud_palabra(palabra_original, palabra_leida) * 100
-            else:
-                precision_palabra = 0.0
-
-            if tipo_error == "omision":
-                mensaje = f"Te saltaste '{palabra_original}'. ¡No pasa nada! Lee despacito y verás todas las palabras. "
-            elif tipo_error == "sustitucion":
-                mensaje = f"Dijiste '{palabra_leida}' pero es '{palabra_original}'. ¡Casi la tienes! Sigue intentando. "
-            elif tipo_error == "insercion":
-                mensaje = f"Agregaste una palabra de más. ¡Lee siguiendo con tu dedito y verás! "
-            else:
-                mensaje = f"Pequeño errorito en '{palabra_original}'. ¡No te preocupes! Practica esta palabra. "
-
-            detalle = DetalleEvaluacion(
-                evaluacion_id=evaluacion_id,
-                palabra=palabra_original or palabra_leida or "?",
-                posicion_en_texto=posicion,
-                precision_pronunciacion=precision_palabra,
-                retroalimentacion_palabra=mensaje,
-                tipo_tokenizacion="word"
-            )
+        filas = [
+            self._construir_detalle_y_error(evaluacion_id, error)
+            for error in errores_detectados
+        ]
+        detalles = [detalle for detalle, _ in filas]
+        errores = [error for _, error in filas]
 
-            db.add(detalle)
-            db.flush()
-            total_detalles += 1
-
-            if tipo_error == "omision":
-                sugerencia = f"¡Lee despacito y marca '{palabra_original}' con tu dedito! Así no te la saltarás. "
-            elif tipo_error == "sustitucion":
-                sugerencia = f"Di '{palabra_original}' varias veces en voz alta. ¡Repite conmigo! "
-            elif tipo_error == "insercion":
-                sugerencia = "Sigue las palabras del texto con tu dedo. ¡Eso te ayudará muchísimo! "
-            else:
-                sugerencia = f"Escucha cómo suena '{palabra_original}' y repítelo despacito. "
-
-            error_pronunciacion = ErrorPronunciacion(
-                detalle_evaluacion_id=detalle.id,
-                tipo_error=tipo_error,
-                palabra_original=palabra_original,
-                palabra_detectada=palabra_leida,
-                severidad=severidad,
-                sugerencia_correccion=sugerencia
-            )
+        detalle_ids = db.scalars(
+            insert(DetalleEvaluacion).returning(
+                DetalleEvaluacion.id, sort_by_parameter_order=True
+            ),
+            detalles,
+        ).all()
+
+        for error, detalle_id in zip(errores, detalle_ids):
+            error["detalle_evaluacion_id"] = detalle_id
 
-            db.add(error_pronunciacion)
-            total_errores += 1
+        db.execute(insert(ErrorPronunciacion), errores)
 
-        db.commit()
-        logger.info(f"💾 Guardados {total_detalles} detalles y {total_errores} errores para evaluación {evaluacion_id}")
+        logger.info(f"💾 Guardados {len(detalles)} detalles y {len(errores)} errores para evaluación {evaluacion_id}")
 
     def analizar_practica_ejercicio(
         self,
@@ -406,12 +541,15 @@ class ServicioAnalisisLectura:
     ) -> Dict:
         logger.info(f"🎯 Analizando práctica de ejercicio | audio={audio_path}")
 
-        trans = self._transcribir_audio(audio_path)
-        analisis = self._comparar_textos(
-            texto_practica,
-            trans["texto"],
-            trans["duracion"],
-        )
+        cronometro = CronometroEtapas("practica")
+        trans = self._transcribir_audio(audio_path, cronometro)
+        with cronometro.etapa("comparacion"):
+            analisis = self._comparar_textos(
+                texto_practica,
+                trans["texto"],
+                trans["duracion"],
+            )
+        cronometro.desglose(trans["duracion"])
 
         logger.info(
             f"✅ Análisis de práctica completado | "
@@ -0,0 +1,257 @@
+"""
+Alta masiva de docentes (admin) y estudiantes (docente) desde CSV o JSON.
+
+Pensado para dar de alta un colegio completo en segundos:
+
+- Todas las filas se validan en una pasada con los mismos esquemas que el
+  alta individual; si alguna falla no se inserta nada y se devuelven todos
+  los errores con su número de fila
+- Los emails repetidos (en el archivo o ya registrados) se detectan con una
+  sola consulta
+- Usuario, UsuarioRol y Docente (o Estudiante y EstudianteCurso) se insertan
+  con un INSERT multi-fila por tabla, en una transacción
+- Los emails de configuración de cuenta se arman con una plantilla
+  compilada y se encolan con un solo INSERT (ver cola_correos)
+
+La contraseña temporal de los docentes nunca se comunica (entran con el
+token de configuración), así que se hashea UNA por lote en lugar de una por
+fila: con bcrypt son ~250 ms por hash.
+"""
+
+import csv
+import io
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app import settings
+from app.modelos import Usuario, UsuarioRol, Docente, Estudiante, EstudianteCurso, Curso
+from app.esquemas.docente import DocenteCreateAdmin
+from app.esquemas.estudiante import EstudianteCreateDocente
+from app.servicios.seguridad import obtener_password_hash
+from app.servicios.email_service import email_service
+from app.logs.logger import logger
+
+
+# Clave donde leer_csv deja las celdas que sobran respecto del encabezado
+CELDAS_SOBRANTES = "_celdas_sobrantes"
+
+
+def leer_csv(contenido: bytes) -> List[Dict[str, Any]]:
+    """
+    Filas de un CSV con encabezados (UTF-8, con o sin BOM; separador , o ;).
+    Las celdas vacías se toman como no enviadas; las que sobran respecto del
+    encabezado quedan en CELDAS_SOBRANTES y la fila se rechaza al validar.
+    """
+    try:
+        texto = contenido.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="El archivo CSV debe estar en UTF-8")
+
+    try:
+        dialecto = csv.Sniffer().sniff(texto[:4096], delimiters=",;")
+    except csv.Error:
+        dialecto = csv.excel
+
+    filas = []
+    for fila in csv.DictReader(io.StringIO(texto), dialect=dialecto, restkey=CELDAS_SOBRANTES):
+        # Las celdas vacías al final (p. ej. un ";" de más al exportar) no cuentan
+        sobrantes = [c for c in fila.pop(CELDAS_SOBRANTES, None) or [] if c.strip()]
+        filas.append({
+            (clave or "").strip(): valor.strip()
+            for clave, valor in fila.items()
+            if valor not in (None, "")
+        })
+        if sobrantes:
+            filas[-1][CELDAS_SOBRANTES] = sobrantes
+    return filas
+
+
+def _validar_filas(filas: List[Dict[str, Any]], esquema: Type[BaseModel]):
+    """
+    Valida todas las filas; devuelve (datos válidos, errores por fila). Cada
+    dato válido va con su número de fila en el archivo, para que los errores
+    de los chequeos posteriores apunten a la fila correcta.
+    """
+    if not filas:
+        raise HTTPException(status_code=400, detail="El archivo no tiene filas")
+    if len(filas) > settings.IMPORTACION_MAX_FILAS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Máximo {settings.IMPORTACION_MAX_FILAS} filas por importación",
+        )
+
+    datos, errores = [], []
+    for numero, fila in enumerate(filas, start=1):
+        sobrantes = fila.get(CELDAS_SOBRANTES)
+        if sobrantes:
+            errores.append({
+                "fila": numero,
+                "errores": [f"la fila tiene {len(sobrantes)} celda(s) más que el encabezado"],
+            })
+            continue
+        try:
+            datos.append((numero, esquema.model_validate(fila)))
+        except ValidationError as e:
+            errores.append({
+                "fila": numero,
+                "errores": [
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}"
+                    for err in e.errors()
+                ],
+            })
+    return datos, errores
+
+
+def _rechazar(errores: List[Dict[str, Any]]) -> None:
+    raise HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail={
+            "mensaje": "La importación tiene errores; no se creó ningún registro",
+            "errores": errores,
+        },
+    )
+
+
+def importar_docentes(db: Session, filas: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Crea docentes (Usuario + rol docente + Docente) en lote y encola sus
+    emails de configuración de cuenta.
+
+    A diferencia del alta individual, un email ya registrado (aunque esté
+    eliminado) es un error: los docentes eliminados se restauran uno a uno.
+    """
+    filas_validas, errores = _validar_filas(filas, DocenteCreateAdmin)
+
+    # Emails repetidos dentro del archivo (sin distinguir mayúsculas, como
+    # /auth/verificar-email-disponible)
+    primera_fila: Dict[str, int] = {}
+    for numero, d in filas_validas:
+        email = str(d.email).strip().lower()
+        if email in primera_fila:
+            errores.append({"fila": numero, "errores": [f"email repetido (fila {primera_fila[email]})"]})
+        else:
+            primera_fila[email] = numero
+
+    # Emails ya registrados: una sola consulta
+    existentes = set(db.scalars(
+        select(func.lower(Usuario.email)).where(func.lower(Usuario.email).in_(list(primera_fila)))
+    ).all())
+    for email in existentes:
+        errores.append({"fila": primera_fila[email], "errores": [f"el email {email} ya está registrado"]})
+
+    if errores:
+        _rechazar(sorted(errores, key=lambda e: e["fila"]))
+
+    datos = [d for _, d in filas_validas]
+
+    password_hash_temp = obtener_password_hash(secrets.token_urlsafe(32))
+    setup_expira = datetime.now(timezone.utc) + timedelta(hours=48)
+    tokens = [secrets.token_urlsafe(32) for _ in datos]
+
+    try:
+        usuario_ids = db.scalars(
+            insert(Usuario).returning(Usuario.id, sort_by_parameter_order=True),
+            [
+                {
+                    "email": str(d.email),
+                    "password_hash": password_hash_temp,
+                    "nombre": d.nombre,
+                    "apellido": d.apellido,
+                    "activo": True,
+                    "email_verificado": False,
+                    "token_reset_password": token,
+                    "token_reset_expira": setup_expira,
+                    "token_reset_usado": False,
+                }
+                for d, token in zip(datos, tokens)
+            ],
+        ).all()
+
+        db.execute(insert(UsuarioRol), [
+            {"usuario_id": usuario_id, "rol": "docente", "activo": True}
+            for usuario_id in usuario_ids
+        ])
+        db.execute(insert(Docente), [
+            {
+                "usuario_id": usuario_id,
+                "especialidad": d.especialidad,
+                "grado_academico": d.grado_academico,
+                "institucion": d.institucion,
+                "fecha_contratacion": d.fecha_contratacion,
+                "activo": True,
+                "deleted_at": None,
+            }
+            for usuario_id, d in zip(usuario_ids, datos)
+        ])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    emails_encolados = email_service.send_setup_account_emails([
+        {
+            "to_email": str(d.email),
+            "usuario_nombre": f"{d.nombre} {d.apellido}".strip(),
+            "setup_token": token,
+        }
+        for d, token in zip(datos, tokens)
+    ])
+
+    logger.info(f"✅ Importación masiva: {len(usuario_ids)} docentes creados")
+    return {"creados": len(usuario_ids), "emails_encolados": emails_encolados}
+
+
+def importar_estudiantes(db: Session, docente_id: int, filas: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Crea estudiantes del docente en lote, cada uno inscrito en su curso.
+    Los cursos deben existir y pertenecer al docente.
+    """
+    filas_validas, errores = _validar_filas(filas, EstudianteCreateDocente)
+
+    curso_ids = {d.curso_id for _, d in filas_validas}
+    cursos_docente = set(db.scalars(
+        select(Curso.id).where(Curso.id.in_(curso_ids), Curso.docente_id == docente_id)
+    ).all())
+    for numero, d in filas_validas:
+        if d.curso_id not in cursos_docente:
+            errores.append({"fila": numero, "errores": [f"curso_id {d.curso_id} no existe o no es de este docente"]})
+
+    if errores:
+        _rechazar(sorted(errores, key=lambda e: e["fila"]))
+
+    datos = [d for _, d in filas_validas]
+
+    try:
+        estudiante_ids = db.scalars(
+            insert(Estudiante).returning(Estudiante.id, sort_by_parameter_order=True),
+            [
+                {
+                    "usuario_id": None,
+                    "docente_id": docente_id,
+                    "nombre": d.nombre,
+                    "apellido": d.apellido,
+                    "fecha_nacimiento": d.fecha_nacimiento,
+                    "nivel_educativo": d.nivel_educativo,
+                    "necesidades_especiales": d.necesidades_especiales,
+                }
+                for d in datos
+            ],
+        ).all()
+
+        db.execute(insert(EstudianteCurso), [
+            {"estudiante_id": estudiante_id, "curso_id": d.curso_id}
+            for estudiante_id, d in zip(estudiante_ids, datos)
+        ])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info(f"✅ Importación masiva: {len(estudiante_ids)} estudiantes creados (docente {docente_id})")
+    return {"creados": len(estudiante_ids), "estudiante_ids": estudiante_ids}
@@ -0,0 +1,126 @@
+"""
+Límite de intentos fallidos de login.
+
+Ventanas deslizantes en memoria que cuentan solo los intentos FALLIDOS
+(credenciales incorrectas o cuenta bloqueada/inactiva); los logins exitosos
+no consumen cupo, así que un aula entera detrás del mismo NAT puede entrar a
+la vez al empezar la clase:
+
+- Por IP y cuenta: LOGIN_MAX_FALLOS fallos cada LOGIN_VENTANA_SEGUNDOS. Un
+  login exitoso reinicia el contador de esa IP y cuenta
+- Por IP (cualquier cuenta): LOGIN_MAX_FALLOS_POR_IP, contra quien prueba
+  muchas cuentas desde el mismo origen
+
+El chequeo ocurre antes de tocar la BD o bcrypt, así una ráfaga de intentos
+rechazados no consume CPU de hashing.
+
+La IP es la de `request.client`, que ProxyHeadersMiddleware toma de
+X-Forwarded-For solo si la conexión viene de un proxy en PROXIES_CONFIABLES
+(ver app/main.py); la cabecera enviada por el cliente no se lee directamente.
+
+El registro es por proceso y de tamaño acotado (se descartan las claves
+menos recientes).
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Optional
+
+from fastapi import HTTPException, Request, status
+
+from app import settings
+from app.logs.logger import logger
+from app.servicios.registro_auditoria import ip_cliente
+
+
+class LimitadorIntentos:
+    """Ventana deslizante por clave, segura entre hilos."""
+
+    def __init__(self, max_intentos: int, ventana_segundos: float, max_claves: int = 10000) -> None:
+        self.max_intentos = max_intentos
+        self.ventana_segundos = ventana_segundos
+        self.max_claves = max_claves
+        self._intentos: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def espera(self, clave: str) -> Optional[int]:
+        """
+        None si la clave puede intentar; si no, segundos a esperar para
+        reintentar. No registra nada.
+        """
+        limite = time.monotonic() - self.ventana_segundos
+        with self._lock:
+            intentos = self._intentos.get(clave)
+            if not intentos:
+                return None
+            while intentos and intentos[0] <= limite:
+                intentos.popleft()
+            if len(intentos) >= self.max_intentos:
+                return max(1, int(intentos[0] - limite) + 1)
+        return None
+
+    def registrar(self, clave: str) -> None:
+        ahora = time.monotonic()
+        with self._lock:
+            intentos = self._intentos.get(clave)
+            if intentos is None:
+                intentos = deque()
+                self._intentos[clave] = intentos
+            else:
+                self._intentos.move_to_end(clave)
+            intentos.append(ahora)
+
+            while len(self._intentos) > self.max_claves:
+                self._intentos.popitem(last=False)
+
+    def olvidar(self, clave: str) -> None:
+        with self._lock:
+            self._intentos.pop(clave, None)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._intentos.clear()
+
+
+fallos_por_cuenta = LimitadorIntentos(
+    max_intentos=settings.LOGIN_MAX_FALLOS,
+    ventana_segundos=settings.LOGIN_VENTANA_SEGUNDOS,
+)
+
+fallos_por_ip = LimitadorIntentos(
+    max_intentos=settings.LOGIN_MAX_FALLOS_POR_IP,
+    ventana_segundos=settings.LOGIN_VENTANA_SEGUNDOS,
+)
+
+
+def _claves(request: Request, email: str):
+    ip = ip_cliente(request) or "desconocida"
+    return ip, f"{ip}|{email.strip().lower()}"
+
+
+def verificar_limite_login(request: Request, email: str) -> None:
+    """
+    Rechaza con 429 si la IP superó los fallos permitidos para esta cuenta
+    o para todas las cuentas.
+    """
+    ip, clave_cuenta = _claves(request, email)
+    espera = fallos_por_cuenta.espera(clave_cuenta) or fallos_por_ip.espera(ip)
+    if espera is not None:
+        logger.warning(f"⚠️ Demasiados logins fallidos desde {ip}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiados intentos de inicio de sesión. Intenta nuevamente más tarde.",
+            headers={"Retry-After": str(espera)},
+        )
+
+
+def registrar_login_fallido(request: Request, email: str) -> None:
+    ip, clave_cuenta = _claves(request, email)
+    fallos_por_cuenta.registrar(clave_cuenta)
+    fallos_por_ip.registrar(ip)
+
+
+def registrar_login_exitoso(request: Request, email: str) -> None:
+    _, clave_cuenta = _claves(request, email)
+    fallos_por_cuenta.olvidar(clave_cuenta)
@@ -20,43 +20,70 @@ class ManagerAprendizajeIA:
         audio_path: str,
         evaluacion_id: Optional[int] = None,
     ) -> Dict:
-        resultado_analisis = self.analizador.analizar_lectura(
+        """
+        Analiza la lectura y genera los ejercicios recomendados.
+
+        Para no retener una conexión durante la transcripción, los routers
+        pueden llamar por separado a `analizador.obtener_texto_referencia`,
+        `analizador.analizar_audio_lectura` y `guardar_resultado_lectura`.
+        """
+        texto_referencia = self.analizador.obtener_texto_referencia(
+            db, estudiante_id, contenido_id
+        )
+        resultado_audio = self.analizador.analizar_audio_lectura(texto_referencia, audio_path)
+        return self.guardar_resultado_lectura(
             db=db,
             estudiante_id=estudiante_id,
             contenido_id=contenido_id,
             audio_path=audio_path,
-            evaluacion_id=evaluacion_id,
+            resultado_audio=resultado_audio,
         )
 
-        evaluacion_id_real = resultado_analisis["evaluacion_id"]
-        errores = resultado_analisis.get("errores", [])
-
-        ejercicios_ids = self.generador.crear_ejercicios_desde_errores(
-            db=db,
-            estudiante_id=estudiante_id,
-            evaluacion_id=evaluacion_id_real,
-            errores=errores,
-        )
+    def guardar_resultado_lectura(
+        self,
+        db: Session,
+        estudiante_id: int,
+        contenido_id: int,
+        audio_path: str,
+        resultado_audio: Dict,
+    ) -> Dict:
+        """
+        Guarda el análisis de una lectura y sus ejercicios recomendados.
 
-        ejercicios_info: List[Dict] = []
-        if ejercicios_ids:
-            ejercicios = (
-                db.query(EjercicioPractica)
-                .filter(EjercicioPractica.id.in_(ejercicios_ids))
-                .all()
+        Evaluación, detalles, errores, ejercicios, fragmentos y el
+        AnalisisIA (con los tiempos por etapa) se escriben con inserts en
+        bloque dentro de una única transacción: o se guarda todo o no se
+        guarda nada.
+        """
+        try:
+            resultado_analisis = self.analizador.guardar_analisis_lectura(
+                db=db,
+                estudiante_id=estudiante_id,
+                contenido_id=contenido_id,
+                audio_path=audio_path,
+                resultado_audio=resultado_audio,
+                commit=False,
             )
-            for ej in ejercicios:
-                ejercicios_info.append(
-                    {
-                        "id": ej.id,
-                        "tipo_ejercicio": ej.tipo_ejercicio,
-                        "texto_practica": ej.texto_practica,
-                        "palabras_objetivo": ej.palabras_objetivo,
-                        "dificultad": ej.dificultad,
-                        "completado": ej.completado,
-                    }
+            cronometro = resultado_audio["cronometro"]
+
+            with cronometro.etapa("ejercicios"):
+                ejercicios_info = self.generador.insertar_ejercicios(
+                    db=db,
+                    estudiante_id=estudiante_id,
+                    evaluacion_id=resultado_analisis["evaluacion_id"],
+                    errores=resultado_analisis.get("errores", []),
                 )
 
+            self.analizador.registrar_analisis_ia(
+                db, resultado_analisis["evaluacion_id"], resultado_audio
+            )
+            # El commit queda fuera del desglose guardado; solo va a /metrics
+            with cronometro.etapa("commit"):
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
         resultado_analisis["ejercicios_recomendados"] = ejercicios_info
         return resultado_analisis
 
@@ -272,77 +299,175 @@ class ManagerAprendizajeIA:
         else:
             return "practicando"
 
-    def practicar_ejercicio(
+    def _obtener_ejercicio(
         self,
         db: Session,
         estudiante_id: int,
         ejercicio_id: int,
-        audio_path: str,
+    ) -> EjercicioPractica:
+        ejercicio = (
+            db.query(EjercicioPractica)
+            .filter(
+                EjercicioPractica.id == ejercicio_id,
+                EjercicioPractica.estudiante_id == estudiante_id,
+            )
+            .first()
+        )
+
+        if not ejercicio:
+            logger.error(
+                f"❌ Ejercicio no encontrado | id={ejercicio_id} | "
+                f"estudiante={estudiante_id}"
+            )
+            raise ValueError(
+                "Ejercicio de práctica no encontrado para este estudiante."
+            )
+
+        return ejercicio
+
+    def obtener_texto_practica(
+        self,
+        db: Session,
+        estudiante_id: int,
+        ejercicio_id: int,
+    ) -> str:
+        """
+        Texto contra el que se evalúa la práctica de un ejercicio.
+        """
+        ejercicio = self._obtener_ejercicio(db, estudiante_id, ejercicio_id)
+
+        logger.info(
+            f"✅ Ejercicio encontrado | tipo={ejercicio.tipo_ejercicio} | "
+            f"texto={ejercicio.texto_practica[:50]}..."
+        )
+
+        # =========================================================
+        # ✅ FIX: usar palabras_objetivo si texto_practica es instrucción
+        # =========================================================
+        texto_para_analizar = (ejercicio.texto_practica or "").strip()
+        texto_lower = texto_para_analizar.lower()
+
+        parece_instruccion = (
+            texto_lower.startswith("repite")
+            or "palabras indicadas" in texto_lower
+            or "hasta que" in texto_lower
+            or texto_lower.startswith("lee")
+            or "pronuncia" in texto_lower
+        )
+
+        if (
+            parece_instruccion
+            and getattr(ejercicio, "palabras_objetivo", None)
+            and len(ejercicio.palabras_objetivo or []) > 0
+        ):
+            palabras = [
+                (p or "").strip()
+                for p in (ejercicio.palabras_objetivo or [])
+                if (p or "").strip()
+            ]
+            if palabras:
+                texto_para_analizar = " ".join(palabras)
+
+        logger.info(f"🧪 Texto usado para evaluar: {texto_para_analizar}")
+        return texto_para_analizar
+
+    def registrar_practica(
+        self,
+        db: Session,
+        estudiante_id: int,
+        ejercicio_id: int,
+        analisis: Dict,
     ) -> Dict:
         """
-        El niño practica un ejercicio concreto.
+        Evalúa la mejora a partir del análisis del audio, actualiza el
+        ejercicio y sus fragmentos y arma el feedback.
         MUY TOLERANTE para niños de 7-10 años.
         """
+        ejercicio = self._obtener_ejercicio(db, estudiante_id, ejercicio_id)
+
+        # Evaluar mejora (MUY PERMISIVO para niños de 7-10 años)
+        precision = analisis.get("precision_global", 0.0)
+        errores = analisis.get("errores_detectados", [])
+
+        # 🎯 CRITERIOS SÚPER GENEROSOS PARA NIÑOS PEQUEÑOS
+        if precision >= 75:  # Bajado de 82 para ser más motivador
+            mejoro = True
+        elif precision >= 65 and len(errores) <= 4:  # Muy permisivo
+            mejoro = True
+        elif precision >= 55 and len(errores) <= 2:
+            mejoro = True
+        elif len(errores) == 0:  # Si no tiene errores, siempre mejoró
+            mejoro = True
+        else:
+            mejoro = False
+
         logger.info(
-            f" Iniciando práctica | estudiante={estudiante_id} | "
-            f"ejercicio={ejercicio_id}"
+            f"🎯 Evaluación | mejora={mejoro} | errores={len(errores)}"
         )
 
-        try:
-            # 1. Buscar ejercicio
-            ejercicio = (
-                db.query(EjercicioPractica)
-                .filter(
-                    EjercicioPractica.id == ejercicio_id,
-                    EjercicioPractica.estudiante_id == estudiante_id,
-                )
-                .first()
+        # Actualizar ejercicio
+        ejercicio.intentos = (ejercicio.intentos or 0) + 1
+        if mejoro:
+            ejercicio.completado = True
+
+            # Marcar fragmentos como mejorados
+            fragmentos = (
+                db.query(FragmentoPractica)
+                .filter(FragmentoPractica.ejercicio_id == ejercicio.id)
+                .all()
             )
+            for frag in fragmentos:
+                frag.completado = True
+                frag.mejora_lograda = True
 
-            if not ejercicio:
-                logger.error(
-                    f"❌ Ejercicio no encontrado | id={ejercicio_id} | "
-                    f"estudiante={estudiante_id}"
-                )
-                raise ValueError(
-                    "Ejercicio de práctica no encontrado para este estudiante."
-                )
+        db.commit()
+        db.refresh(ejercicio)
 
-            logger.info(
-                f"✅ Ejercicio encontrado | tipo={ejercicio.tipo_ejercicio} | "
-                f"texto={ejercicio.texto_practica[:50]}..."
-            )
+        logger.info(
+            f"✅ Ejercicio actualizado | completado={ejercicio.completado} | "
+            f"intentos={ejercicio.intentos}"
+        )
 
-            # =========================================================
-            # ✅ FIX: usar palabras_objetivo si texto_practica es instrucción
-            # =========================================================
-            texto_para_analizar = (ejercicio.texto_practica or "").strip()
-            texto_lower = texto_para_analizar.lower()
-
-            parece_instruccion = (
-                texto_lower.startswith("repite")
-                or "palabras indicadas" in texto_lower
-                or "hasta que" in texto_lower
-                or texto_lower.startswith("lee")
-                or "pronuncia" in texto_lower
-            )
+        # 🎤 GENERAR FEEDBACK SÚPER MOTIVADOR
+        feedback = self._generar_feedback_detallado(
+            precision=precision,
+            errores=errores,
+            mejoro=mejoro,
+            intentos=ejercicio.intentos,
+        )
 
-            if (
-                parece_instruccion
-                and getattr(ejercicio, "palabras_objetivo", None)
-                and len(ejercicio.palabras_objetivo or []) > 0
-            ):
-                palabras = [
-                    (p or "").strip()
-                    for p in (ejercicio.palabras_objetivo or [])
-                    if (p or "").strip()
-                ]
-                if palabras:
-                    texto_para_analizar = " ".join(palabras)
+        # Combinar resultados
+        return {
+            **analisis,
+            **feedback,
+            "ejercicio_completado": bool(ejercicio.completado),
+            "ejercicio_intentos": int(ejercicio.intentos or 0),
+            "ejercicio_tipo": ejercicio.tipo_ejercicio,
+        }
 
-            logger.info(f"🧪 Texto usado para evaluar: {texto_para_analizar}")
+    def practicar_ejercicio(
+        self,
+        db: Session,
+        estudiante_id: int,
+        ejercicio_id: int,
+        audio_path: str,
+    ) -> Dict:
+        """
+        El niño practica un ejercicio concreto.
+        MUY TOLERANTE para niños de 7-10 años.
+
+        Para no retener una conexión durante la transcripción, los routers
+        pueden llamar por separado a `obtener_texto_practica`,
+        `analizador.analizar_practica_ejercicio` y `registrar_practica`.
+        """
+        logger.info(
+            f" Iniciando práctica | estudiante={estudiante_id} | "
+            f"ejercicio={ejercicio_id}"
+        )
+
+        try:
+            texto_para_analizar = self.obtener_texto_practica(db, estudiante_id, ejercicio_id)
 
-            # 2. Analizar audio
             logger.info(f"🎤 Analizando audio | path={audio_path}")
 
             analisis = self.analizador.analizar_practica_ejercicio(
@@ -355,65 +480,7 @@ class ManagerAprendizajeIA:
                 f"precisión={analisis.get('precision_global', 0):.1f}%"
             )
 
-            # 3. Evaluar mejora (MUY PERMISIVO para niños de 7-10 años)
-            precision = analisis.get("precision_global", 0.0)
-            errores = analisis.get("errores_detectados", [])
-
-            # 🎯 CRITERIOS SÚPER GENEROSOS PARA NIÑOS PEQUEÑOS
-            if precision >= 75:  # Bajado de 82 para ser más motivador
-                mejoro = True
-            elif precision >= 65 and len(errores) <= 4:  # Muy permisivo
-                mejoro = True
-            elif precision >= 55 and len(errores) <= 2:
-                mejoro = True
-            elif len(errores) == 0:  # Si no tiene errores, siempre mejoró
-                mejoro = True
-            else:
-                mejoro = False
-
-            logger.info(
-                f"🎯 Evaluación | mejora={mejoro} | errores={len(errores)}"
-            )
-
-            # 4. Actualizar ejercicio
-            ejercicio.intentos = (ejercicio.intentos or 0) + 1
-            if mejoro:
-                ejercicio.completado = True
-
-                # Marcar fragmentos como mejorados
-                fragmentos = (
-                    db.query(FragmentoPractica)
-                    .filter(FragmentoPractica.ejercicio_id == ejercicio.id)
-                    .all()
-                )
-                for frag in fragmentos:
-                    frag.completado = True
-                    frag.mejora_lograda = True
-
-            db.commit()
-            db.refresh(ejercicio)
-
-            logger.info(
-                f"✅ Ejercicio actualizado | completado={ejercicio.completado} | "
-                f"intentos={ejercicio.intentos}"
-            )
-
-            # 5. 🎤 GENERAR FEEDBACK SÚPER MOTIVADOR
-            feedback = self._generar_feedback_detallado(
-                precision=precision,
-                errores=errores,
-                mejoro=mejoro,
-                intentos=ejercicio.intentos,
-            )
-
-            # 6. Combinar resultados
-            resultado = {
-                **analisis,
-                **feedback,
-                "ejercicio_completado": bool(ejercicio.completado),
-                "ejercicio_intentos": int(ejercicio.intentos or 0),
-                "ejercicio_tipo": ejercicio.tipo_ejercicio,
-            }
+            resultado = self.registrar_practica(db, estudiante_id, ejercicio_id, analisis)
 
             logger.info("🎉 Práctica de ejercicio completada exitosamente")
             return resultado
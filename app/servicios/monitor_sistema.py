@@ -1,83 +1,167 @@
-import logging
-import psutil
+"""
+Estado del sistema (servidor, base de datos, librerías y modelos de IA).
+
+Un hilo de fondo muestrea todo cada MONITOR_INTERVALO_SEGUNDOS y guarda una
+instantánea; los endpoints de salud solo la leen, sin bloquear ni consultar
+nada en el request:
+
+- CPU con `psutil.cpu_percent(interval=None)`: promedio desde la muestra
+  anterior, sin dormir un segundo
+- Base de datos: `SELECT 1` para la latencia y una sola consulta con
+  `to_regclass` para verificar las tablas críticas (sin COUNT(*))
+- Librerías: se buscan una vez al iniciar, sin importarlas
+- Modelos de IA: se reporta si ya están cargados en este proceso; nunca se
+  instancia un modelo para verificarlo
+"""
+
+import importlib.util
 import os
+import sys
+import threading
+import time
 from datetime import datetime
-from sqlalchemy.orm import Session
+from importlib import metadata
+from typing import Any, Dict, Optional
+
+import psutil
 from sqlalchemy import text
 
-logger = logging.getLogger(__name__)
+from app import settings
+from app.config import SessionLocal
+from app.logs.logger import logger
+
+
+TABLAS_CRITICAS = (
+    "usuario", "estudiante", "contenido_lectura", "evaluacion_lectura", "analisis_ia",
+)
+
+LIBRERIAS_AUDIO = ("faster_whisper", "av", "numpy")
+
 
 class MonitorSistema:
-    def __init__(self):
+    def __init__(self, intervalo_segundos: float) -> None:
+        self.intervalo_segundos = intervalo_segundos
         self.umbrales = {
             'cpu_percent': 80,
             'memory_percent': 85,
             'disk_percent': 90
         }
-    
-    async def obtener_estado_sistema(self, db: Session) -> dict:
+        self._proceso = psutil.Process(os.getpid())
+        self._librerias: Optional[Dict[str, Any]] = None
+        self._estado: Optional[Dict[str, Any]] = None
+        self._muestreado: float = 0.0
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    # ================= HILO DE MUESTREO =================
+    def iniciar(self) -> None:
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        # Primera lectura de CPU: las siguientes miden desde aquí
+        psutil.cpu_percent(interval=None)
+        self._proceso.cpu_percent(interval=None)
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="monitor-sistema", daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout: float = 5.0) -> None:
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+
+    def _bucle(self) -> None:
+        while not self._detener.is_set():
+            try:
+                self.muestrear()
+            except Exception:
+                logger.exception("Error muestreando el estado del sistema")
+            self._detener.wait(self.intervalo_segundos)
+
+    def muestrear(self) -> Dict[str, Any]:
+        """Toma una muestra completa y la deja como estado vigente."""
+        estado_servidor = self._obtener_estado_servidor()
+        estado_db = self._verificar_base_datos()
+        estado_servicios = self._verificar_servicios_externos()
+        estado_ia = self._verificar_modelos_ia()
+
+        estado = {
+            "sistema": {
+                "status": self._determinar_estado_general(
+                    estado_servidor, estado_db, estado_servicios, estado_ia
+                ),
+                "timestamp": datetime.now().isoformat(),
+                "version": "1.0.0"
+            },
+            "servidor": estado_servidor,
+            "base_datos": estado_db,
+            "servicios_externos": estado_servicios,
+            "modelos_ia": estado_ia,
+            "metricas": self._obtener_metricas_performancia()
+        }
+
+        with self._lock:
+            self._estado = estado
+            self._muestreado = time.monotonic()
+        return estado
+
+    # ================= LECTURA (ENDPOINTS) =================
+    def obtener_estado_sistema(self) -> dict:
         """
-        Obtiene el estado completo del sistema y sus dependencias
+        Última muestra del estado del sistema. Si todavía no hay ninguna
+        (el hilo no se inició) se toma una en el momento.
         """
+        with self._lock:
+            estado, muestreado = self._estado, self._muestreado
+        if estado is None:
+            estado = self.muestrear()
+            muestreado = time.monotonic()
+
+        edad = time.monotonic() - muestreado
+        return {
+            **estado,
+            "muestra": {
+                "edad_segundos": round(edad, 1),
+                "intervalo_segundos": self.intervalo_segundos,
+                # Muestra vieja: el hilo de muestreo se detuvo o está trabado
+                "vigente": edad <= 3 * self.intervalo_segundos,
+            },
+        }
+
+    def obtener_estado_simplificado(self) -> dict:
+        """Estado resumido para checks rápidos (balanceador, monitoreo)."""
         try:
-            # Estado del servidor
-            estado_servidor = self._obtener_estado_servidor()
-            
-            # Estado de la base de datos
-            estado_db = await self._verificar_base_datos(db)
-            
-            # Estado de servicios externos
-            estado_servicios = await self._verificar_servicios_externos()
-            
-            # Estado de los modelos de IA
-            estado_ia = await self._verificar_modelos_ia()
-            
-            # Determinar estado general
-            estado_general = self._determinar_estado_general(
-                estado_servidor, estado_db, estado_servicios, estado_ia
-            )
-            
+            estado_completo = self.obtener_estado_sistema()
             return {
-                "sistema": {
-                    "status": estado_general,
-                    "timestamp": datetime.now().isoformat(),
-                    "version": "1.0.0"
-                },
-                "servidor": estado_servidor,
-                "base_datos": estado_db,
-                "servicios_externos": estado_servicios,
-                "modelos_ia": estado_ia,
-                "metricas": self._obtener_metricas_performancia()
+                "status": estado_completo["sistema"]["status"],
+                "timestamp": estado_completo["sistema"]["timestamp"],
+                "version": estado_completo["sistema"]["version"],
+                "vigente": estado_completo["muestra"]["vigente"],
+                "checks": {
+                    "servidor": estado_completo["servidor"]["status"],
+                    "base_datos": estado_completo["base_datos"]["status"],
+                    "servicios": estado_completo["servicios_externos"]["status"],
+                    "modelos_ia": estado_completo["modelos_ia"]["status"]
+                }
             }
-            
         except Exception as e:
-            logger.error(f"Error obteniendo estado del sistema: {str(e)}")
             return {
-                "sistema": {
-                    "status": "error",
-                    "timestamp": datetime.now().isoformat(),
-                    "error": str(e)
-                }
+                "status": "error",
+                "timestamp": datetime.now().isoformat(),
+                "error": str(e)
             }
-    
+
+    # ================= MUESTRAS =================
     def _obtener_estado_servidor(self) -> dict:
         """Obtiene el estado del servidor y recursos"""
         try:
-            # Uso de CPU
-            cpu_percent = psutil.cpu_percent(interval=1)
-            
-            # Uso de memoria
+            # Promedio desde la muestra anterior (no bloquea)
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory = psutil.virtual_memory()
-            
-            # Uso de disco
             disk = psutil.disk_usage('/')
-            
-            # Información de red
             net_io = psutil.net_io_counters()
-            
-            # Procesos
-            process = psutil.Process(os.getpid())
-            
+
             return {
                 "status": "activo",
                 "cpu": {
@@ -103,9 +187,9 @@ class MonitorSistema:
                     "bytes_recibidos": net_io.bytes_recv
                 },
                 "proceso": {
-                    "pid": process.pid,
-                    "memory_mb": round(process.memory_info().rss / (1024**2), 2),
-                    "cpu_percent": process.cpu_percent()
+                    "pid": self._proceso.pid,
+                    "memory_mb": round(self._proceso.memory_info().rss / (1024**2), 2),
+                    "cpu_percent": self._proceso.cpu_percent(interval=None)
                 }
             }
         except Exception as e:
@@ -114,140 +198,86 @@ class MonitorSistema:
                 "status": "error",
                 "error": str(e)
             }
-    
-    async def _verificar_base_datos(self, db: Session) -> dict:
-        """Verifica el estado de la base de datos"""
+
+    def _verificar_base_datos(self) -> dict:
+        """Latencia y existencia de las tablas críticas (dos consultas)."""
+        db = SessionLocal()
         try:
-            # Verificar conexión
-            start_time = datetime.now()
+            inicio = time.perf_counter()
             db.execute(text("SELECT 1"))
-            db_latency = (datetime.now() - start_time).total_seconds() * 1000
-            
-            # Verificar tablas críticas
-            tablas_criticas = [
-                'usuario', 'estudiante', 'contenido_lectura', 
-                'evaluacion_lectura', 'analisis_ia'
-            ]
-            
-            tablas_estado = {}
-            for tabla in tablas_criticas:
-                try:
-                    db.execute(text(f"SELECT COUNT(*) FROM {tabla} LIMIT 1"))
-                    tablas_estado[tabla] = "activa"
-                except Exception as e:
-                    tablas_estado[tabla] = f"error: {str(e)}"
-            
+            db_latency = (time.perf_counter() - inicio) * 1000
+
+            filas = db.execute(
+                text("SELECT t, to_regclass(t) IS NOT NULL FROM unnest(CAST(:tablas AS text[])) AS t"),
+                {"tablas": list(TABLAS_CRITICAS)}
+            ).all()
+            tablas_estado = {tabla: ("activa" if existe else "no_existe") for tabla, existe in filas}
+
             return {
-                "status": "conectado",
+                "status": "conectado" if all(e == "activa" for e in tablas_estado.values()) else "degradado",
                 "latencia_ms": round(db_latency, 2),
                 "tablas": tablas_estado
             }
-            
         except Exception as e:
             logger.error(f"Error verificando base de datos: {str(e)}")
             return {
                 "status": "error",
                 "error": str(e)
             }
-    
-    async def _verificar_servicios_externos(self) -> dict:
-        """Verifica el estado de servicios externos"""
-        try:
-            import speech_recognition as sr
-            from speech_recognition import RequestError, UnknownValueError
-            
-            # Verificar Google Speech Recognition
-            reconocimiento_estado = "activo"
-            try:
-                # Test simple con audio de prueba
-                r = sr.Recognizer()
-                with sr.Microphone() as source:
-                    r.adjust_for_ambient_noise(source, duration=0.1)
-                reconocimiento_estado = "activo"
-            except RequestError:
-                reconocimiento_estado = "error_conexion"
-            except Exception:
-                reconocimiento_estado = "configurado"
-            
-            # Verificar librerías de audio
-            librerias_audio = {}
-            try:
-                import librosa
-                librerias_audio['librosa'] = {
-                    "version": librosa.__version__,
-                    "status": "activo"
-                }
-            except ImportError:
-                librerias_audio['librosa'] = {
-                    "status": "no_instalado"
-                }
-            
-            try:
-                import numpy as np
-                librerias_audio['numpy'] = {
-                    "version": np.__version__,
-                    "status": "activo"
-                }
-            except ImportError:
-                librerias_audio['numpy'] = {
-                    "status": "no_instalado"
-                }
-            
-            return {
-                "speech_recognition": reconocimiento_estado,
-                "librerias_audio": librerias_audio,
-                "status": "activo" if reconocimiento_estado in ["activo", "configurado"] else "error"
-            }
-            
-        except Exception as e:
-            logger.error(f"Error verificando servicios externos: {str(e)}")
-            return {
-                "status": "error",
-                "error": str(e)
-            }
-    
-    async def _verificar_modelos_ia(self) -> dict:
-        """Verifica el estado de los modelos de IA"""
-        try:
-            from servicios.ia_lectura_service import ServicioAnalisisLectura
-            from servicios.generador_ejercicios import GeneradorEjercicios
-            
-            # Verificar que los servicios se pueden instanciar
-            servicio_analisis = ServicioAnalisisLectura()
-            generador_ejercicios = GeneradorEjercicios()
-            
-            modelos = {
-                "analisis_pronunciacion": {
-                    "status": "activo",
-                    "modelo": "google_speech_v2",
-                    "caracteristicas": ["stt", "analisis_errores", "fluidez"]
-                },
-                "generacion_ejercicios": {
-                    "status": "activo",
-                    "tipos": ["palabras_aisladas", "oraciones", "puntuacion", "ritmo", "entonacion"]
-                },
-                "evaluacion_avanzada": {
-                    "status": "activo",
-                    "metricas": ["precision_global", "velocidad", "fluidez", "entonacion"]
-                }
-            }
-            
-            return {
-                "status": "activo",
-                "modelos": modelos
-            }
-            
-        except Exception as e:
-            logger.error(f"Error verificando modelos de IA: {str(e)}")
-            return {
-                "status": "error",
-                "error": str(e)
-            }
-    
+        finally:
+            db.close()
+
+    def _verificar_servicios_externos(self) -> dict:
+        """Librerías de audio disponibles (se buscan una sola vez)."""
+        if self._librerias is None:
+            librerias = {}
+            for nombre in LIBRERIAS_AUDIO:
+                if importlib.util.find_spec(nombre) is None:
+                    librerias[nombre] = {"status": "no_instalado"}
+                    continue
+                try:
+                    version = metadata.version(nombre.replace("_", "-"))
+                except metadata.PackageNotFoundError:
+                    version = None
+                librerias[nombre] = {"version": version, "status": "activo"}
+            self._librerias = librerias
+
+        return {
+            "librerias_audio": self._librerias,
+            "status": "activo" if all(
+                lib["status"] == "activo" for lib in self._librerias.values()
+            ) else "error"
+        }
+
+    def _verificar_modelos_ia(self) -> dict:
+        """
+        Modelos ya cargados en este proceso. Los módulos de IA cargan sus
+        modelos al importarse; aquí solo se miran, no se importan.
+        """
+        modelos = {}
+
+        ia_routes = sys.modules.get("app.routers.ia_routes")
+        analizador = getattr(getattr(ia_routes, "manager_ia", None), "analizador", None)
+        modelos["analisis_pronunciacion"] = {
+            "status": "activo" if getattr(analizador, "model", None) is not None else "no_cargado",
+            "modelo": f"faster-whisper-{getattr(analizador, 'nombre_modelo', settings.WHISPER_MODEL)}",
+        }
+
+        ia_actividades = sys.modules.get("app.servicios.ia_actividades")
+        modelos["generacion_actividades"] = {
+            "status": "activo" if getattr(ia_actividades, "model", None) is not None else "no_cargado",
+            "modelo": getattr(ia_actividades, "MODEL_NAME", None),
+        }
+
+        return {
+            "status": "activo" if all(m["status"] == "activo" for m in modelos.values()) else "degradado",
+            "modelos": modelos
+        }
+
     def _determinar_estado_general(self, servidor: dict, db: dict, servicios: dict, ia: dict) -> str:
         """Determina el estado general del sistema"""
         estados = []
-        
+
         if servidor.get('status') != 'activo':
             estados.append('servidor')
         if db.get('status') != 'conectado':
@@ -256,27 +286,22 @@ class MonitorSistema:
             estados.append('servicios_externos')
         if ia.get('status') != 'activo':
             estados.append('modelos_ia')
-        
+
         if not estados:
             return "operativo"
         elif len(estados) <= 2:
             return "degradado"
         else:
             return "critico"
-    
+
     def _obtener_metricas_performancia(self) -> dict:
         """Obtiene métricas de performance del sistema"""
         try:
-            # Tiempo de actividad del sistema
             boot_time = datetime.fromtimestamp(psutil.boot_time())
             uptime = datetime.now() - boot_time
-            
-            # Estadísticas de red
             net_stats = psutil.net_io_counters()
-            
-            # Estadísticas de disco
             disk_io = psutil.disk_io_counters()
-            
+
             return {
                 "uptime_segundos": int(uptime.total_seconds()),
                 "uptime_formateado": str(uptime).split('.')[0],
@@ -300,26 +325,6 @@ class MonitorSistema:
             return {
                 "error": str(e)
             }
-    
-    async def obtener_estado_simplificado(self, db: Session) -> dict:
-        """Obtiene un estado simplificado para checks rápidos"""
-        try:
-            estado_completo = await self.obtener_estado_sistema(db)
-            
-            return {
-                "status": estado_completo["sistema"]["status"],
-                "timestamp": estado_completo["sistema"]["timestamp"],
-                "version": estado_completo["sistema"]["version"],
-                "checks": {
-                    "servidor": estado_completo["servidor"]["status"],
-                    "base_datos": estado_completo["base_datos"]["status"],
-                    "servicios": estado_completo["servicios_externos"]["status"],
-                    "modelos_ia": estado_completo["modelos_ia"]["status"]
-                }
-            }
-        except Exception as e:
-            return {
-                "status": "error",
-                "timestamp": datetime.now().isoformat(),
-                "error": str(e)
-            }
\ No newline at end of file
+
+
+monitor_sistema = MonitorSistema(intervalo_segundos=settings.MONITOR_INTERVALO_SEGUNDOS)
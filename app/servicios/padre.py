@@ -1,6 +1,9 @@
+from typing import Optional
 from sqlalchemy.orm import Session
 from app.modelos import Padre, Estudiante
 from app.esquemas.padre import PadreCreate, PadreUpdate
+from app.servicios.paginacion import paginar_keyset
+from app.servicios.cache_principal import invalidar_principal
 
 
 
@@ -16,11 +19,15 @@ def crear_padre(db: Session, datos: PadreCreate):
     db.add(nuevo_padre)
     db.commit()
     db.refresh(nuevo_padre)
+    invalidar_principal(datos.usuario_id)
     return nuevo_padre
 
 
-def obtener_padres(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Padre).offset(skip).limit(limit).all()
+def obtener_padres(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    query = paginar_keyset(db.query(Padre), (Padre.id,), cursor, limit)
+    if not cursor and skip:
+        query = query.offset(skip)
+    return query.all()
 
 
 def obtener_padre(db: Session, padre_id: int):
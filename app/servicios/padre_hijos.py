@@ -1,54 +1,72 @@
-from typing import List
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from typing import Dict, List, Tuple
 
-from app.modelos import Padre, Estudiante, EstudianteCurso
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+
+from app.modelos import Padre, Estudiante, EstudianteCurso, Curso, Docente
 from app.esquemas.estudiante import EstudianteResponse
 from app.esquemas.curso import CursoResponse
 from app.esquemas.padre_hijos import EstudianteConCursosResponse
 
 
-def obtener_hijos_con_cursos(
+def cargar_hijos_con_cursos(
     db: Session,
     usuario_id: int,
-) -> List[EstudianteConCursosResponse]:
-    # Buscar padre
-    padre = (
-        db.query(Padre)
-        .filter(Padre.usuario_id == usuario_id)
-        .first()
+    solo_hijos_activos: bool = False,
+) -> List[Tuple[Estudiante, List[Curso]]]:
+    """
+    Hijos del padre (por usuario) con sus cursos, en DOS consultas:
+
+    1. Hijos unidos a su padre, con usuario y docente (y su usuario) precargados
+    2. Cursos de todos esos hijos a la vez, con docente y usuario precargados
+
+    Args:
+        solo_hijos_activos: Excluir a los estudiantes inactivos
+
+    Returns:
+        Lista de (estudiante, cursos) en orden de id del estudiante
+    """
+    consulta_hijos = (
+        select(Estudiante)
+        .join(Padre, Padre.id == Estudiante.padre_id)
+        .where(Padre.usuario_id == usuario_id)
+        .options(
+            joinedload(Estudiante.usuario),
+            joinedload(Estudiante.docente).joinedload(Docente.usuario),
+        )
+        .order_by(Estudiante.id)
     )
+    if solo_hijos_activos:
+        consulta_hijos = consulta_hijos.where(Estudiante.activo == True)
 
-    if not padre:
+    hijos = db.execute(consulta_hijos).unique().scalars().all()
+    if not hijos:
         return []
 
-    # Buscar hijos del padre
-    hijos = (
-        db.query(Estudiante)
-        .filter(Estudiante.padre_id == padre.id)
-        .all()
+    consulta_cursos = (
+        select(EstudianteCurso.estudiante_id, Curso)
+        .join(Curso, Curso.id == EstudianteCurso.curso_id)
+        .where(EstudianteCurso.estudiante_id.in_([h.id for h in hijos]))
+        .options(joinedload(Curso.docente).joinedload(Docente.usuario))
+        .order_by(EstudianteCurso.id)
     )
 
-    resultado: List[EstudianteConCursosResponse] = []
+    cursos_por_hijo: Dict[int, List[Curso]] = defaultdict(list)
+    for estudiante_id, curso in db.execute(consulta_cursos).unique().all():
+        cursos_por_hijo[estudiante_id].append(curso)
 
-    for hijo in hijos:
-        # Buscar cursos asociados al hijo
-        relaciones = (
-            db.query(EstudianteCurso)
-            .filter(EstudianteCurso.estudiante_id == hijo.id)
-            .all()
-        )
+    return [(hijo, cursos_por_hijo.get(hijo.id, [])) for hijo in hijos]
 
-        cursos = [
-            CursoResponse.model_validate(rel.curso)
-            for rel in relaciones
-            if rel.curso
-        ]
-
-        resultado.append(
-            EstudianteConCursosResponse(
-                estudiante=EstudianteResponse.model_validate(hijo),
-                cursos=cursos,
-            )
-        )
 
-    return resultado
+def obtener_hijos_con_cursos(
+    db: Session,
+    usuario_id: int,
+) -> List[EstudianteConCursosResponse]:
+    return [
+        EstudianteConCursosResponse(
+            estudiante=EstudianteResponse.model_validate(hijo),
+            cursos=[CursoResponse.model_validate(curso) for curso in cursos],
+        )
+        for hijo, cursos in cargar_hijos_con_cursos(db, usuario_id)
+    ]
@@ -0,0 +1,114 @@
+"""
+Paginación por cursor (keyset).
+
+En lugar de OFFSET, cada página filtra por la posición del último registro
+devuelto: `WHERE (col1, col2) > (:v1, :v2) ORDER BY col1, col2 LIMIT n`.
+El costo de una página no depende de lo profunda que sea.
+
+El cursor es opaco para el cliente (JSON en base64 url-safe) y se devuelve
+en la cabecera `X-Next-Cursor`. Las columnas de orden deben terminar en una
+columna única (normalmente `id`) y no admitir NULL.
+
+USO:
+    query = paginar_keyset(db.query(Padre), (Padre.id,), cursor, limit)
+    padres = query.all()
+    publicar_cursor(response, siguiente_cursor(padres, (Padre.id,), limit))
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+
+CABECERA_CURSOR = "X-Next-Cursor"
+
+
+def codificar_cursor(valores: Sequence[Any]) -> str:
+    """Serializa los valores de las columnas de orden en un cursor opaco."""
+    payload = [
+        {"d": v.isoformat()} if isinstance(v, datetime) else v
+        for v in valores
+    ]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decodificar_cursor(cursor: str, num_columnas: int) -> List[Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(payload, list) or len(payload) != num_columnas:
+            raise ValueError("Cursor con número de columnas incorrecto")
+        return [
+            datetime.fromisoformat(v["d"]) if isinstance(v, dict) else v
+            for v in payload
+        ]
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación inválido"
+        )
+
+
+def paginar_keyset(
+    query: Query,
+    columnas: Sequence[Any],
+    cursor: Optional[str] = None,
+    limite: Optional[int] = None,
+    descendente: bool = False,
+) -> Query:
+    """
+    Aplica filtro, orden y límite keyset a una consulta.
+
+    Args:
+        query: Consulta base (ya filtrada)
+        columnas: Columnas de orden; la última debe ser única
+        cursor: Cursor de la página anterior (None para la primera)
+        limite: Tamaño de página (None sin límite)
+        descendente: Orden descendente en todas las columnas
+
+    Returns:
+        Query lista para ejecutar
+    """
+    if cursor:
+        valores = decodificar_cursor(cursor, len(columnas))
+        if len(columnas) == 1:
+            izquierda, derecha = columnas[0], valores[0]
+        else:
+            izquierda, derecha = tuple_(*columnas), tuple_(*valores)
+        query = query.filter(izquierda < derecha if descendente else izquierda > derecha)
+
+    query = query.order_by(
+        *[col.desc() if descendente else col.asc() for col in columnas]
+    )
+
+    if limite is not None:
+        query = query.limit(limite)
+
+    return query
+
+
+def siguiente_cursor(
+    items: Sequence[Any],
+    columnas: Sequence[Any],
+    limite: Optional[int],
+) -> Optional[str]:
+    """
+    Cursor para la página siguiente, o None si ya no hay más registros.
+
+    Una página llena siempre devuelve cursor, por lo que la última página
+    puede llegar vacía cuando el total es múltiplo del límite.
+    """
+    if limite is None or not items or len(items) < limite:
+        return None
+    ultimo = items[-1]
+    return codificar_cursor([getattr(ultimo, col.key) for col in columnas])
+
+
+def publicar_cursor(response: Response, cursor: Optional[str]) -> None:
+    """Expone el cursor de la siguiente página en la cabecera de respuesta."""
+    if cursor:
+        response.headers[CABECERA_CURSOR] = cursor
@@ -0,0 +1,488 @@
+"""
+Auditoría a nivel de aplicación, escrita en bloque y fuera del request.
+
+Reemplaza a los triggers por fila de `mejorar_triggers_auditoria.sql`, que
+escribían en `auditoria` dentro de cada transacción de negocio una imagen
+JSONB completa antes/después por fila modificada:
+
+1. Eventos de la sesión de SQLAlchemy acumulan los cambios de cada
+   transacción en `session.info`:
+   - after_flush: objetos ORM nuevos, modificados o borrados de
+     TABLAS_AUDITADAS. En UPDATE solo se guardan las columnas que cambiaron
+   - do_orm_execute: INSERT/UPDATE/DELETE ejecutados con session.execute()
+     sobre esas tablas (importación masiva, detalles de evaluación, nivel
+     del estudiante). También un evento por fila, sin consultas extra: se
+     agregan columnas al RETURNING de la misma sentencia (INSERT con los ids
+     generados, DELETE con la fila borrada, UPDATE solo con los valores
+     nuevos de las columnas asignadas)
+2. after_commit entrega los eventos al escritor de fondo; si la transacción
+   hace rollback se descartan (no se audita lo que no ocurrió)
+3. EscritorAuditoria inserta de a AUDITORIA_LOTE filas por INSERT. Si la
+   cola se llena o el escritor no está corriendo (scripts) los eventos se
+   escriben en el momento: no se pierden por presión de carga
+
+Usuario e IP: `obtener_usuario_actual` fija el contexto del request y
+`get_db_with_audit_context` el de la sesión (ver app/middlewares). La fecha
+de cada evento se toma al hacer el flush, no al escribirlo.
+
+Se activa con AUDITORIA_MODO=aplicacion, después de aplicar
+migrations/auditoria_en_aplicacion.sql. Con el valor por defecto
+(triggers) no se registra ningún evento de sesión; si los triggers siguen
+instalados en modo aplicación, `verificar_modo_auditoria` impide arrancar.
+"""
+
+import queue
+import threading
+from contextvars import ContextVar
+from datetime import date, datetime, time as dtime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, insert, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import settings
+from app.config import SessionLocal
+from app.metricas import registro_metricas
+from app.modelos import Auditoria
+from app.logs.logger import logger
+
+
+TABLAS_AUDITADAS = frozenset({
+    "usuario",
+    "estudiante",
+    "docente",
+    "padre",
+    "contenido_lectura",
+    "evaluacion_lectura",
+    "detalle_evaluacion",
+    "actividad_lectura",
+    "respuesta_actividad",
+    "ejercicio_pronunciacion",
+    "historial_puntos",
+    "nivel_estudiante",
+    "recompensa_estudiante",
+    "mision_diaria",
+})
+
+# Columnas que nunca se copian a la auditoría
+COLUMNAS_EXCLUIDAS = frozenset({"password_hash", "token_reset_password"})
+
+_CLAVE_EVENTOS = "auditoria_eventos"
+_CLAVE_CONTEXTO = "auditoria_contexto"
+
+ContextoAuditoria = Tuple[Optional[int], Optional[str]]
+
+_contexto_request: ContextVar[Optional[ContextoAuditoria]] = ContextVar("contexto_auditoria", default=None)
+
+
+def auditoria_en_aplicacion() -> bool:
+    return settings.AUDITORIA_MODO.lower() == "aplicacion"
+
+
+def ip_cliente(request) -> Optional[str]:
+    """
+    IP del cliente. ProxyHeadersMiddleware ya resolvió X-Forwarded-For si la
+    conexión viene de un proxy confiable; la cabecera no se lee aquí porque
+    el cliente la controla.
+    """
+    return request.client.host if request.client else None
+
+
+def fijar_contexto_request(usuario_id: Optional[int], ip_address: Optional[str]) -> None:
+    """Usuario e IP del request en curso (lo llama obtener_usuario_actual)."""
+    _contexto_request.set((usuario_id, ip_address))
+
+
+def fijar_contexto_sesion(db: Session, usuario_id: Optional[int], ip_address: Optional[str]) -> None:
+    """Usuario e IP para los cambios de esta sesión; tiene prioridad sobre el del request."""
+    db.info[_CLAVE_CONTEXTO] = (usuario_id, ip_address)
+
+
+def limpiar_contexto_sesion(db: Session) -> None:
+    db.info.pop(_CLAVE_CONTEXTO, None)
+
+
+def _contexto(session: Session) -> ContextoAuditoria:
+    return session.info.get(_CLAVE_CONTEXTO) or _contexto_request.get() or (None, None)
+
+
+def _a_json(valor: Any) -> Any:
+    if isinstance(valor, (datetime, date, dtime)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, Enum):
+        return valor.value
+    if isinstance(valor, (bytes, bytearray, memoryview)):
+        return None
+    if valor is None or isinstance(valor, (str, int, float, bool, list, dict)):
+        return valor
+    return str(valor)
+
+
+def _valores(estado, atributos) -> Dict[str, Any]:
+    """Valores ya cargados (no dispara consultas por columnas expiradas)."""
+    valores = {}
+    for attr in atributos:
+        columna = attr.columns[0].name
+        if columna in COLUMNAS_EXCLUIDAS or attr.key not in estado.dict:
+            continue
+        valores[columna] = _a_json(estado.dict[attr.key])
+    return valores
+
+
+def _cambios(estado, atributos) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    anteriores, nuevos = {}, {}
+    for attr in atributos:
+        columna = attr.columns[0].name
+        if columna in COLUMNAS_EXCLUIDAS:
+            continue
+        historia = estado.attrs[attr.key].history
+        if not historia.added and not historia.deleted:
+            continue
+        anteriores[columna] = _a_json(historia.deleted[0]) if historia.deleted else None
+        nuevos[columna] = _a_json(historia.added[0]) if historia.added else None
+    return anteriores, nuevos
+
+
+def _evento(
+    session: Session,
+    accion: str,
+    tabla: str,
+    registro_id: Optional[int],
+    anteriores: Optional[Dict[str, Any]],
+    nuevos: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    usuario_id, ip_address = _contexto(session)
+    return {
+        "usuario_id": usuario_id,
+        "accion": accion,
+        "tabla_afectada": tabla,
+        "registro_id": registro_id,
+        "datos_anteriores": anteriores,
+        "datos_nuevos": nuevos,
+        "ip_address": ip_address,
+        "fecha_evento": datetime.now(timezone.utc),
+    }
+
+
+def _registro_id(estado) -> Optional[int]:
+    # En after_flush los objetos nuevos aún no tienen identity: se lee la PK del dict
+    if estado.identity:
+        return estado.identity[0]
+    columna_pk = estado.mapper.primary_key[0]
+    return estado.dict.get(estado.mapper.get_property_by_column(columna_pk).key)
+
+
+def _despues_de_flush(session: Session, flush_context) -> None:
+    # En after_flush new/dirty/deleted y el historial aún son los previos al flush
+    eventos = []
+    for obj in session.new:
+        tabla = getattr(obj, "__tablename__", None)
+        if tabla in TABLAS_AUDITADAS:
+            estado = inspect(obj)
+            eventos.append(_evento(
+                session, "INSERT", tabla, _registro_id(estado),
+                None, _valores(estado, estado.mapper.column_attrs),
+            ))
+
+    for obj in session.dirty:
+        tabla = getattr(obj, "__tablename__", None)
+        if tabla in TABLAS_AUDITADAS:
+            estado = inspect(obj)
+            anteriores, nuevos = _cambios(estado, estado.mapper.column_attrs)
+            if nuevos:
+                eventos.append(_evento(session, "UPDATE", tabla, _registro_id(estado), anteriores, nuevos))
+
+    for obj in session.deleted:
+        tabla = getattr(obj, "__tablename__", None)
+        if tabla in TABLAS_AUDITADAS:
+            estado = inspect(obj)
+            eventos.append(_evento(
+                session, "DELETE", tabla, _registro_id(estado),
+                _valores(estado, estado.mapper.column_attrs), None,
+            ))
+
+    if eventos:
+        session.info.setdefault(_CLAVE_EVENTOS, []).extend(eventos)
+
+
+def _fila_json(fila) -> Dict[str, Any]:
+    return {
+        clave: _a_json(valor)
+        for clave, valor in dict(fila).items()
+        if clave not in COLUMNAS_EXCLUIDAS
+    }
+
+
+def _dml_en_bloque(estado_ejecucion):
+    """
+    INSERT/UPDATE/DELETE ejecutados con session.execute() (no pasan por el
+    flush): un evento por fila, igual que los triggers.
+    """
+    if not (estado_ejecucion.is_insert or estado_ejecucion.is_update or estado_ejecucion.is_delete):
+        return None
+    tabla = getattr(estado_ejecucion.statement, "table", None)
+    if getattr(tabla, "name", None) not in TABLAS_AUDITADAS:
+        return None
+
+    # executemany: una lista de filas (INSERT en bloque, UPDATE por PK)
+    parametros = estado_ejecucion.parameters
+    filas_parametros = parametros if isinstance(parametros, list) else None
+    pk = list(tabla.primary_key.columns)[0]
+
+    if estado_ejecucion.is_insert:
+        return _auditar_insert(estado_ejecucion, tabla, pk, filas_parametros)
+    return _auditar_update_delete(estado_ejecucion, tabla, pk, filas_parametros)
+
+
+def _auditar_insert(estado_ejecucion, tabla, pk, filas_parametros):
+    """
+    Las filas insertadas salen del RETURNING (con los ids generados). Si la
+    sentencia no pedía RETURNING se le agrega y el resultado se devuelve
+    consumido; si lo pedía, se congela para que quien llama reciba sus filas.
+    """
+    sentencia = estado_ejecucion.statement
+    session = estado_ejecucion.session
+
+    if len(sentencia.exported_columns) == 0:
+        resultado = estado_ejecucion.invoke_statement(
+            statement=sentencia.returning(*tabla.c, sort_by_parameter_order=True)
+        )
+        filas = resultado.mappings().all()
+        if not hasattr(resultado, "rowcount"):
+            resultado.rowcount = len(filas)
+    else:
+        congelado = estado_ejecucion.invoke_statement().freeze()
+        filas = congelado().mappings().all()
+        resultado = congelado()
+
+    # INSERT ... ON CONFLICT DO UPDATE: no se distingue si insertó o actualizó
+    accion = "UPSERT" if getattr(sentencia, "_post_values_clause", None) is not None else "INSERT"
+    if filas_parametros is None or len(filas_parametros) != len(filas):
+        filas_parametros = [{}] * len(filas)
+
+    eventos = []
+    for parametros_fila, fila in zip(filas_parametros, filas):
+        datos = {**_fila_json(parametros_fila), **_fila_json(fila)}
+        eventos.append(_evento(session, accion, tabla.name, datos.get(pk.key), None, datos))
+
+    if eventos:
+        session.info.setdefault(_CLAVE_EVENTOS, []).extend(eventos)
+    return resultado
+
+
+def _auditar_update_delete(estado_ejecucion, tabla, pk, filas_parametros):
+    """
+    Sin lecturas extra ni bloqueos: la sentencia se ejecuta una sola vez.
+
+    - DELETE: la fila borrada completa sale del RETURNING
+    - UPDATE: solo los valores NUEVOS de las columnas asignadas, del
+      RETURNING o, en un UPDATE en bloque por PK, de los propios parámetros
+
+    Costo: los UPDATE hechos con session.execute() no guardan los valores
+    anteriores (leerlos exigiría un SELECT ... FOR UPDATE previo por
+    sentencia). Los UPDATE de objetos ORM (after_flush) sí los guardan.
+    """
+    session = estado_ejecucion.session
+    sentencia = estado_ejecucion.statement
+
+    if estado_ejecucion.is_update and filas_parametros is not None:
+        resultado = estado_ejecucion.invoke_statement()
+        eventos = [
+            _evento(
+                session, "UPDATE", tabla.name, parametros_fila.get(pk.key), None,
+                {c: v for c, v in _fila_json(parametros_fila).items() if c != pk.key},
+            )
+            for parametros_fila in filas_parametros
+        ]
+    elif estado_ejecucion.is_delete:
+        filas, resultado = _invocar_con_returning(estado_ejecucion, list(tabla.c))
+        eventos = [
+            _evento(session, "DELETE", tabla.name, fila[pk.key], _fila_json(fila), None)
+            for fila in filas
+        ]
+    else:
+        asignadas = _columnas_asignadas(sentencia, tabla, pk, estado_ejecucion.parameters)
+        filas, resultado = _invocar_con_returning(estado_ejecucion, [pk, *asignadas])
+        eventos = [
+            _evento(
+                session, "UPDATE", tabla.name, fila[pk.key], None,
+                {c.key: _a_json(fila[c.key]) for c in asignadas if c.key not in COLUMNAS_EXCLUIDAS},
+            )
+            for fila in filas
+        ]
+
+    if eventos:
+        session.info.setdefault(_CLAVE_EVENTOS, []).extend(eventos)
+    return resultado
+
+
+def _columnas_asignadas(sentencia, tabla, pk, parametros) -> list:
+    """Columnas del SET de un UPDATE (todas si no se pueden determinar)."""
+    claves = set(parametros) if isinstance(parametros, dict) else set()
+    claves.update(getattr(clave, "key", clave) for clave in (sentencia._values or {}))
+    columnas = [c for c in tabla.c if c is not pk]
+    return [c for c in columnas if c.key in claves] or columnas
+
+
+def _invocar_con_returning(estado_ejecucion, columnas):
+    """
+    Ejecuta la sentencia con `columnas` agregadas al RETURNING. Devuelve
+    (filas para la auditoría, resultado para quien llama); si la sentencia ya
+    tenía RETURNING, quien llama recibe solo sus propias columnas.
+    """
+    sentencia = estado_ejecucion.statement
+    propias = len(sentencia.exported_columns)
+    resultado = estado_ejecucion.invoke_statement(
+        statement=sentencia.returning(*(c.label(f"auditoria_{c.key}") for c in columnas))
+    )
+    if propias:
+        congelado = resultado.freeze()
+        filas = congelado().mappings().all()
+        resultado = congelado().columns(*range(propias))
+    else:
+        filas = resultado.mappings().all()
+        if not hasattr(resultado, "rowcount"):
+            # Con RETURNING el ORM devuelve filas en lugar del CursorResult;
+            # Query.update()/delete() y quien llama esperan rowcount
+            resultado.rowcount = len(filas)
+    return [{c.key: fila[f"auditoria_{c.key}"] for c in columnas} for fila in filas], resultado
+
+
+def _despues_de_commit(session: Session) -> None:
+    eventos = session.info.pop(_CLAVE_EVENTOS, None)
+    if eventos:
+        escritor_auditoria.encolar(eventos)
+
+
+def _despues_de_rollback(session: Session) -> None:
+    session.info.pop(_CLAVE_EVENTOS, None)
+
+
+def escribir_eventos(eventos: List[Dict[str, Any]]) -> None:
+    """Inserta los eventos con un solo INSERT multi-fila."""
+    db = SessionLocal()
+    try:
+        db.execute(insert(Auditoria), eventos)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def verificar_modo_auditoria() -> None:
+    """
+    En modo aplicación los triggers de auditoría no deben seguir instalados
+    (se auditaría todo dos veces): si quedan, la aplicación no arranca.
+    """
+    if not auditoria_en_aplicacion():
+        return
+
+    db = SessionLocal()
+    try:
+        tablas = db.execute(text(
+            "SELECT c.relname FROM pg_trigger t JOIN pg_class c ON c.oid = t.tgrelid "
+            "WHERE t.tgname = 'trigger_auditoria' AND NOT t.tgisinternal"
+        )).scalars().all()
+    except SQLAlchemyError as e:
+        logger.warning("⚠️ No se pudo verificar si quedan triggers de auditoría: %s", e)
+        return
+    finally:
+        db.close()
+
+    if tablas:
+        raise RuntimeError(
+            "AUDITORIA_MODO=aplicacion pero trigger_auditoria sigue instalado en: "
+            f"{', '.join(sorted(tablas))}. Ejecutar migrations/auditoria_en_aplicacion.sql "
+            "o usar AUDITORIA_MODO=triggers."
+        )
+
+
+class EscritorAuditoria:
+    """Hilo de fondo que escribe los eventos de auditoría en lotes."""
+
+    def __init__(self, lote: int, intervalo_segundos: float, cola_max: int) -> None:
+        self.lote = max(1, lote)
+        self.intervalo_segundos = intervalo_segundos
+        self._cola: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=cola_max)
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="auditoria-escritor", daemon=True)
+        self._hilo.start()
+        logger.info("📝 Escritor de auditoría iniciado")
+
+    def detener(self, timeout: float = 10.0) -> None:
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+        # Lo que quedó en la cola se escribe antes de terminar
+        self._escribir_lote(self._vaciar(None))
+
+    def pendientes(self) -> int:
+        return self._cola.qsize()
+
+    def encolar(self, eventos: List[Dict[str, Any]]) -> None:
+        if self._hilo is None:
+            self._escribir_lote(eventos)
+            return
+        for i, evento in enumerate(eventos):
+            try:
+                self._cola.put_nowait(evento)
+            except queue.Full:
+                logger.warning("⚠️ Cola de auditoría llena, escribiendo en el momento")
+                self._escribir_lote(eventos[i:])
+                return
+
+    def _bucle(self) -> None:
+        while not self._detener.is_set():
+            try:
+                primero = self._cola.get(timeout=self.intervalo_segundos)
+            except queue.Empty:
+                continue
+            self._escribir_lote([primero] + self._vaciar(self.lote - 1))
+
+    def _vaciar(self, maximo: Optional[int]) -> List[Dict[str, Any]]:
+        eventos = []
+        while maximo is None or len(eventos) < maximo:
+            try:
+                eventos.append(self._cola.get_nowait())
+            except queue.Empty:
+                break
+        return eventos
+
+    def _escribir_lote(self, eventos: List[Dict[str, Any]]) -> None:
+        for inicio in range(0, len(eventos), self.lote):
+            lote = eventos[inicio:inicio + self.lote]
+            try:
+                escribir_eventos(lote)
+            except Exception:
+                logger.exception("❌ No se pudieron escribir %s eventos de auditoría", len(lote))
+
+
+escritor_auditoria = EscritorAuditoria(
+    lote=settings.AUDITORIA_LOTE,
+    intervalo_segundos=settings.AUDITORIA_INTERVALO_SEGUNDOS,
+    cola_max=settings.AUDITORIA_COLA_MAX,
+)
+
+registro_metricas.indicador(
+    "bookismart_cola_auditoria", "Eventos de auditoría esperando ser escritos", escritor_auditoria.pendientes
+)
+
+if auditoria_en_aplicacion():
+    event.listen(Session, "after_flush", _despues_de_flush)
+    event.listen(Session, "do_orm_execute", _dml_en_bloque)
+    event.listen(Session, "after_commit", _despues_de_commit)
+    event.listen(Session, "after_rollback", _despues_de_rollback)
@@ -0,0 +1,154 @@
+"""
+Revocación de tokens de acceso por versión.
+
+Cada usuario tiene un contador `usuario.token_version` en la BD y cada token
+lleva en el claim `ver` la versión vigente al emitirlo. Bloquear, desactivar,
+eliminar o cambiar los roles de un usuario incrementa el contador, con lo que
+todos sus tokens anteriores quedan revocados.
+
+Para no consultar la BD en cada request, cada proceso mantiene una lista en
+memoria `usuario_id -> versión mínima válida`:
+
+- Se actualiza al instante cuando la revocación se hace en este proceso
+- Se sincroniza con la BD como máximo cada TOKEN_REVOCACION_SYNC_SEGUNDOS
+  (una sola consulta) para ver las revocaciones hechas en otros workers
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import settings
+from app.modelos import Usuario
+from app.servicios.cache_principal import invalidar_principal
+from app.logs.logger import logger
+
+
+class ListaRevocacion:
+    """Versión mínima de token aceptada por usuario, segura entre hilos."""
+
+    def __init__(self, intervalo_sync_segundos: float) -> None:
+        self.intervalo_sync_segundos = intervalo_sync_segundos
+        self._versiones: Dict[int, int] = {}
+        self._proxima_sync = 0.0
+        self._lock = threading.Lock()
+
+    def version_minima(self, usuario_id: int) -> int:
+        return self._versiones.get(usuario_id, 0)
+
+    def registrar(self, usuario_id: int, version: int) -> None:
+        with self._lock:
+            if version > self._versiones.get(usuario_id, 0):
+                self._versiones[usuario_id] = version
+
+    def sincronizar_si_corresponde(self, db: Session) -> None:
+        """Recarga las versiones desde la BD si venció el intervalo."""
+        if not self._reservar_sync():
+            return
+        try:
+            filas = db.execute(_CONSULTA_VERSIONES).all()
+        except Exception as e:
+            self._fallo_sync(e)
+            return
+        self._aplicar(filas)
+
+    async def sincronizar_si_corresponde_async(self, db: AsyncSession) -> None:
+        """Igual que sincronizar_si_corresponde, con sesión async."""
+        if not self._reservar_sync():
+            return
+        try:
+            filas = (await db.execute(_CONSULTA_VERSIONES)).all()
+        except Exception as e:
+            self._fallo_sync(e)
+            return
+        self._aplicar(filas)
+
+    def _reservar_sync(self) -> bool:
+        """True si a este hilo le toca sincronizar (una vez por intervalo)."""
+        ahora = time.monotonic()
+        with self._lock:
+            if ahora < self._proxima_sync:
+                return False
+            self._proxima_sync = ahora + self.intervalo_sync_segundos
+            return True
+
+    def _fallo_sync(self, error: Exception) -> None:
+        # Sin sincronizar se sigue usando la lista local; reintentar pronto
+        logger.error(f"Error sincronizando revocación de tokens: {error}")
+        with self._lock:
+            self._proxima_sync = 0.0
+
+    def _aplicar(self, filas) -> None:
+        with self._lock:
+            for usuario_id, version in filas:
+                if version > self._versiones.get(usuario_id, 0):
+                    self._versiones[usuario_id] = version
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._versiones.clear()
+            self._proxima_sync = 0.0
+
+
+_CONSULTA_VERSIONES = (
+    select(Usuario.id, Usuario.token_version).where(Usuario.token_version > 0)
+)
+
+
+lista_revocacion = ListaRevocacion(
+    intervalo_sync_segundos=settings.TOKEN_REVOCACION_SYNC_SEGUNDOS,
+)
+
+
+def token_revocado(db: Session, usuario_id: Optional[int], version: Optional[int]) -> bool:
+    """True si el token (usuario, versión) fue revocado."""
+    if usuario_id is None or version is None:
+        return True
+    lista_revocacion.sincronizar_si_corresponde(db)
+    return version < lista_revocacion.version_minima(usuario_id)
+
+
+async def token_revocado_async(
+    db: AsyncSession, usuario_id: Optional[int], version: Optional[int]
+) -> bool:
+    """Igual que token_revocado, con sesión async."""
+    if usuario_id is None or version is None:
+        return True
+    await lista_revocacion.sincronizar_si_corresponde_async(db)
+    return version < lista_revocacion.version_minima(usuario_id)
+
+
+def revocar_tokens_usuario(db: Session, usuario_id: Optional[int]) -> Optional[int]:
+    """
+    Revoca todos los tokens emitidos a un usuario.
+
+    Incrementa `token_version` en la BD (en su propia transacción) y descarta
+    el principal cacheado. Llamar después de confirmar el cambio que motiva
+    la revocación (bloqueo, desactivación, eliminación o cambio de roles).
+
+    Returns:
+        La nueva versión, o None si el usuario no existe
+    """
+    if usuario_id is None:
+        return None
+
+    try:
+        version = db.execute(
+            update(Usuario)
+            .where(Usuario.id == usuario_id)
+            .values(token_version=Usuario.token_version + 1)
+            .returning(Usuario.token_version)
+        ).scalar_one_or_none()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if version is not None:
+        lista_revocacion.registrar(usuario_id, version)
+    invalidar_principal(usuario_id)
+    return version
@@ -1,33 +1,55 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import settings
-from app.config import get_db
+from app.config import get_db, get_async_db
 from app.modelos import Usuario, UsuarioRol, Docente 
+from app.servicios.cache_principal import Principal, obtener_principal, obtener_principal_async
+from app.servicios.revocacion_tokens import token_revocado_async, revocar_tokens_usuario
+from app.servicios.hash_contrasenas import pwd_context, ejecutar_hash, metricas
+from app.servicios.registro_auditoria import fijar_contexto_request, ip_cliente
 
 from app.logs.logger import logger
 from typing import List
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
 
 
+# El hashing se ejecuta en el pool acotado de hash_contrasenas
 def verificar_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return ejecutar_hash("verificar", pwd_context.verify, plain_password, hashed_password)
+
+
+def verificar_y_actualizar_password(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica la contraseña y, si el hash no cumple la política vigente
+    (esquema o costo), devuelve también el hash nuevo a guardar.
+
+    Returns:
+        (valida, nuevo_hash o None)
+    """
+    valida, nuevo_hash = ejecutar_hash(
+        "verificar", pwd_context.verify_and_update, plain_password, hashed_password
+    )
+    if valida and nuevo_hash:
+        metricas.registrar_rehash()
+    return valida, nuevo_hash
 
 
 def obtener_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return ejecutar_hash("hash", pwd_context.hash, password)
 
 
 # Alias para reutilizar en otros módulos
@@ -54,6 +76,54 @@ def crear_token_acceso(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def claims_principal(principal: Principal) -> dict:
+    """
+    Claims de autorización que se embeben en el token de acceso.
+
+    Con ellos `obtener_usuario_actual` autoriza sin consultar la BD;
+    `ver` es la versión de token del usuario al emitirlo (ver revocacion_tokens).
+    """
+    return {
+        "sub": principal.email,
+        "id": principal.id,
+        "nombre": principal.nombre,
+        "apellido": principal.apellido,
+        "roles": sorted(principal.roles),
+        "padre_id": principal.padre_id,
+        "docente_id": principal.docente_id,
+        "docente_activo": principal.docente_activo,
+        "estudiante_id": principal.estudiante_id,
+        "ver": principal.token_version,
+    }
+
+
+def principal_desde_claims(payload: dict) -> Principal:
+    """
+    Principal construido solo con los claims del token.
+
+    Un token solo se emite a usuarios activos, verificados y no bloqueados;
+    cualquier cambio posterior de ese estado revoca el token por versión.
+    """
+    return Principal(
+        id=payload["id"],
+        email=payload["sub"],
+        nombre=payload.get("nombre", ""),
+        apellido=payload.get("apellido", ""),
+        activo=True,
+        bloqueado=False,
+        email_verificado=True,
+        deleted_at=None,
+        fecha_creacion=None,
+        ultimo_login=None,
+        roles=frozenset(r.lower() for r in payload.get("roles", [])),
+        padre_id=payload.get("padre_id"),
+        docente_id=payload.get("docente_id"),
+        docente_activo=bool(payload.get("docente_activo")),
+        estudiante_id=payload.get("estudiante_id"),
+        token_version=payload["ver"],
+    )
+
+
 def verificar_token_acceso(token: str):
     try:
         payload = jwt.decode(
@@ -68,12 +138,29 @@ def verificar_token_acceso(token: str):
 
 
 
+async def _liberar_conexion_async(db: AsyncSession) -> None:
+    """
+    Termina la transacción de solo lectura para devolver la conexión al pool
+    en lugar de retenerla hasta el final del request.
+    """
+    if db.in_transaction():
+        await db.rollback()
+
+
 async def obtener_usuario_actual(
+    request: Request,
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
     """
     Obtiene el usuario actual desde el token JWT.
+
+    Devuelve un Principal (instantánea de solo lectura con roles e ids de
+    perfil). Si el token trae claims de autorización (`roles` y `ver`) se
+    construye desde ellos y solo se comprueba la lista de revocación; los
+    tokens sin claims se resuelven desde la caché de principales.
+    Usa la sesión async: no bloquea el event loop cuando consulta la BD.
+    También fija el usuario e IP del request para la auditoría.
     
     Validaciones:
     1. Token válido
@@ -96,14 +183,25 @@ async def obtener_usuario_actual(
     if email is None:
         raise credentials_exception
 
-    # Buscar usuario
-    usuario = db.query(Usuario).filter(Usuario.email == email).first()
+    # Camino rápido: autorizar solo con los claims del token
+    if "roles" in payload and "ver" in payload:
+        revocado = await token_revocado_async(db, payload.get("id"), payload.get("ver"))
+        await _liberar_conexion_async(db)
+        if revocado:
+            logger.warning(f"⚠️ Intento de acceso con token revocado: {email}")
+            raise credentials_exception
+        principal = principal_desde_claims(payload)
+        fijar_contexto_request(principal.id, ip_cliente(request))
+        return principal
+
+    # Tokens sin claims de autorización: buscar usuario (caché de principales)
+    usuario = await obtener_principal_async(db, email)
+    await _liberar_conexion_async(db)
     if usuario is None:
         raise credentials_exception
 
 
     if usuario.deleted_at is not None:
-        from app.logs.logger import logger
         logger.warning(f"⚠️ Intento de acceso con token de usuario eliminado: {email}")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -112,7 +210,6 @@ async def obtener_usuario_actual(
 
    
     if not usuario.activo:
-        from app.logs.logger import logger
         logger.warning(f"⚠️ Intento de acceso con token de usuario inactivo: {email}")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -120,14 +217,14 @@ async def obtener_usuario_actual(
         )
 
    
-    if getattr(usuario, "bloqueado", False):
-        from app.logs.logger import logger
+    if usuario.bloqueado:
         logger.warning(f"⚠️ Intento de acceso con token de usuario bloqueado: {email}")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Tu cuenta está bloqueada. Contacta al administrador."
         )
 
+    fijar_contexto_request(usuario.id, ip_cliente(request))
     return usuario
 
 
@@ -150,6 +247,17 @@ def verificar_rol(
     Returns:
         bool: True si el usuario tiene el rol, False en caso contrario
     """
+    rol = consulta_rol_usuario(db, usuario_id, rol_requerido, verificar_activo).first()
+    return rol is not None
+
+
+def consulta_rol_usuario(
+    db: Session,
+    usuario_id: int,
+    rol_requerido: str,
+    verificar_activo: bool = True
+):
+    """Consulta de la asignación de un rol a un usuario (usada por verificar_rol)."""
     query = db.query(UsuarioRol).filter(
         UsuarioRol.usuario_id == usuario_id,
         UsuarioRol.rol == rol_requerido.lower()
@@ -158,8 +266,7 @@ def verificar_rol(
     if verificar_activo:
         query = query.filter(UsuarioRol.activo == True)
 
-    rol = query.first()
-    return rol is not None
+    return query
 
 
 def obtener_roles_usuario(
@@ -192,13 +299,13 @@ def obtener_roles_usuario(
 
 
 def requiere_admin(
-    usuario: Usuario = Depends(obtener_usuario_actual),
+    usuario: Principal = Depends(obtener_usuario_actual),
     db: Session = Depends(get_db)
-) -> Usuario:
+) -> Principal:
     """
     Dependency que verifica que el usuario autenticado tenga rol 'admin'.
     """
-    tiene_rol = verificar_rol(db, usuario.id, "admin")
+    tiene_rol = usuario.tiene_rol("admin")
 
     if not tiene_rol:
         logger.warning(
@@ -209,14 +316,14 @@ def requiere_admin(
             detail="Acceso denegado: se requiere rol de administrador"
         )
 
-    logger.debug(f"Acceso admin autorizado: {usuario.email}")
+    logger.debug("Acceso admin autorizado: %s", usuario.email)
     return usuario
 
 
 def requiere_docente(
-    usuario: Usuario = Depends(obtener_usuario_actual),
+    usuario: Principal = Depends(obtener_usuario_actual),
     db: Session = Depends(get_db)
-) -> Usuario:
+) -> Principal:
     """
     Dependency que verifica que el usuario autenticado tenga rol 'docente'.
     
@@ -224,7 +331,7 @@ def requiere_docente(
     - Verifica que el registro en tabla docente NO esté eliminado
     - Verifica que el docente esté activo
     """
-    tiene_rol = verificar_rol(db, usuario.id, "docente")
+    tiene_rol = usuario.tiene_rol("docente")
 
     if not tiene_rol:
         logger.warning(
@@ -235,13 +342,11 @@ def requiere_docente(
             detail="Acceso denegado: se requiere rol de docente"
         )
 
-    
-    docente = db.query(Docente).filter(
-        Docente.usuario_id == usuario.id,
-        Docente.deleted_at.is_(None)  
-    ).first()
-    
-    if not docente:
+    # El perfil docente puede haberse creado después de emitir el token
+    if usuario.docente_id is None:
+        usuario = obtener_principal(db, usuario.email) or usuario
+
+    if usuario.docente_id is None:
         logger.warning(
             f" Acceso denegado: {usuario.email} tiene rol docente pero está eliminado o sin registro"
         )
@@ -251,7 +356,7 @@ def requiere_docente(
         )
 
     
-    if not docente.activo:
+    if not usuario.docente_activo:
         logger.warning(
             f" Acceso denegado: {usuario.email} tiene docente inactivo"
         )
@@ -260,18 +365,18 @@ def requiere_docente(
             detail="Tu cuenta de docente está inactiva. Contacta al administrador."
         )
 
-    logger.debug(f" Acceso docente autorizado: {usuario.email}")
+    logger.debug("Acceso docente autorizado: %s", usuario.email)
     return usuario
 
 
 def requiere_estudiante(
-    usuario: Usuario = Depends(obtener_usuario_actual),
+    usuario: Principal = Depends(obtener_usuario_actual),
     db: Session = Depends(get_db)
-) -> Usuario:
+) -> Principal:
     """
     Dependency que verifica que el usuario autenticado tenga rol 'estudiante'.
     """
-    tiene_rol = verificar_rol(db, usuario.id, "estudiante")
+    tiene_rol = usuario.tiene_rol("estudiante")
 
     if not tiene_rol:
         logger.warning(
@@ -282,18 +387,18 @@ def requiere_estudiante(
             detail="Acceso denegado: se requiere rol de estudiante"
         )
 
-    logger.debug(f"Acceso estudiante autorizado: {usuario.email}")
+    logger.debug("Acceso estudiante autorizado: %s", usuario.email)
     return usuario
 
 
 def requiere_padre(
-    usuario: Usuario = Depends(obtener_usuario_actual),
+    usuario: Principal = Depends(obtener_usuario_actual),
     db: Session = Depends(get_db)
-) -> Usuario:
+) -> Principal:
     """
     Dependency que verifica que el usuario autenticado tenga rol 'padre'.
     """
-    tiene_rol = verificar_rol(db, usuario.id, "padre")
+    tiene_rol = usuario.tiene_rol("padre")
 
     if not tiene_rol:
         logger.warning(
@@ -304,7 +409,7 @@ def requiere_padre(
             detail="Acceso denegado: se requiere rol de padre/tutor"
         )
 
-    logger.debug(f"Acceso padre autorizado: {usuario.email}")
+    logger.debug("Acceso padre autorizado: %s", usuario.email)
     return usuario
 
 
@@ -314,11 +419,11 @@ def requiere_cualquier_rol(*roles_permitidos: str):
     El usuario debe tener AL MENOS UNO de los roles especificados.
     """
     def dependency(
-        usuario: Usuario = Depends(obtener_usuario_actual),
+        usuario: Principal = Depends(obtener_usuario_actual),
         db: Session = Depends(get_db)
-    ) -> Usuario:
+    ) -> Principal:
         # Obtener todos los roles del usuario
-        roles_usuario = obtener_roles_usuario(db, usuario.id)
+        roles_usuario = sorted(usuario.roles)
 
         # Verificar si tiene al menos uno de los roles permitidos
         roles_permitidos_lower = [r.lower() for r in roles_permitidos]
@@ -335,7 +440,7 @@ def requiere_cualquier_rol(*roles_permitidos: str):
                 detail=f"Acceso denegado: se requiere uno de los siguientes roles: {roles_str}"
             )
 
-        logger.debug(f"Acceso autorizado: {usuario.email} con roles {roles_usuario}")
+        logger.debug("Acceso autorizado: %s con roles %s", usuario.email, roles_usuario)
         return usuario
 
     return dependency
@@ -347,11 +452,11 @@ def requiere_todos_los_roles(*roles_requeridos: str):
     El usuario debe tener TODOS los roles especificados.
     """
     def dependency(
-        usuario: Usuario = Depends(obtener_usuario_actual),
+        usuario: Principal = Depends(obtener_usuario_actual),
         db: Session = Depends(get_db)
-    ) -> Usuario:
+    ) -> Principal:
         # Obtener todos los roles del usuario
-        roles_usuario = obtener_roles_usuario(db, usuario.id)
+        roles_usuario = sorted(usuario.roles)
 
         # Verificar si tiene TODOS los roles requeridos
         roles_requeridos_lower = [r.lower() for r in roles_requeridos]
@@ -369,7 +474,7 @@ def requiere_todos_los_roles(*roles_requeridos: str):
                 detail=f"Acceso denegado: se requieren TODOS los siguientes roles: {roles_str}"
             )
 
-        logger.debug(f" Acceso autorizado: {usuario.email} tiene todos los roles requeridos")
+        logger.debug("Acceso autorizado: %s tiene todos los roles requeridos", usuario.email)
         return usuario
 
     return dependency
@@ -393,6 +498,7 @@ def asignar_rol(db: Session, usuario_id: int, rol: str):
         rol_existente.activo = True
         db.commit()
         db.refresh(rol_existente)
+        revocar_tokens_usuario(db, usuario_id)
         return rol_existente
 
     nuevo_rol = UsuarioRol(
@@ -404,12 +510,13 @@ def asignar_rol(db: Session, usuario_id: int, rol: str):
     db.add(nuevo_rol)
     db.commit()
     db.refresh(nuevo_rol)
+    revocar_tokens_usuario(db, usuario_id)
 
     return nuevo_rol
 
 
 def obtener_docente_actual(
-    usuario: Usuario = Depends(requiere_docente),
+    usuario: Principal = Depends(requiere_docente),
     db: Session = Depends(get_db)
 ) -> Docente:
     """
@@ -419,12 +526,9 @@ def obtener_docente_actual(
     - El docente NO esté eliminado (deleted_at is None)
     - El docente esté activo
     
-    Por lo tanto, aquí solo necesitamos obtener el objeto.
+    Por lo tanto, aquí solo necesitamos obtener el objeto (por clave primaria).
     """
-    docente = db.query(Docente).filter(
-        Docente.usuario_id == usuario.id,
-        Docente.deleted_at.is_(None)  
-    ).first()
+    docente = db.get(Docente, usuario.docente_id)
     
     if not docente:
         logger.error(f" Usuario {usuario.email} tiene rol docente pero no registro en tabla docente")
@@ -433,5 +537,5 @@ def obtener_docente_actual(
             detail="Error: usuario docente sin registro asociado"
         )
     
-    logger.debug(f" Docente obtenido: id={docente.id}, usuario_id={docente.usuario_id}")
+    logger.debug("Docente obtenido: id=%s, usuario_id=%s", docente.id, docente.usuario_id)
     return docente
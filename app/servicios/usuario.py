@@ -4,6 +4,11 @@ from typing import List, Optional
 
 from app.modelos import Usuario, UsuarioRol
 from app.esquemas.auth import UsuarioUpdate, UsuarioRolCreate
+from app.servicios.cache_principal import invalidar_principal
+from app.servicios.revocacion_tokens import revocar_tokens_usuario
+
+# Campos cuyo cambio deja obsoletos los tokens emitidos
+CAMPOS_REVOCAN_TOKEN = {"email", "activo", "bloqueado"}
 
 def obtener_usuarios(db: Session, skip: int = 0, limit: int = 100, activo: Optional[bool] = None):
     query = db.query(Usuario)
@@ -25,6 +30,10 @@ def actualizar_usuario(db: Session, usuario_id: int, usuario: UsuarioUpdate):
     
     db.commit()
     db.refresh(db_usuario)
+    if CAMPOS_REVOCAN_TOKEN & update_data.keys():
+        revocar_tokens_usuario(db, usuario_id)
+    else:
+        invalidar_principal(usuario_id)
     return db_usuario
 
 def eliminar_usuario(db: Session, usuario_id: int):
@@ -35,6 +44,7 @@ def eliminar_usuario(db: Session, usuario_id: int):
     # Soft delete
     db_usuario.activo = False
     db.commit()
+    revocar_tokens_usuario(db, usuario_id)
     return db_usuario
 
 def crear_rol_usuario(db: Session, usuario_id: int, rol: UsuarioRolCreate):
@@ -46,6 +56,7 @@ def crear_rol_usuario(db: Session, usuario_id: int, rol: UsuarioRolCreate):
     db.add(db_rol)
     db.commit()
     db.refresh(db_rol)
+    revocar_tokens_usuario(db, usuario_id)
     return db_rol
 
 def obtener_roles_usuario(db: Session, usuario_id: int):
@@ -28,6 +28,82 @@ class Settings(BaseSettings):
     EMAIL_FROM: str = "BookiSmartIA <neiracarmen28@gmail.com>"
     FRONTEND_URL: str = "http://localhost:5173"
 
+    # Cola de emails salientes (tabla correo_saliente + emisor en segundo plano)
+    EMAIL_COLA_ACTIVA: bool = True
+    EMAIL_COLA_LOTE: int = 50
+    EMAIL_COLA_INTERVALO_SEGUNDOS: float = 5.0
+    EMAIL_MAX_INTENTOS: int = 6
+    EMAIL_REINTENTO_BASE_SEGUNDOS: int = 30
+    EMAIL_REINTENTO_MAX_SEGUNDOS: int = 3600
+    # Conexiones SMTP reutilizables (una por hilo de envío)
+    EMAIL_SMTP_CONEXIONES: int = 2
+    EMAIL_SMTP_INACTIVIDAD_SEGUNDOS: int = 60
+
+    # Alta masiva de docentes/estudiantes (CSV o JSON)
+    IMPORTACION_MAX_FILAS: int = 1000
+
+    # Caché de principales autenticados (por proceso)
+    PRINCIPAL_CACHE_TTL_SEGUNDOS: int = 30
+    PRINCIPAL_CACHE_MAX: int = 5000
+
+    # Caché de respuestas de catálogos (por proceso, con ETag/304)
+    RESPONSE_CACHE_TTL_SEGUNDOS: int = 60
+    RESPONSE_CACHE_MAX: int = 2000
+
+    # Métricas Prometheus (GET /metrics). METRICAS_DIR: directorio compartido
+    # por los workers de gunicorn; METRICAS_TOKEN: exige "Bearer <token>".
+    # Fuera de development, sin METRICAS_TOKEN el endpoint responde 404
+    METRICAS_DIR: Optional[str] = None
+    METRICAS_VOLCADO_SEGUNDOS: float = 10.0
+    METRICAS_TOKEN: Optional[str] = None
+
+    # Monitor del sistema: cada cuánto se muestrea (hilo de fondo)
+    MONITOR_INTERVALO_SEGUNDOS: float = 30.0
+
+    # Perfilador SQL por request (ver app/perfilador_sql.py)
+    SQL_PERFIL_ACTIVO: bool = False
+    SQL_PERFIL_UMBRAL_N1: int = 5
+    SQL_PERFIL_MAX_CONSULTAS: int = 50
+    SQL_PERFIL_REPORTES: int = 100
+
+    # Auditoría (ver app/servicios/registro_auditoria.py). "triggers": la
+    # escriben los triggers de la BD; "aplicacion": la escribe la app en
+    # lotes (requiere migrations/auditoria_en_aplicacion.sql)
+    AUDITORIA_MODO: str = "triggers"
+    AUDITORIA_LOTE: int = 200
+    AUDITORIA_INTERVALO_SEGUNDOS: float = 2.0
+    AUDITORIA_COLA_MAX: int = 10000
+
+    # Revocación de tokens: cada cuánto se sincroniza la lista con la BD
+    TOKEN_REVOCACION_SYNC_SEGUNDOS: int = 15
+
+    # Política de hashing de contraseñas (calibrar con app.scripts.calibrar_hash)
+    # PASSWORD_ESQUEMA: "bcrypt" o "argon2" (argon2id, requiere argon2-cffi)
+    PASSWORD_ESQUEMA: str = "bcrypt"
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST_KIB: int = 65536
+    ARGON2_PARALLELISM: int = 2
+
+    # Hashing de contraseñas (pool dedicado) y límite de logins fallidos
+    # (ver app/servicios/limitador_login.py)
+    HASH_MAX_CONCURRENTES: int = 2
+    HASH_MAX_EN_ESPERA: int = 32
+    LOGIN_MAX_FALLOS: int = 10
+    LOGIN_MAX_FALLOS_POR_IP: int = 50
+    LOGIN_VENTANA_SEGUNDOS: int = 60
+
+    # Proxies cuyas cabeceras X-Forwarded-* se aceptan (IPs o redes CIDR,
+    # separadas por comas); la IP del cliente es la primera dirección no
+    # confiable desde la derecha de X-Forwarded-For. Obligatorio fuera de
+    # development (la app no arranca sin él): si faltara, todos los clientes
+    # aparecerían con la IP del proxy y compartirían el límite de logins por
+    # IP. En Azure App Service el front end se conecta desde direcciones
+    # privadas:
+    #   PROXIES_CONFIABLES=10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,169.254.0.0/16
+    # "*" no se acepta: tomaría la dirección que el cliente escribió a la izquierda
+    PROXIES_CONFIABLES: Optional[str] = None
+
     # Otros (si quieres conservarlos)
     WHISPER_MODEL: str = "small"
     HOST: str = "0.0.0.0"
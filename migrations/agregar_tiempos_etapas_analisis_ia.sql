@@ -0,0 +1,23 @@
+-- ============================================
+-- MIGRACIÓN: Tiempos por etapa del análisis de lectura
+-- ============================================
+-- Fecha: 2026-10-19
+-- Motivo: Ver dónde se va la latencia del pipeline de lectura
+--
+-- CONTEXTO:
+-- Cada análisis de lectura guarda ahora su fila en analisis_ia con
+-- tiempo_procesamiento (segundos, total) y el desglose por etapa:
+-- recepción del audio, decodificación, VAD, transcripción, comparación,
+-- guardado y generación de ejercicios, junto con la duración del audio
+-- y el factor de tiempo real. Ejemplo:
+--   {"etapas_ms": {"decodificacion": 85.2, "vad": 140.3, ...},
+--    "total_etapas_ms": 2410.7, "transcurrido_ms": 2433.0,
+--    "duracion_audio_s": 21.4, "factor_tiempo_real": 0.098}
+-- ============================================
+
+ALTER TABLE analisis_ia
+    ADD COLUMN IF NOT EXISTS tiempos_etapas JSON;
+
+-- estadisticas.py busca el análisis de cada evaluación
+CREATE INDEX IF NOT EXISTS idx_analisis_ia_evaluacion
+    ON analisis_ia (evaluacion_id);
@@ -0,0 +1,23 @@
+-- ============================================
+-- MIGRACIÓN: Versión de token por usuario
+-- ============================================
+-- Fecha: 2026-10-19
+-- Motivo: Autorización desde los claims del token de acceso
+--
+-- CONTEXTO:
+-- El token de acceso lleva roles e ids de perfil, de modo que los
+-- endpoints autorizan sin consultar usuario_rol en cada request.
+-- Para poder revocar esos tokens (bloqueo, desactivación, eliminación
+-- o cambio de roles) cada token lleva la versión vigente del usuario
+-- en el claim "ver"; incrementar usuario.token_version invalida todos
+-- los tokens emitidos antes.
+-- ============================================
+
+ALTER TABLE usuario
+    ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
+
+-- La sincronización de la lista de revocación solo lee usuarios
+-- que alguna vez tuvieron tokens revocados
+CREATE INDEX IF NOT EXISTS idx_usuario_token_version_revocados
+    ON usuario (id, token_version)
+    WHERE token_version > 0;
@@ -0,0 +1,62 @@
+-- ============================================
+-- MIGRACIÓN: Auditoría escrita por la aplicación (sin triggers por fila)
+-- ============================================
+-- Fecha: 2026-10-19
+-- Motivo: Los triggers de auditoría duplicaban cada escritura en las
+-- tablas más usadas
+--
+-- CONTEXTO:
+-- Con mejorar_triggers_auditoria.sql cada INSERT/UPDATE/DELETE de las
+-- tablas auditadas escribía, dentro de la misma transacción y por fila,
+-- una fila en auditoria con la imagen JSONB completa antes y después.
+-- Ahora la auditoría la arma app/servicios/registro_auditoria.py a partir
+-- de los eventos de SQLAlchemy:
+-- - Se acumula por transacción y solo se escribe si hubo COMMIT
+-- - En UPDATE guarda únicamente las columnas modificadas
+-- - Se inserta en lotes (AUDITORIA_LOTE filas por INSERT) desde un hilo
+--   de fondo, fuera de la transacción de negocio
+-- - Los INSERT/UPDATE/DELETE en bloque (session.execute) también dejan
+--   un evento por fila, tomado del RETURNING de la misma sentencia; en
+--   esos UPDATE solo se guardan los valores nuevos (no los anteriores)
+--
+-- Los cambios hechos por SQL directo (psql, scripts con text()) dejan de
+-- auditarse.
+--
+-- Orden de despliegue: aplicar esta migración y después configurar
+-- AUDITORIA_MODO=aplicacion (el valor por defecto es triggers). Con
+-- AUDITORIA_MODO=aplicacion la app no arranca si quedan triggers.
+--
+-- Esta migración solo quita los triggers; la función registrar_auditoria()
+-- se conserva. Para volver atrás: configurar AUDITORIA_MODO=triggers y
+-- ejecutar mejorar_triggers_auditoria.sql.
+-- ============================================
+
+DO $$
+DECLARE
+    tabla_name TEXT;
+    tablas_auditar TEXT[] := ARRAY[
+        'usuario',
+        'estudiante',
+        'docente',
+        'padre',
+        'contenido_lectura',
+        'evaluacion_lectura',
+        'detalle_evaluacion',
+        'actividad_lectura',
+        'respuesta_actividad',
+        'ejercicio_pronunciacion',
+        'historial_puntos',
+        'nivel_estudiante',
+        'recompensa_estudiante',
+        'mision_diaria'
+    ];
+BEGIN
+    FOREACH tabla_name IN ARRAY tablas_auditar
+    LOOP
+        IF EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = tabla_name) THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS trigger_auditoria ON %I', tabla_name);
+            RAISE NOTICE '✅ Trigger de auditoría eliminado en tabla: %', tabla_name;
+        END IF;
+    END LOOP;
+END $$;
+
@@ -0,0 +1,106 @@
+-- ============================================
+-- MIGRACIÓN: Índices compuestos para consultas frecuentes
+-- ============================================
+-- Fecha: 2026-10-19
+-- Motivo: Evitar sequential scans en historiales, dashboards y autorización
+--
+-- PROBLEMA ANTERIOR:
+-- - Aparte de usuario.email, columnas de tokens y actividad_lectura.lectura_id,
+--   las tablas no tenían índices secundarios
+-- - Historiales y dashboards filtran por estudiante y ordenan por fecha
+--   recorriendo la tabla completa
+-- - Cada verificación de rol filtra usuario_rol sin índice
+--
+-- SOLUCIÓN:
+-- - Índices compuestos (filtro + orden) para las consultas calientes
+-- - Índice parcial para evaluaciones con precisión calculada
+--
+-- NOTA:
+-- - CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción.
+--   Ejecutar este archivo con psql en modo autocommit (sin BEGIN/COMMIT):
+--       psql "$DATABASE_URL" -f migrations/crear_indices_consultas_frecuentes.sql
+-- - Los mismos índices están declarados en los modelos (__table_args__).
+-- ============================================
+
+
+-- ============================================
+-- PASO 1: evaluacion_lectura
+-- ============================================
+
+-- Historiales y "última actividad": WHERE estudiante_id = ? ORDER BY fecha_evaluacion DESC
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_evaluacion_estudiante_fecha
+    ON evaluacion_lectura (estudiante_id, fecha_evaluacion DESC);
+
+-- Lecturas aprobadas / mejor intento por lectura:
+-- WHERE estudiante_id = ? [AND contenido_id = ?] AND precision_palabras >= ?
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_evaluacion_estudiante_contenido_precision
+    ON evaluacion_lectura (estudiante_id, contenido_id, precision_palabras)
+    WHERE precision_palabras IS NOT NULL;
+
+
+-- ============================================
+-- PASO 2: progreso_actividad
+-- ============================================
+
+-- Historial de actividades: WHERE estudiante_id = ? ORDER BY fecha_completacion DESC
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_progreso_estudiante_fecha
+    ON progreso_actividad (estudiante_id, fecha_completacion DESC);
+
+
+-- ============================================
+-- PASO 3: ejercicio_practica
+-- ============================================
+
+-- Historial de prácticas con paginación keyset:
+-- WHERE estudiante_id = ? ORDER BY fecha_creacion DESC, id DESC
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ejercicio_estudiante_fecha
+    ON ejercicio_practica (estudiante_id, fecha_creacion DESC, id DESC);
+
+
+-- ============================================
+-- PASO 4: usuario_rol
+-- ============================================
+
+-- Verificación de roles: WHERE usuario_id = ? AND rol = ? AND activo = TRUE
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_usuario_rol_usuario_rol_activo
+    ON usuario_rol (usuario_id, rol, activo);
+
+
+-- ============================================
+-- PASO 5: Actualizar estadísticas del planificador
+-- ============================================
+
+ANALYZE evaluacion_lectura;
+ANALYZE progreso_actividad;
+ANALYZE ejercicio_practica;
+ANALYZE usuario_rol;
+
+
+-- ============================================
+-- VERIFICACIÓN
+-- ============================================
+-- EXPLAIN debe mostrar "Index Scan" / "Index Only Scan" (no "Seq Scan"):
+--
+-- EXPLAIN SELECT * FROM evaluacion_lectura
+--   WHERE estudiante_id = 1 ORDER BY fecha_evaluacion DESC LIMIT 20;
+--
+-- EXPLAIN SELECT contenido_id FROM evaluacion_lectura
+--   WHERE estudiante_id = 1 AND precision_palabras IS NOT NULL
+--     AND precision_palabras >= 70;
+--
+-- EXPLAIN SELECT * FROM progreso_actividad
+--   WHERE estudiante_id = 1 ORDER BY fecha_completacion DESC;
+--
+-- EXPLAIN SELECT * FROM ejercicio_practica
+--   WHERE estudiante_id = 1 ORDER BY fecha_creacion DESC, id DESC LIMIT 20;
+--
+-- EXPLAIN SELECT rol FROM usuario_rol
+--   WHERE usuario_id = 1 AND activo = TRUE;
+--
+-- En tablas con pocas filas el planificador puede preferir Seq Scan;
+-- verificar con datos representativos o con SET enable_seqscan = off.
+
+
+-- ============================================
+-- FIN DE MIGRACIÓN
+-- ============================================
@@ -0,0 +1,43 @@
+-- ============================================
+-- MIGRACIÓN: Cola durable de emails salientes
+-- ============================================
+-- Fecha: 2026-10-19
+-- Motivo: Sacar el envío SMTP del camino del request
+--
+-- CONTEXTO:
+-- Registro, verificación, reset de contraseña y alta de docentes
+-- enviaban el email dentro del request (conexión SMTP + STARTTLS +
+-- login por mensaje). Ahora solo insertan una fila en correo_saliente
+-- y un emisor en segundo plano la envía con conexiones SMTP reutilizadas,
+-- reintentando con backoff exponencial.
+--
+-- Varios workers pueden reclamar lotes a la vez: el reclamo usa
+-- FOR UPDATE SKIP LOCKED y adelanta proximo_intento como reserva, de
+-- modo que si un worker muere sus correos vuelven a la cola.
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS correo_saliente (
+    id BIGSERIAL PRIMARY KEY,
+    destinatario VARCHAR(255) NOT NULL,
+    asunto VARCHAR(255) NOT NULL,
+    html TEXT NOT NULL,
+    texto TEXT,
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente',
+    intentos INTEGER NOT NULL DEFAULT 0,
+    proximo_intento TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    ultimo_error TEXT,
+    creado_en TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    enviado_en TIMESTAMP WITH TIME ZONE,
+
+    CONSTRAINT chk_correo_saliente_estado
+        CHECK (estado IN ('pendiente', 'enviado', 'fallido'))
+);
+
+-- El emisor solo lee pendientes vencidos, en orden de proximo_intento
+CREATE INDEX IF NOT EXISTS idx_correo_saliente_pendientes
+    ON correo_saliente (proximo_intento, id)
+    WHERE estado = 'pendiente';
+
+-- Limpieza periódica sugerida (los enviados no se vuelven a leer):
+-- DELETE FROM correo_saliente
+-- WHERE estado = 'enviado' AND enviado_en < NOW() - INTERVAL '30 days';
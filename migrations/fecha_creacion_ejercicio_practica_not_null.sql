@@ -0,0 +1,53 @@
+-- ============================================
+-- MIGRACIÓN: ejercicio_practica.fecha_creacion NOT NULL
+-- ============================================
+-- Fecha: 2026-10-19
+-- Motivo: Paginación keyset del historial de prácticas
+--
+-- PROBLEMA ANTERIOR:
+-- - El historial de prácticas pagina por (fecha_creacion, id) DESC, pero
+--   la columna admitía NULL
+-- - La comparación (fecha_creacion, id) < (:fecha, :id) nunca es verdadera
+--   con fecha NULL: esos ejercicios se saltaban o repetían entre páginas
+--
+-- SOLUCIÓN:
+-- - Rellenar las fechas nulas con la completación del ejercicio o, si no
+--   hay, con la fecha de la evaluación que lo originó
+-- - Declarar la columna NOT NULL (el DEFAULT now() ya existía)
+--
+-- NOTA:
+-- - SET NOT NULL recorre la tabla bajo ACCESS EXCLUSIVE; ejecutar fuera
+--   de horas pico.
+-- ============================================
+
+
+-- ============================================
+-- PASO 1: Rellenar fechas nulas
+-- ============================================
+
+UPDATE ejercicio_practica ep
+SET fecha_creacion = COALESCE(
+    ep.fecha_completacion,
+    (SELECT ev.fecha_evaluacion FROM evaluacion_lectura ev WHERE ev.id = ep.evaluacion_id),
+    now()
+)
+WHERE ep.fecha_creacion IS NULL;
+
+
+-- ============================================
+-- PASO 2: Restricción NOT NULL
+-- ============================================
+
+ALTER TABLE ejercicio_practica
+    ALTER COLUMN fecha_creacion SET NOT NULL;
+
+
+-- ============================================
+-- VERIFICACIÓN
+-- ============================================
+-- SELECT count(*) FROM ejercicio_practica WHERE fecha_creacion IS NULL;  -- 0
+
+
+-- ============================================
+-- FIN DE MIGRACIÓN
+-- ============================================
@@ -0,0 +1,92 @@
+"""
+Historial de prácticas paginado por (fecha_creacion, id): ningún ejercicio
+se salta ni se repite entre páginas, tampoco los que tenían fecha nula
+antes de migrations/fecha_creacion_ejercicio_practica_not_null.sql.
+"""
+
+import uuid
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.modelos import ContenidoLectura, Docente, EjercicioPractica, Estudiante, EvaluacionLectura, Usuario
+from app.servicios.historial_practica_pronunciacion import obtener_historial_practicas
+
+MIGRACION = Path(__file__).resolve().parents[1] / "migrations" / "fecha_creacion_ejercicio_practica_not_null.sql"
+FECHA_EVALUACION = datetime(2026, 3, 2, 10, 0, tzinfo=timezone.utc)
+
+
+def _crear_estudiante_con_evaluacion(db):
+    usuario = Usuario(
+        email=f"docente.{uuid.uuid4().hex[:8]}@colegio.edu",
+        password_hash="no-usado",
+        nombre="Marta",
+        apellido="Prueba",
+    )
+    db.add(usuario)
+    db.flush()
+    docente = Docente(usuario_id=usuario.id)
+    db.add(docente)
+    db.flush()
+
+    estudiante = Estudiante(
+        docente_id=docente.id,
+        nombre="Ana",
+        apellido="Prueba",
+        fecha_nacimiento=date(2017, 3, 1),
+        nivel_educativo=2,
+    )
+    contenido = ContenidoLectura(
+        docente_id=docente.id, titulo="El zorro", contenido="Había una vez...",
+        nivel_dificultad=2, edad_recomendada=8,
+    )
+    db.add_all([estudiante, contenido])
+    db.flush()
+
+    evaluacion = EvaluacionLectura(
+        estudiante_id=estudiante.id, contenido_id=contenido.id,
+        fecha_evaluacion=FECHA_EVALUACION, estado="completado",
+    )
+    db.add(evaluacion)
+    db.flush()
+    return estudiante, evaluacion
+
+
+def _paginar_todo(db, estudiante_id: int, limite: int):
+    ids, cursor = [], None
+    while True:
+        filas, cursor = obtener_historial_practicas(db, estudiante_id, limite, cursor)
+        ids.extend(f["id"] for f in filas)
+        if cursor is None:
+            return ids
+
+
+def test_ejercicio_con_fecha_nula_aparece_una_vez_tras_la_migracion(db):
+    estudiante, evaluacion = _crear_estudiante_con_evaluacion(db)
+
+    # Esquema previo a la migración: la columna admitía NULL
+    db.execute(text("ALTER TABLE ejercicio_practica ALTER COLUMN fecha_creacion DROP NOT NULL"))
+    ejercicios = [
+        EjercicioPractica(
+            estudiante_id=estudiante.id, evaluacion_id=evaluacion.id,
+            tipo_ejercicio="palabras_aisladas", palabras_objetivo=["zorro"], texto_practica="zorro",
+            fecha_creacion=datetime(2026, 3, dia, tzinfo=timezone.utc),
+        )
+        for dia in (1, 3, 3, 4)
+    ]
+    db.add_all(ejercicios)
+    db.flush()
+    sin_fecha = ejercicios[0]
+    db.execute(
+        text("UPDATE ejercicio_practica SET fecha_creacion = NULL WHERE id = :id"),
+        {"id": sin_fecha.id},
+    )
+
+    db.connection().exec_driver_sql(MIGRACION.read_text(encoding="utf-8"))
+    db.expire_all()
+
+    assert sin_fecha.fecha_creacion == FECHA_EVALUACION
+    ids = _paginar_todo(db, estudiante.id, limite=2)
+    assert sorted(ids) == sorted(e.id for e in ejercicios)
+    assert len(ids) == len(set(ids))
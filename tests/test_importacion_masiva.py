@@ -0,0 +1,48 @@
+"""
+Alta masiva: errores reportados por fila, sin insertar nada.
+"""
+
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.esquemas.estudiante import EstudianteCreateDocente
+from app.modelos import Usuario
+from app.servicios.importacion_masiva import _validar_filas, importar_docentes, leer_csv
+
+CSV_ESTUDIANTES = (
+    "nombre,apellido,fecha_nacimiento,nivel_educativo,curso_id\n"
+    "Ana,Perez,2017-03-01,2,1\n"
+    "Luis,Gomez,2017-05-02,2,1,sobra\n"
+    "Sofia,Diaz,2016-11-20,3,1,\n"
+).encode("utf-8")
+
+
+def test_fila_con_celdas_de_mas_es_error_de_esa_fila():
+    filas = leer_csv(CSV_ESTUDIANTES)
+    datos, errores = _validar_filas(filas, EstudianteCreateDocente)
+
+    # La celda vacía al final de la última fila no cuenta como sobrante
+    assert [numero for numero, _ in datos] == [1, 3]
+    assert errores == [{"fila": 2, "errores": ["la fila tiene 1 celda(s) más que el encabezado"]}]
+
+
+def test_importar_docentes_reporta_celdas_de_mas_y_email_existente_sin_distinguir_mayusculas(db):
+    existente = f"Docente.{uuid.uuid4().hex[:8]}@Colegio.edu"
+    db.add(Usuario(email=existente, password_hash="no-usado", nombre="Marta", apellido="Prueba"))
+    db.commit()
+
+    csv_docentes = (
+        "email,nombre,apellido\n"
+        f"{existente.lower()},Marta,Prueba\n"
+        "nuevo.docente@colegio.edu,Pedro,Ruiz,sobra\n"
+    ).encode("utf-8")
+
+    with pytest.raises(HTTPException) as error:
+        importar_docentes(db, leer_csv(csv_docentes))
+
+    assert error.value.status_code == 422
+    assert [e["fila"] for e in error.value.detail["errores"]] == [1, 2]
+    assert "ya está registrado" in error.value.detail["errores"][0]["errores"][0]
+    assert "más que el encabezado" in error.value.detail["errores"][1]["errores"][0]
@@ -0,0 +1,88 @@
+"""
+Las consultas frecuentes deben resolverse con los índices compuestos de
+migrations/crear_indices_consultas_frecuentes.sql, nunca con Seq Scan.
+
+Se explica el SQL que genera el propio código de los servicios (compilado
+con el dialecto de PostgreSQL), no una copia escrita a mano. Con
+enable_seqscan = off el planificador solo elige Seq Scan si no hay un
+índice utilizable, así que el resultado no depende de cuántas filas tenga
+la base de tests.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.modelos import Base
+from app.servicios.actividad import consulta_historial_actividades
+from app.servicios.estadisticas import consulta_evaluaciones_recientes, consulta_lecturas_aprobadas
+from app.servicios.historial_practica_pronunciacion import consulta_historial_practicas
+from app.servicios.paginacion import codificar_cursor
+from app.servicios.seguridad import consulta_rol_usuario
+
+CONSULTAS = [
+    pytest.param(
+        "evaluacion_lectura",
+        lambda db: consulta_evaluaciones_recientes(db, 1, 20),
+        "idx_evaluacion_estudiante_fecha",
+        id="evaluaciones_por_fecha",
+    ),
+    pytest.param(
+        "evaluacion_lectura",
+        lambda db: consulta_lecturas_aprobadas(db, 1),
+        "idx_evaluacion_estudiante_contenido_precision",
+        id="lecturas_aprobadas",
+    ),
+    pytest.param(
+        "progreso_actividad",
+        lambda db: consulta_historial_actividades(db, 1),
+        "idx_progreso_estudiante_fecha",
+        id="historial_actividades",
+    ),
+    pytest.param(
+        "ejercicio_practica",
+        lambda db: consulta_historial_practicas(db, 1, 20),
+        "idx_ejercicio_estudiante_fecha",
+        id="historial_practicas",
+    ),
+    pytest.param(
+        "ejercicio_practica",
+        lambda db: consulta_historial_practicas(db, 1, 20, codificar_cursor([datetime(2026, 1, 1), 50])),
+        "idx_ejercicio_estudiante_fecha",
+        id="historial_practicas_pagina_siguiente",
+    ),
+    pytest.param(
+        "usuario_rol",
+        lambda db: consulta_rol_usuario(db, 1, "admin"),
+        "idx_usuario_rol_usuario_rol_activo",
+        id="verificacion_rol",
+    ),
+]
+
+
+def _sql(query) -> str:
+    return str(query.statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def _nodos(plan):
+    yield plan
+    for hijo in plan.get("Plans", []):
+        yield from _nodos(hijo)
+
+
+@pytest.mark.parametrize("tabla, construir_consulta, indice", CONSULTAS)
+def test_consulta_frecuente_usa_indice(db, tabla, construir_consulta, indice):
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    consulta = _sql(construir_consulta(db))
+    plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {consulta}")).scalar()[0]["Plan"]
+    nodos = list(_nodos(plan))
+
+    secuenciales = [n for n in nodos if n["Node Type"] == "Seq Scan" and n.get("Relation Name") == tabla]
+    assert not secuenciales, f"Seq Scan sobre {tabla}: {plan}"
+
+    usados = {n["Index Name"] for n in nodos if "Index Name" in n}
+    otros_de_la_tabla = {i.name for i in Base.metadata.tables[tabla].indexes} - {indice}
+    assert indice in usados, f"Se esperaba {indice}, se usó {sorted(usados)}"
+    assert not usados & otros_de_la_tabla, f"Se esperaba solo {indice} en {tabla}, se usó {sorted(usados)}"
@@ -0,0 +1,66 @@
+"""
+Hijos de un padre con sus cursos: número de consultas constante.
+"""
+
+import uuid
+from datetime import date
+
+from app.modelos import Curso, Docente, Estudiante, EstudianteCurso, Padre, Usuario
+from app.servicios.padre_hijos import obtener_hijos_con_cursos
+
+
+def _usuario(db, nombre: str) -> Usuario:
+    usuario = Usuario(
+        email=f"{nombre}.{uuid.uuid4().hex[:8]}@colegio.edu",
+        password_hash="no-usado",
+        nombre=nombre.capitalize(),
+        apellido="Prueba",
+    )
+    db.add(usuario)
+    db.flush()
+    return usuario
+
+
+def _crear_familia(db, cantidad_hijos: int = 3):
+    """Padre con `cantidad_hijos` hijos, cada uno inscrito en dos cursos."""
+    docente = Docente(usuario_id=_usuario(db, "docente").id)
+    padre = Padre(usuario_id=_usuario(db, "padre").id, parentesco="madre")
+    db.add_all([docente, padre])
+    db.flush()
+
+    cursos = [
+        Curso(docente_id=docente.id, nombre=nombre, nivel=2, codigo_acceso=uuid.uuid4().hex[:12])
+        for nombre in ("Lectura inicial", "Comprension lectora")
+    ]
+    hijos = [
+        Estudiante(
+            docente_id=docente.id,
+            padre_id=padre.id,
+            nombre=nombre,
+            apellido="Prueba",
+            fecha_nacimiento=date(2017, 3, 1),
+            nivel_educativo=2,
+        )
+        for nombre in ("Ana", "Luis", "Sofia")[:cantidad_hijos]
+    ]
+    db.add_all(cursos + hijos)
+    db.flush()
+
+    db.add_all(EstudianteCurso(estudiante_id=h.id, curso_id=c.id) for h in hijos for c in cursos)
+    db.flush()
+    return padre, hijos
+
+
+def test_hijos_con_cursos_en_dos_consultas(db, contador_consultas):
+    padre, hijos = _crear_familia(db)
+    # Sin objetos en memoria: las relaciones deben venir de las consultas
+    db.expunge_all()
+
+    with contador_consultas:
+        resultado = obtener_hijos_con_cursos(db, padre.usuario_id)
+
+    assert contador_consultas.total <= 2, contador_consultas.sentencias
+    assert [r.estudiante.id for r in resultado] == [h.id for h in hijos]
+    assert all(len(r.cursos) == 2 for r in resultado)
+    assert all(r.estudiante.docente.usuario is not None for r in resultado)
+    assert all(c.docente is not None for r in resultado for c in r.cursos)
@@ -0,0 +1,109 @@
+"""
+Los cambios de credenciales y la baja del perfil de docente revocan los
+tokens ya emitidos: el token anterior recibe 401.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from app.esquemas.auth import CambioPassword
+from app.modelos import Docente, Usuario
+from app.servicios import auth as servicio_auth
+from app.servicios.cache_principal import cargar_principal
+from app.servicios.docente import eliminar_docente
+from app.servicios.revocacion_tokens import lista_revocacion
+from app.servicios.seguridad import (
+    claims_principal, crear_token_acceso, obtener_password_hash, obtener_usuario_actual,
+)
+
+PASSWORD = "Clave-Anterior-1"
+NUEVO_PASSWORD = "Clave-Nueva-2"
+
+
+def _autenticar(db, token: str):
+    """
+    Ejecuta la dependencia real de autenticación con el token. La lista de
+    revocación se recarga desde la BD del test (no desde la memoria del
+    proceso) y la sesión async queda sin usar.
+    """
+    lista_revocacion.limpiar()
+    lista_revocacion.sincronizar_si_corresponde(db)
+    request = Request({"type": "http", "headers": [], "client": ("203.0.113.5", 1234)})
+    return asyncio.run(obtener_usuario_actual(request, token, AsyncSession()))
+
+
+def _assert_revocado(db, token: str) -> None:
+    with pytest.raises(HTTPException) as error:
+        _autenticar(db, token)
+    assert error.value.status_code == 401
+
+
+@pytest.fixture
+def docente(db):
+    usuario = Usuario(
+        email=f"docente.{uuid.uuid4().hex[:8]}@colegio.edu",
+        password_hash=obtener_password_hash(PASSWORD),
+        nombre="Marta",
+        apellido="Prueba",
+        email_verificado=True,
+    )
+    db.add(usuario)
+    db.flush()
+    docente = Docente(usuario_id=usuario.id, activo=True)
+    db.add(docente)
+    db.commit()
+    return docente
+
+
+@pytest.fixture
+def token(db, docente):
+    principal = cargar_principal(db, docente.usuario.email)
+    token = crear_token_acceso(claims_principal(principal), timedelta(minutes=30))
+    # El token es válido antes del cambio
+    assert _autenticar(db, token).docente_id == docente.id
+    yield token
+    lista_revocacion.limpiar()
+
+
+def _token_reset(db, usuario: Usuario) -> str:
+    valor = uuid.uuid4().hex
+    usuario.token_reset_password = valor
+    usuario.token_reset_expira = datetime.now(timezone.utc) + timedelta(hours=1)
+    usuario.token_reset_usado = False
+    db.commit()
+    return valor
+
+
+def test_cambiar_password_revoca_tokens(db, docente, token):
+    servicio_auth.cambiar_password(
+        db, docente.usuario_id, CambioPassword(password_actual=PASSWORD, nuevo_password=NUEVO_PASSWORD)
+    )
+    _assert_revocado(db, token)
+
+
+def test_confirmar_reset_password_revoca_tokens(db, docente, token):
+    servicio_auth.confirmar_reset_password(db, _token_reset(db, docente.usuario), NUEVO_PASSWORD)
+    _assert_revocado(db, token)
+
+
+def test_configurar_cuenta_docente_revoca_tokens(db, docente, token):
+    servicio_auth.configurar_cuenta_docente(db, _token_reset(db, docente.usuario), NUEVO_PASSWORD)
+    _assert_revocado(db, token)
+
+
+def test_eliminar_docente_revoca_tokens(db, docente, token):
+    eliminar_docente(db, docente.id)
+    _assert_revocado(db, token)
+
+
+def test_eliminar_docente_endpoint_revoca_tokens(db, docente, token):
+    from app.routers.docentes import eliminar_docente_endpoint
+
+    eliminar_docente_endpoint(docente.id, db=db, usuario_actual=None)
+    _assert_revocado(db, token)